@@ -2,7 +2,9 @@ from dataclasses import dataclass
 from typing import Any
 from uuid import UUID
 from LuminUserService.app.domain.events.event_bus import EventBus
+from LuminUserService.app.application.services.command_batcher import process_committed_events
 from LuminUserService.app.application.services.user_service import UserService
+from LuminUserService.app.infrastructure.tasks.retry_policy import failure_result
 
 
 @dataclass
@@ -15,19 +17,14 @@ class ActivateHandler:
         self.user_service = user_service
         self.event_bus = event_bus
 
+    @failure_result("error")
     async def handle(self, command: ActivateCommand) -> dict[str, Any]:
-        try:
-            user = await self.user_service.activate(command.user_id)
+        user = await self.user_service.activate(command.user_id)
 
-            await self.event_bus.process_events(user)
+        await process_committed_events(self.event_bus, user)
 
-            return {
-                "success": True,
-                "user_id": str(command.user_id),
-            }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        return {
+            "success": True,
+            "user_id": str(command.user_id),
+            "version": user.version
+        }
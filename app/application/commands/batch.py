@@ -0,0 +1,148 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Optional
+from uuid import UUID
+from LuminUserService.app.domain.events.event_bus import EventBus
+from LuminUserService.app.domain.models.aggregates.user import User
+from LuminUserService.app.domain.models.common.value_objects import (
+    Username, Date, Email, PhoneNumber, LanguageCode, Bio, AvatarURL, PrivacySettings
+)
+from LuminUserService.app.application.services.command_batcher import apply_commands
+from LuminUserService.app.application.services.user_service import UserService
+from LuminUserService.app.infrastructure.tasks.retry_policy import is_retryable
+
+
+def _change_username(payload: dict) -> Callable[[User], None]:
+    new_username = Username(
+        first_name=payload["new_username"]["first_name"],
+        last_name=payload["new_username"]["last_name"]
+    )
+    return lambda user: user.change_username(new_username)
+
+
+def _change_date(payload: dict) -> Callable[[User], None]:
+    new_date = Date(value=datetime.fromisoformat(payload["new_date"].replace('Z', '+00:00')))
+    return lambda user: user.change_date(new_date)
+
+
+def _change_email(payload: dict) -> Callable[[User], None]:
+    new_email = Email(value=payload["new_email"])
+    return lambda user: user.change_email(new_email)
+
+
+def _change_phone(payload: dict) -> Callable[[User], None]:
+    new_phone = PhoneNumber(value=payload["new_phone"])
+    return lambda user: user.change_phone(new_phone)
+
+
+def _change_language_code(payload: dict) -> Callable[[User], None]:
+    new_language_code = LanguageCode(value=payload["new_language_code"])
+    return lambda user: user.change_language_code(new_language_code)
+
+
+def _change_bio(payload: dict) -> Callable[[User], None]:
+    new_bio = Bio(value=payload["new_bio"])
+    return lambda user: user.change_bio(new_bio)
+
+
+def _change_avatar_url(payload: dict) -> Callable[[User], None]:
+    new_avatar_url = AvatarURL(value=payload["new_avatar_url"])
+    return lambda user: user.change_avatar_url(new_avatar_url)
+
+
+def _change_privacy_settings(payload: dict) -> Callable[[User], None]:
+    new_privacy_settings = PrivacySettings(**payload["new_privacy_settings"])
+    return lambda user: user.change_privacy_settings(new_privacy_settings)
+
+
+def _record_profile_view(payload: dict) -> Callable[[User], None]:
+    viewer_id = UUID(str(payload["viewer_id"]))
+    viewer_ip = str(payload["viewer_ip"])
+    return lambda user: user.record_profile_view(view_id=user.id, viewer_id=viewer_id, viewer_ip=viewer_ip)
+
+
+BATCH_COMMAND_TYPES: dict[str, Callable[[dict], Callable[[User], None]]] = {
+    "change_username": _change_username,
+    "change_date": _change_date,
+    "change_email": _change_email,
+    "change_phone": _change_phone,
+    "change_language_code": _change_language_code,
+    "change_bio": _change_bio,
+    "change_avatar_url": _change_avatar_url,
+    "change_privacy_settings": _change_privacy_settings,
+    "record_profile_view": _record_profile_view,
+    "activate": lambda payload: lambda user: user.activate(),
+    "deactivate": lambda payload: lambda user: user.deactivate(),
+    "block": lambda payload: lambda user: user.block(),
+}
+
+
+@dataclass
+class BatchCommandItem:
+    user_id: UUID
+    command: str
+    payload: dict[str, Any] = field(default_factory=dict)
+    index: Optional[int] = None
+
+
+@dataclass
+class BatchCommand:
+    items: list[BatchCommandItem]
+
+
+def build_mutation(item: BatchCommandItem) -> Callable[[User], None]:
+    factory = BATCH_COMMAND_TYPES.get(item.command)
+    if factory is None:
+        raise ValueError(f"Unknown command type {item.command}")
+    try:
+        return factory(item.payload)
+    except KeyError as e:
+        raise ValueError(f"Missing field {e} in {item.command} payload")
+
+
+class BatchCommandHandler:
+    def __init__(self, user_service: UserService, event_bus: EventBus) -> None:
+        self.user_service: UserService = user_service
+        self.event_bus: EventBus = event_bus
+
+    async def handle(self, command: BatchCommand) -> dict[str, Any]:
+        results: list[Optional[dict[str, Any]]] = [None] * len(command.items)
+        pending: list[tuple[int, Callable[[User], None]]] = []
+
+        for position, item in enumerate(command.items):
+            try:
+                pending.append((position, build_mutation(item)))
+            except Exception as e:
+                results[position] = self._result(item, position, e)
+
+        if pending:
+            outcomes = await apply_commands(
+                self.user_service,
+                self.event_bus,
+                [(command.items[position].user_id, mutate) for position, mutate in pending]
+            )
+            if all(isinstance(outcome, Exception) and is_retryable(outcome) for outcome in outcomes):
+                raise outcomes[0]
+            for (position, _), outcome in zip(pending, outcomes):
+                results[position] = self._result(command.items[position], position, outcome)
+
+        failed = sum(1 for result in results if not result["success"])
+        return {
+            "success": failed == 0,
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "results": results
+        }
+
+    @staticmethod
+    def _result(item: BatchCommandItem, position: int, outcome: User | Exception) -> dict[str, Any]:
+        result = {
+            "index": item.index if item.index is not None else position,
+            "user_id": item.user_id,
+            "command": item.command
+        }
+        if isinstance(outcome, Exception):
+            result.update(success=False, exception=str(outcome))
+        else:
+            result.update(success=True, version=outcome.version)
+        return result
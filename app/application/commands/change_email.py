@@ -4,7 +4,9 @@ from uuid import UUID
 from LuminUserService.app.domain.events.event_bus import EventBus
 from LuminUserService.app.domain.models.aggregates.user import User
 from LuminUserService.app.domain.models.common.value_objects import Email
+from LuminUserService.app.application.services.command_batcher import process_committed_events
 from LuminUserService.app.application.services.user_service import UserService
+from LuminUserService.app.infrastructure.tasks.retry_policy import failure_result
 
 
 @dataclass
@@ -18,21 +20,16 @@ class ChangeEmailHandler:
         self.user_service: UserService = user_service
         self.event_bus: EventBus = event_bus
 
+    @failure_result("exception")
     async def handle(self, command: ChangeEmailCommand) -> dict[str, Any]:
-        try:
-            user: User = await self.user_service.change_email(
-                user_id=command.user_id,
-                new_email=command.new_email
-            )
-            await self.event_bus.process_events(user)
-            return {
-                "success": True,
-                "user_id": command.user_id,
-                "new_email": command.new_email
-            }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "exception": str(e)
-            }
+        user: User = await self.user_service.change_email(
+            user_id=command.user_id,
+            new_email=command.new_email
+        )
+        await process_committed_events(self.event_bus, user)
+        return {
+            "success": True,
+            "user_id": command.user_id,
+            "version": user.version,
+            "new_email": command.new_email
+        }
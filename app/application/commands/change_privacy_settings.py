@@ -4,7 +4,9 @@ from uuid import UUID
 from LuminUserService.app.domain.events.event_bus import EventBus
 from LuminUserService.app.domain.models.aggregates.user import User
 from LuminUserService.app.domain.models.common.value_objects import PrivacySettings
+from LuminUserService.app.application.services.command_batcher import process_committed_events
 from LuminUserService.app.application.services.user_service import UserService
+from LuminUserService.app.infrastructure.tasks.retry_policy import failure_result
 
 
 @dataclass
@@ -18,22 +20,17 @@ class ChangePrivacySettingsHandler:
         self.user_service: UserService = user_service
         self.event_bus: EventBus = event_bus
 
+    @failure_result("exception")
     async def handle(self, command: ChangePrivacySettingsCommand) -> dict[str, Any]:
-        try:
-            print("Start handle changing of privacy settings")
-            user: User = await self.user_service.change_privacy_settings(
-                user_id=command.user_id,
-                new_privacy_settings=command.new_privacy_settings
-            )
-            await self.event_bus.process_events(user)
-            return {
-                "success": True,
-                "user_id": command.user_id,
-                "new_privacy_settings": command.new_privacy_settings
-            }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "exception": str(e)
-            }
+        print("Start handle changing of privacy settings")
+        user: User = await self.user_service.change_privacy_settings(
+            user_id=command.user_id,
+            new_privacy_settings=command.new_privacy_settings
+        )
+        await process_committed_events(self.event_bus, user)
+        return {
+            "success": True,
+            "user_id": command.user_id,
+            "version": user.version,
+            "new_privacy_settings": command.new_privacy_settings
+        }
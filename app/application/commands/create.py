@@ -6,7 +6,9 @@ from LuminUserService.app.domain.models.aggregates.user import User
 from LuminUserService.app.domain.models.common.value_objects import (Username, Date, PhoneNumber, Email, LanguageCode, Bio,
                                                                      AvatarURL, PrivacySettings)
 from LuminUserService.app.domain.models.entities.profile_view import ProfileView
+from LuminUserService.app.application.services.command_batcher import process_committed_events
 from LuminUserService.app.application.services.user_service import UserService
+from LuminUserService.app.infrastructure.tasks.retry_policy import failure_result
 
 
 @dataclass
@@ -28,28 +30,23 @@ class CreateUserHandler:
         self.user_service: UserService = user_service
         self.event_bus: EventBus = event_bus
 
+    @failure_result("exception")
     async def handle(self, command: CreateUserCommand) -> dict[str, Any]:
-        try:
-            user: User = await self.user_service.create_user(
-                user_id=command.user_id,
-                username=command.username,
-                date=command.date,
-                phone=command.phone,
-                email=command.email,
-                language_code=command.language_code,
-                bio=command.bio,
-                avatar_url=command.avatar_url,
-                privacy_settings=command.privacy_settings,
-                profile_views=command.profile_views,
-            )
-            await self.event_bus.process_events(user)
-            return {
-                "success": True,
-                "user_id": command.user_id
-            }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "exception": str(e)
-            }
+        user: User = await self.user_service.create_user(
+            user_id=command.user_id,
+            username=command.username,
+            date=command.date,
+            phone=command.phone,
+            email=command.email,
+            language_code=command.language_code,
+            bio=command.bio,
+            avatar_url=command.avatar_url,
+            privacy_settings=command.privacy_settings,
+            profile_views=command.profile_views,
+        )
+        await process_committed_events(self.event_bus, user)
+        return {
+            "success": True,
+            "user_id": command.user_id,
+            "version": user.version
+        }
@@ -3,6 +3,7 @@ from typing import Any
 from uuid import UUID
 from LuminUserService.app.domain.events.event_bus import EventBus
 from LuminUserService.app.application.services.user_service import UserService
+from LuminUserService.app.infrastructure.tasks.retry_policy import failure_result
 
 
 @dataclass
@@ -15,16 +16,10 @@ class DeleteHandler:
         self.user_service: UserService = user_service
         self.event_bus: EventBus = event_bus
 
+    @failure_result("exception")
     async def handle(self, command: DeleteCommand) -> dict[str, Any]:
-        try:
-            await self.user_service.delete(command.user_id)
-            return {
-                "success": True,
-                "user_id": command.user_id,
-            }
-
-        except Exception as e:
-            return {
-                "success": False,
-                "exception": str(e)
-            }
+        await self.user_service.delete(command.user_id)
+        return {
+            "success": True,
+            "user_id": command.user_id,
+        }
@@ -3,7 +3,9 @@ from typing import Any
 from uuid import UUID
 from LuminUserService.app.domain.events.event_bus import EventBus
 from LuminUserService.app.domain.models.aggregates.user import User
+from LuminUserService.app.application.services.command_batcher import process_committed_events
 from LuminUserService.app.application.services.user_service import UserService
+from LuminUserService.app.infrastructure.tasks.retry_policy import failure_result
 
 
 @dataclass
@@ -18,20 +20,16 @@ class RecordProfileViewHandler:
         self.user_service: UserService = user_service
         self.event_bus: EventBus = event_bus
 
+    @failure_result("exception")
     async def handle(self, command: RecordProfileViewCommand) -> dict[str, Any]:
-        try:
-            user: User = await self.user_service.record_profile_view(
-                user_id=command.user_id,
-                viewer_id=command.viewer_id,
-                viewer_ip=command.viewer_ip
-            )
-            await self.event_bus.process_events(user)
-            return {
-                "success": True,
-                "user_id": command.user_id,
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "exception": str(e)
-            }
+        user: User = await self.user_service.record_profile_view(
+            user_id=command.user_id,
+            viewer_id=command.viewer_id,
+            viewer_ip=command.viewer_ip
+        )
+        await process_committed_events(self.event_bus, user)
+        return {
+            "success": True,
+            "user_id": command.user_id,
+            "version": user.version
+        }
@@ -4,6 +4,9 @@ from uuid import UUID
 from LuminUserService.app.domain.events.event_bus import EventBus
 from LuminUserService.app.domain.models.aggregates.user import User
 from LuminUserService.app.application.services.user_service import UserService
+from LuminUserService.app.infrastructure.persistanse.user_mapper import UserMapper
+from LuminUserService.app.infrastructure.persistanse.user_read_repository import UserReadRepository
+from LuminUserService.app.infrastructure.tasks.retry_policy import failure_result
 
 
 @dataclass
@@ -16,23 +19,38 @@ class GetUserByIdHandler:
         self.user_service: UserService = user_service
         self.event_bus: EventBus = event_bus
 
+    @failure_result("exception")
     async def handle(self, command: GetUserByIdQuery) -> dict[str, Any]:
-        try:
-            user: User = await self.user_service.get_user_by_id(command.user_id)
-            print(f"[GetUserByIdHandler] User object created: {user}")
-            print(f"[GetUserByIdHandler] User type: {type(user)}")
-            print(f"[GetUserByIdHandler] User id attr: {getattr(user, 'id', 'NO ID')}")
-            print(f"[GetUserByIdHandler] User username attr: {getattr(user, 'username', 'NO USERNAME')}")
-            print(f"[GetUserByIdHandler] User dir: {[attr for attr in dir(user) if not attr.startswith('_')]}")
+        user: User = await self.user_service.get_user_by_id(command.user_id)
+        print(f"[GetUserByIdHandler] User object created: {user}")
+        print(f"[GetUserByIdHandler] User type: {type(user)}")
+        print(f"[GetUserByIdHandler] User id attr: {getattr(user, 'id', 'NO ID')}")
+        print(f"[GetUserByIdHandler] User username attr: {getattr(user, 'username', 'NO USERNAME')}")
+        print(f"[GetUserByIdHandler] User dir: {[attr for attr in dir(user) if not attr.startswith('_')]}")
+
+        return {
+            "success": True,
+            "user_id": command.user_id,
+            "user": user
+        }
 
-            return {
-                "success": True,
-                "user_id": command.user_id,
-                "user": user
-            }
 
-        except Exception as e:
+class ReadUserByIdHandler:
+    def __init__(self, read_repository: UserReadRepository) -> None:
+        self.read_repository: UserReadRepository = read_repository
+        self.mapper = UserMapper()
+
+    async def handle(self, query: GetUserByIdQuery) -> dict[str, Any]:
+        user = await self.read_repository.get_by_id(query.user_id)
+        if user is None:
             return {
                 "success": False,
-                "exception": str(e)
+                "error": f"User {query.user_id} not found",
+                "user_id": str(query.user_id)
             }
+
+        return {
+            "success": True,
+            "user": self.mapper.to_persistence(user),
+            "user_id": str(query.user_id)
+        }
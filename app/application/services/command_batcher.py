@@ -0,0 +1,125 @@
+from typing import Callable, Optional
+from uuid import UUID
+import asyncio
+import logging
+import time
+from LuminUserService.app.domain.events.event_bus import EventBus
+from LuminUserService.app.domain.models.aggregates.aggregate_root import AggregateRoot
+from LuminUserService.app.domain.models.aggregates.user import User
+from LuminUserService.app.application.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+
+async def apply_commands(
+        user_service: UserService,
+        event_bus: EventBus,
+        commands: list[tuple[UUID, Callable[[User], None]]]
+) -> list[User | Exception]:
+    try:
+        results, events = await user_service.apply_batch(commands)
+    except Exception as e:
+        if len(commands) == 1:
+            return [e]
+
+        logger.error(f"Batch of {len(commands)} commands failed, applying one by one: {e}")
+        results = []
+        for command in commands:
+            results.extend(await apply_commands(user_service, event_bus, [command]))
+        return results
+
+    await publish_events(event_bus, events)
+    return results
+
+
+async def publish_events(event_bus: EventBus, events: list) -> None:
+    if not events:
+        return
+
+    outcomes = await asyncio.gather(*(event_bus.publish(event) for event in events), return_exceptions=True)
+    failed = [outcome for outcome in outcomes if isinstance(outcome, Exception)]
+    if failed:
+        logger.error(f"Failed to publish {len(failed)} of {len(events)} events: {failed[0]}")
+
+
+async def process_committed_events(event_bus: EventBus, aggregate: AggregateRoot) -> None:
+    try:
+        await event_bus.process_events(aggregate)
+    except Exception as e:
+        logger.error(f"Failed to publish events of committed {type(aggregate).__name__} {aggregate.id}: {e}")
+
+
+class CommandBatcher:
+    def __init__(
+            self,
+            user_service: UserService,
+            event_bus: EventBus,
+            max_batch_size: int = 100,
+            min_window: float = 0.001,
+            max_window: float = 0.01
+    ):
+        self.user_service = user_service
+        self.event_bus = event_bus
+        self.max_batch_size = max_batch_size
+        self.min_window = min_window
+        self.max_window = max_window
+        self.window = min_window
+
+        self._pending: list[tuple[UUID, Callable[[User], None], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_lock = asyncio.Lock()
+        self._commit_time = min_window
+        self.batches = 0
+        self.commands = 0
+
+    def submit(self, user_id: UUID, mutate: Callable[[User], None]) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((user_id, mutate, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush(loop, 0)
+        elif self._timer is None:
+            self._schedule_flush(loop, self.window)
+        return future
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, delay: float) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = loop.call_later(delay, lambda: asyncio.ensure_future(self.flush()))
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            self._timer = None
+            batch, self._pending = self._pending[:self.max_batch_size], self._pending[self.max_batch_size:]
+            if self._pending:
+                self._schedule_flush(asyncio.get_running_loop(), 0)
+            if not batch:
+                return
+
+            started = time.monotonic()
+            results = await apply_commands(
+                self.user_service,
+                self.event_bus,
+                [(user_id, mutate) for user_id, mutate, _ in batch]
+            )
+            self._adapt_window(len(batch), time.monotonic() - started)
+            self._resolve(batch, results)
+
+    def _resolve(self, batch: list, results: list) -> None:
+        self.batches += 1
+        self.commands += len(batch)
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _adapt_window(self, batch_size: int, commit_time: float) -> None:
+        self._commit_time = 0.8 * self._commit_time + 0.2 * commit_time
+        if batch_size == 1:
+            self.window = self.min_window
+        else:
+            self.window = min(max(self._commit_time, self.min_window), self.max_window)
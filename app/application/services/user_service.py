@@ -1,4 +1,8 @@
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, TYPE_CHECKING
+import copy
 from uuid import UUID
+from LuminUserService.app.domain.events.domain_event import DomainEvent
 from LuminUserService.app.domain.events.user_events import UserCreatedEvent
 from LuminUserService.app.domain.models.aggregates.user import User
 from LuminUserService.app.domain.models.common.value_objects import (
@@ -7,13 +11,20 @@ from LuminUserService.app.domain.models.common.value_objects import (
 )
 from LuminUserService.app.domain.models.entities.profile_view import ProfileView
 from LuminUserService.app.infrastructure.cache.multi_level_cache import MultiLevelCache
+from LuminUserService.app.infrastructure.persistanse.identity_map import UserIdentityMap
+from LuminUserService.app.infrastructure.persistanse.postgres_sql_user_repository import PostgresSQLUserRepository
 from LuminUserService.app.infrastructure.persistanse.unit_of_work import get_unit_of_work
+from LuminUserService.app.infrastructure.persistanse.user_loader import UserLoader, user_loader_scope
+
+if TYPE_CHECKING:
+    from LuminUserService.app.application.services.command_batcher import CommandBatcher
 
 
 class UserService:
     def __init__(self, connection_factory, cache: MultiLevelCache) -> None:
         self.connection_factory = connection_factory
         self.cache = cache
+        self.batcher: Optional["CommandBatcher"] = None
 
     async def create_user(
             self,
@@ -66,151 +77,87 @@ class UserService:
             return user
 
     async def change_username(self, user_id: UUID, new_username: Username) -> User:
-        async with get_unit_of_work(self.connection_factory, self.cache) as uow:
-            user = await uow.users.get_by_id(user_id)
-
-            if not user:
-                raise ValueError(f"User {user_id} not found")
-
-            user.change_username(new_username)
-            await uow.users.save(user)
-            await uow.commit()
-            return user
+        return await self._apply(user_id, lambda user: user.change_username(new_username))
 
     async def change_date(self, user_id: UUID, new_date: Date) -> User:
-        async with get_unit_of_work(self.connection_factory, self.cache) as uow:
-            print("User Service change date method start")
-            user = await uow.users.get_by_id(user_id)
-
-            if not user:
-                raise ValueError(f"User {user_id} not found")
-
-            user.change_date(new_date)
-            print("User Service change date method used")
-            await uow.users.save(user)
-            await uow.commit()
-            return user
+        return await self._apply(user_id, lambda user: user.change_date(new_date))
 
     async def change_email(self, user_id: UUID, new_email: Email) -> User:
-        async with get_unit_of_work(self.connection_factory, self.cache) as uow:
-            user: User = await uow.users.get_by_id(user_id)
-
-            if not user:
-                raise ValueError(f"User {user_id} not found")
-
-            user.change_email(new_email)
-            await uow.users.save(user)
-            await uow.commit()
-            return user
+        return await self._apply(user_id, lambda user: user.change_email(new_email))
 
     async def change_phone(self, user_id: UUID, new_phone: PhoneNumber) -> User:
-        async with get_unit_of_work(self.connection_factory, self.cache) as uow:
-            user: User = await uow.users.get_by_id(user_id)
-
-            if not user:
-                raise ValueError(f"User {user_id} not found")
-
-            user.change_phone(new_phone)
-            await uow.users.save(user)
-            await uow.commit()
-            return user
+        return await self._apply(user_id, lambda user: user.change_phone(new_phone))
 
     async def change_language_code(self, user_id: UUID, new_language_code: LanguageCode) -> User:
-        async with get_unit_of_work(self.connection_factory, self.cache) as uow:
-            user: User = await uow.users.get_by_id(user_id)
-
-            if not user:
-                raise ValueError(f"User {user_id} not found")
-
-            user.change_language_code(new_language_code)
-            await uow.users.save(user)
-            await uow.commit()
-            return user
+        return await self._apply(user_id, lambda user: user.change_language_code(new_language_code))
 
     async def change_bio(self, user_id: UUID, new_bio: Bio) -> User:
-        async with get_unit_of_work(self.connection_factory, self.cache) as uow:
-            user: User = await uow.users.get_by_id(user_id)
-
-            if not user:
-                raise ValueError(f"User {user_id} not found")
-
-            user.change_bio(new_bio)
-            await uow.users.save(user)
-            await uow.commit()
-            return user
+        return await self._apply(user_id, lambda user: user.change_bio(new_bio))
 
     async def change_avatar_url(self, user_id: UUID, new_avatar_url: AvatarURL) -> User:
-        async with get_unit_of_work(self.connection_factory, self.cache) as uow:
-            user: User = await uow.users.get_by_id(user_id)
-
-            if not user:
-                raise ValueError(f"User {user_id} not found")
-
-            user.change_avatar_url(new_avatar_url)
-            await uow.users.save(user)
-            await uow.commit()
-            return user
+        return await self._apply(user_id, lambda user: user.change_avatar_url(new_avatar_url))
 
     async def change_privacy_settings(self, user_id: UUID, new_privacy_settings: PrivacySettings) -> User:
-        async with get_unit_of_work(self.connection_factory, self.cache) as uow:
-            print("Start User Service change privacy settings method")
-            user: User = await uow.users.get_by_id(user_id)
-
-            if not user:
-                raise ValueError(f"User {user_id} not found")
-
-            user.change_privacy_settings(new_privacy_settings)
-            await uow.users.save(user)
-            await uow.commit()
-            return user
+        return await self._apply(user_id, lambda user: user.change_privacy_settings(new_privacy_settings))
 
     async def record_profile_view(self, user_id: UUID, viewer_id: UUID, viewer_ip: str) -> User:
-        async with get_unit_of_work(self.connection_factory, self.cache) as uow:
-            user: User = await uow.users.get_by_id(user_id)
-
-            if not user:
-                raise ValueError(f"User {user_id} not found")
-
-            user.record_profile_view(view_id=user_id, viewer_id=viewer_id, viewer_ip=viewer_ip)
-            await uow.users.save(user)
-            await uow.commit()
-            return user
+        return await self._apply(
+            user_id,
+            lambda user: user.record_profile_view(view_id=user_id, viewer_id=viewer_id, viewer_ip=viewer_ip)
+        )
 
     async def block(self, user_id: UUID) -> User:
-        async with get_unit_of_work(self.connection_factory, self.cache) as uow:
-            user: User = await uow.users.get_by_id(user_id)
+        return await self._apply(user_id, lambda user: user.block())
 
-            if not user:
-                raise ValueError(f"User {user_id} not found")
+    async def activate(self, user_id: UUID) -> User:
+        return await self._apply(user_id, lambda user: user.activate())
 
-            user.block()
-            await uow.users.save(user)
-            await uow.commit()
-            return user
+    async def deactivate(self, user_id: UUID) -> User:
+        return await self._apply(user_id, lambda user: user.deactivate())
+
+    async def _apply(self, user_id: UUID, mutate: Callable[[User], None]) -> User:
+        if self.batcher is not None:
+            return await self.batcher.submit(user_id, mutate)
 
-    async def activate(self, user_id: UUID) -> User:
         async with get_unit_of_work(self.connection_factory, self.cache) as uow:
-            user: User = await uow.users.get_by_id(user_id)
+            user = await uow.users.get_for_update(user_id)
 
             if not user:
                 raise ValueError(f"User {user_id} not found")
 
-            user.activate()
+            mutate(user)
             await uow.users.save(user)
             await uow.commit()
             return user
 
-    async def deactivate(self, user_id: UUID) -> User:
+    async def apply_batch(
+            self,
+            commands: list[tuple[UUID, Callable[[User], None]]]
+    ) -> tuple[list[User | Exception], list[DomainEvent]]:
         async with get_unit_of_work(self.connection_factory, self.cache) as uow:
-            user: User = await uow.users.get_by_id(user_id)
-
-            if not user:
-                raise ValueError(f"User {user_id} not found")
-
-            user.deactivate()
-            await uow.users.save(user)
+            users = await uow.users.get_many_for_update([user_id for user_id, _ in commands])
+
+            results: list[User | Exception] = []
+            changed: dict[UUID, User] = {}
+            for user_id, mutate in commands:
+                user = users.get(user_id)
+                if user is None:
+                    results.append(ValueError(f"User {user_id} not found"))
+                    continue
+
+                try:
+                    mutate(user)
+                except Exception as e:
+                    results.append(e)
+                    continue
+
+                changed[user_id] = user
+                results.append(copy.copy(user))
+
+            events = [event for user in changed.values() for event in user.get_domain_events()]
+            await uow.users.save_many(list(changed.values()))
             await uow.commit()
-            return user
+            return results, events
 
     async def get_user_by_id(self, user_id: UUID) -> User | None:
         async with get_unit_of_work(self.connection_factory, self.cache) as uow:
@@ -226,6 +173,33 @@ class UserService:
 
             return user
 
+    @contextmanager
+    def batched_lookups(self) -> Iterator[UserLoader]:
+        repository = PostgresSQLUserRepository(self.connection_factory, UserIdentityMap(), self.cache)
+        with user_loader_scope(self.cache, repository.fetch_user_rows) as loader:
+            yield loader
+
+    async def get_users_by_ids(self, user_ids: list[UUID]) -> list[User | None]:
+        with self.batched_lookups() as loader:
+            return await loader.load_many(user_ids)
+
+    async def list_users(
+            self,
+            status: str | None = None,
+            language_code: str | None = None,
+            limit: int = 100,
+            offset: int = 0
+    ) -> list[User]:
+        async with get_unit_of_work(self.connection_factory, self.cache) as uow:
+            user_ids = await uow.users.find_user_ids(status, language_code, limit, offset)
+
+        users = await self.get_users_by_ids(user_ids)
+        return [user for user in users if user is not None]
+
+    async def warm_up_cache(self) -> int:
+        async with get_unit_of_work(self.connection_factory, self.cache) as uow:
+            return await self.cache.warm_up(uow.users.fetch_user_rows)
+
     async def delete(self, user_id: UUID) -> None:
         async with get_unit_of_work(self.connection_factory, self.cache) as uow:
             await uow.users.delete(user_id)
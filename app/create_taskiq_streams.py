@@ -31,9 +31,19 @@ async def create_streams():
         num_replicas=1,
     )
 
+    dead_letter_stream_config = StreamConfig(
+        name="TASKIQ_DLQ",
+        subjects=["dlq.user_service.>"],
+        retention=RetentionPolicy.LIMITS,
+        max_age=14 * 24 * 60 * 60,
+        storage=StorageType.FILE,
+        num_replicas=1,
+    )
+
     streams_to_create = [
         ("TASKIQ_STREAM", taskiq_stream_config),
         ("USERS_EVENTS", eventbus_stream_config),
+        ("TASKIQ_DLQ", dead_letter_stream_config),
     ]
 
     for stream_name, config in streams_to_create:
@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import nats
+from nats.js.errors import BucketNotFoundError, KeyNotFoundError, NotFoundError
+from LuminUserService.app.infrastructure.tasks.partitioned_broker import MESSAGE_ID_HEADER, TASK_ID_HEADER
+from LuminUserService.app.infrastructure.tasks.retry_policy import (
+    ATTEMPTS_HEADER, DLQ_STREAM, DLQ_SUBJECT_PREFIX, FAILED_AT_HEADER, ORIGINAL_SUBJECT_HEADER, REASON_HEADER
+)
+from LuminUserService.app.infrastructure.tasks.taskiq_broker import RESULT_BUCKET
+
+DLQ_HEADERS = (ORIGINAL_SUBJECT_HEADER, REASON_HEADER, ATTEMPTS_HEADER, FAILED_AT_HEADER, MESSAGE_ID_HEADER)
+
+
+async def iter_dead_letters(js, subject: str, limit: int):
+    seq = 1
+    found = 0
+    while found < limit:
+        try:
+            message = await js.get_msg(DLQ_STREAM, seq=seq, subject=subject, next=True)
+        except NotFoundError:
+            return
+        found += 1
+        seq = message.seq + 1
+        yield message
+
+
+async def list_dead_letters(js, subject: str, limit: int) -> None:
+    count = 0
+    async for message in iter_dead_letters(js, subject, limit):
+        headers = message.headers or {}
+        count += 1
+        print(f"#{message.seq} {message.subject}")
+        print(f"    original: {headers.get(ORIGINAL_SUBJECT_HEADER)}")
+        print(f"    attempts: {headers.get(ATTEMPTS_HEADER)}, failed at {headers.get(FAILED_AT_HEADER)}")
+        print(f"    reason:   {headers.get(REASON_HEADER)}")
+    print(f"\n{count} dead-lettered messages")
+
+
+async def replay_dead_letters(js, subject: str, limit: int, sequences: list[int]) -> None:
+    try:
+        results = await js.key_value(RESULT_BUCKET)
+    except BucketNotFoundError:
+        results = None
+
+    replayed = 0
+    async for message in iter_dead_letters(js, subject, limit):
+        if sequences and message.seq not in sequences:
+            continue
+
+        headers = dict(message.headers or {})
+        original_subject = headers.get(ORIGINAL_SUBJECT_HEADER)
+        if not original_subject:
+            print(f"⚠️ #{message.seq} has no original subject, skipping")
+            continue
+
+        task_id = headers.get(TASK_ID_HEADER)
+        if task_id and results is not None:
+            try:
+                await results.delete(task_id)
+            except KeyNotFoundError:
+                pass
+
+        await js.publish(
+            original_subject,
+            message.data,
+            headers={name: value for name, value in headers.items() if name not in DLQ_HEADERS}
+        )
+        await js.delete_msg(DLQ_STREAM, message.seq)
+        replayed += 1
+        print(f"✅ #{message.seq} replayed to {original_subject}")
+
+    print(f"\n{replayed} messages replayed")
+
+
+async def purge_dead_letters(js, subject: str) -> None:
+    await js.purge_stream(DLQ_STREAM, subject=subject)
+    print(f"🗑️ Purged {subject} from {DLQ_STREAM}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect and replay dead-lettered commands and events")
+    parser.add_argument("--server", default="nats://localhost:4222")
+    parser.add_argument(
+        "--subject",
+        default=f"{DLQ_SUBJECT_PREFIX}.>",
+        help=f"DLQ subject filter, e.g. {DLQ_SUBJECT_PREFIX}.change_email_task"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="Show dead-lettered messages")
+    list_parser.add_argument("--limit", type=int, default=100)
+
+    replay_parser = commands.add_parser("replay", help="Republish dead-lettered messages to their original subject")
+    replay_parser.add_argument("--limit", type=int, default=1000)
+    replay_parser.add_argument("--seq", type=int, nargs="*", default=[], help="Only replay these sequences")
+
+    commands.add_parser("purge", help="Drop dead-lettered messages")
+
+    args = parser.parse_args()
+
+    nc = await nats.connect(args.server)
+    js = nc.jetstream()
+    try:
+        if args.command == "list":
+            await list_dead_letters(js, args.subject, args.limit)
+        elif args.command == "replay":
+            await replay_dead_letters(js, args.subject, args.limit, args.seq)
+        else:
+            await purge_dead_letters(js, args.subject)
+    finally:
+        await nc.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
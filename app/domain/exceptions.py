@@ -10,6 +10,10 @@ class UserIsNotExistException(DomainException):
     pass
 
 
+class FrozenAggregateException(DomainException):
+    pass
+
+
 class UsernameValidationException(DomainException):
     pass
 
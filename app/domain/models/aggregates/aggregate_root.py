@@ -1,7 +1,10 @@
+import copy
 import uuid
 from abc import ABC
 from datetime import datetime
+from typing import Any, Self
 from LuminUserService.app.domain.events.domain_event import DomainEvent
+from LuminUserService.app.domain.exceptions import FrozenAggregateException
 
 
 class AggregateRoot(ABC):
@@ -12,6 +15,14 @@ class AggregateRoot(ABC):
         self._created_at: datetime = datetime.now()
         self._updated_at: datetime = self._created_at
         self._expected_version: int = 0
+        self._frozen: bool = False
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if getattr(self, "_frozen", False):
+            raise FrozenAggregateException(
+                f"{self.__class__.__name__} {self._id} is a read-only snapshot, use a working copy to modify it"
+            )
+        super().__setattr__(name, value)
 
     @property
     def id(self) -> uuid:
@@ -21,6 +32,10 @@ class AggregateRoot(ABC):
     def version(self) -> int:
         return self._version
 
+    @property
+    def expected_version(self) -> int:
+        return self._expected_version
+
     @property
     def created_at(self) -> datetime:
         return self._created_at
@@ -48,6 +63,26 @@ class AggregateRoot(ABC):
         self._version += 1
         self._updated_at = datetime.now()
 
+    def restore_version(self, version: int) -> None:
+        self._version = version
+        self._expected_version = version
+
+    def mark_persisted(self) -> None:
+        self._expected_version = self._version
+
+    @property
+    def is_frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self) -> None:
+        self._frozen = True
+
+    def working_copy(self) -> Self:
+        working_copy = copy.copy(self)
+        object.__setattr__(working_copy, "_frozen", False)
+        working_copy._domain_events = list(self._domain_events)
+        return working_copy
+
     def validate_invariants(self) -> None:
         pass
 
@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, replace
 from datetime import datetime
 from uuid import UUID, uuid4
 from LuminUserService.app.domain.models.aggregates.aggregate_root import AggregateRoot
@@ -45,6 +45,27 @@ class User(AggregateRoot):
         self.profile_views = profile_views
         self.status: str = status
 
+    def freeze(self) -> None:
+        if isinstance(self.profile_views, list):
+            self.profile_views = tuple(self.profile_views)
+        self.privacy_settings = self._convert_privacy_lists(list, tuple)
+        super().freeze()
+
+    def working_copy(self) -> "User":
+        working_copy = super().working_copy()
+        if isinstance(self.profile_views, tuple):
+            working_copy.profile_views = list(self.profile_views)
+        working_copy.privacy_settings = self._convert_privacy_lists(tuple, list)
+        return working_copy
+
+    def _convert_privacy_lists(self, source: type, target: type) -> PrivacySettings:
+        changes = {
+            settings_field.name: target(value)
+            for settings_field in fields(self.privacy_settings)
+            if isinstance(value := getattr(self.privacy_settings, settings_field.name), source)
+        }
+        return replace(self.privacy_settings, **changes) if changes else self.privacy_settings
+
     def change_username(self, new_username: Username) -> None:
         self.username: Username = new_username
         self.add_domain_event(UserChangedUsernameEvent(
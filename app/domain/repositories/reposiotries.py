@@ -12,6 +12,28 @@ class UserRepository(ABC):
     def get_by_id(self, user_id: UUID) -> User | None:
         pass
 
+    @abstractmethod
+    def get_for_update(self, user_id: UUID) -> User | None:
+        pass
+
+    @abstractmethod
+    def get_many_for_update(self, user_ids: list[UUID]) -> dict[UUID, User]:
+        pass
+
+    @abstractmethod
+    def save_many(self, users: list[User]) -> None:
+        pass
+
+    @abstractmethod
+    def find_user_ids(
+            self,
+            status: str | None = None,
+            language_code: str | None = None,
+            limit: int = 100,
+            offset: int = 0
+    ) -> list[UUID]:
+        pass
+
     @abstractmethod
     def delete(self, user_id: UUID) -> None:
         pass
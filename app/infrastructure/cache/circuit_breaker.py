@@ -0,0 +1,105 @@
+from collections import deque
+from typing import Any
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(
+            self,
+            name: str,
+            window_size: int = 50,
+            failure_rate_threshold: float = 0.5,
+            minimum_calls: int = 10,
+            open_seconds: float = 5.0,
+            half_open_probes: int = 3
+    ):
+        self.name = name
+        self.window_size = window_size
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._state = CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probes_started = 0
+        self._probes_succeeded = 0
+        self.times_opened = 0
+        self.rejected_calls = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes_started = 0
+            self._probes_succeeded = 0
+            logger.info(f"Circuit {self.name} half-open, probing")
+        return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == CLOSED:
+            return True
+
+        if state == HALF_OPEN and self._probes_started < self.half_open_probes:
+            self._probes_started += 1
+            return True
+
+        self.rejected_calls += 1
+        return False
+
+    def record_success(self) -> None:
+        if self._state == HALF_OPEN:
+            self._probes_succeeded += 1
+            if self._probes_succeeded >= self.half_open_probes:
+                self._close()
+            return
+
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        if self._state == HALF_OPEN:
+            self._open()
+            return
+
+        self._outcomes.append(False)
+        if len(self._outcomes) >= self.minimum_calls and self.failure_rate >= self.failure_rate_threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.times_opened += 1
+        logger.warning(f"Circuit {self.name} opened for {self.open_seconds}s")
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._outcomes.clear()
+        logger.info(f"Circuit {self.name} closed")
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate, 3),
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls
+        }
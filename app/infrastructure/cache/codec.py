@@ -0,0 +1,90 @@
+from typing import Any, Optional
+import logging
+import pickle
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+PICKLE_MARKER = 0x80
+CODEC_FLAGS = {"zlib": 0x01, "zstd": 0x02, "lz4": 0x03}
+
+
+def available_codecs() -> list[str]:
+    codecs = ["zlib"]
+    if zstandard is not None:
+        codecs.append("zstd")
+    if lz4_frame is not None:
+        codecs.append("lz4")
+    return codecs
+
+
+class ValueCodec:
+    def __init__(
+            self,
+            codec: str = "zstd",
+            threshold: int = 1024,
+            level: int = 3,
+            dictionary_path: Optional[str] = None
+    ):
+        if codec not in available_codecs():
+            logger.info(f"Compression codec {codec} is not installed, falling back to zlib")
+            codec = "zlib"
+
+        self.codec = codec
+        self.threshold = threshold
+        self.level = level
+        self._zstd_compressor = None
+        self._zstd_decompressor = None
+        if zstandard is not None:
+            dictionary = None
+            if dictionary_path:
+                with open(dictionary_path, "rb") as dictionary_file:
+                    dictionary = zstandard.ZstdCompressionDict(dictionary_file.read())
+            self._zstd_compressor = zstandard.ZstdCompressor(level=level, dict_data=dictionary)
+            self._zstd_decompressor = zstandard.ZstdDecompressor(dict_data=dictionary)
+
+    def dumps(self, value: Any) -> bytes:
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(payload) < self.threshold:
+            return payload
+
+        compressed = self._compress(payload)
+        if len(compressed) + 1 >= len(payload):
+            return payload
+        return bytes((CODEC_FLAGS[self.codec],)) + compressed
+
+    def loads(self, data: bytes) -> Any:
+        flag = data[0]
+        if flag == PICKLE_MARKER:
+            return pickle.loads(data)
+        return pickle.loads(self._decompress(flag, data[1:]))
+
+    def _compress(self, payload: bytes) -> bytes:
+        if self.codec == "zstd":
+            return self._zstd_compressor.compress(payload)
+        if self.codec == "lz4":
+            return lz4_frame.compress(payload)
+        return zlib.compress(payload, self.level)
+
+    def _decompress(self, flag: int, payload: bytes) -> bytes:
+        if flag == CODEC_FLAGS["zstd"]:
+            if zstandard is None:
+                raise ValueError("Cached value is zstd-compressed but zstandard is not installed")
+            return self._zstd_decompressor.decompress(payload)
+        if flag == CODEC_FLAGS["lz4"]:
+            if lz4_frame is None:
+                raise ValueError("Cached value is lz4-compressed but lz4 is not installed")
+            return lz4_frame.decompress(payload)
+        if flag == CODEC_FLAGS["zlib"]:
+            return zlib.decompress(payload)
+        raise ValueError(f"Unknown cache value flag {flag:#x}")
@@ -0,0 +1,30 @@
+from bisect import bisect
+from hashlib import md5
+
+
+class HashRing:
+    def __init__(self, nodes: list[str], virtual_nodes: int = 160):
+        if not nodes:
+            raise ValueError("Hash ring needs at least one node")
+
+        self.nodes = list(nodes)
+        self._ring: list[tuple[int, str]] = sorted(
+            (self._hash(f"{node}#{replica}"), node)
+            for node in self.nodes
+            for replica in range(virtual_nodes)
+        )
+        self._points = [point for point, _ in self._ring]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(md5(key.encode()).digest()[:8], "big")
+
+    def get_node(self, key: str) -> str:
+        index = bisect(self._points, self._hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+    def group_by_node(self, keys: list[str]) -> dict[str, list[str]]:
+        groups: dict[str, list[str]] = {}
+        for key in keys:
+            groups.setdefault(self.get_node(key), []).append(key)
+        return groups
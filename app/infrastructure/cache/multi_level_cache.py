@@ -1,62 +1,532 @@
-from typing import Optional, Any
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Optional, Any, Awaitable, Callable
 from uuid import UUID
 from datetime import timedelta
+import asyncio
 import logging
+import math
+import random
+import time
 from LuminUserService.app.domain.models.aggregates.user import User
-from LuminUserService.app.infrastructure.cache.redis_cache import RedisCache
+from LuminUserService.app.infrastructure.cache.redis_cache import (
+    MISSING_USER, USER_FIELD_GROUPS, CachedUserEntry, RedisCache
+)
+from LuminUserService.app.infrastructure.cache.query_cache import QueryCache
+from LuminUserService.app.infrastructure.cache.response_cache import UserResponseCache
+from LuminUserService.app.infrastructure.cache.shared_memory_cache import SharedMemoryCache
+from LuminUserService.app.infrastructure.cache.sketch import CountMinSketch
 from LuminUserService.app.infrastructure.persistanse.identity_map import UserIdentityMap
 from LuminUserService.app.infrastructure.persistanse.user_mapper import UserMapper
 
 logger = logging.getLogger(__name__)
 
+EVENT_FIELD_GROUPS = {
+    "UserChangedUsernameEvent": "identity",
+    "UserBlockedEvent": "identity",
+    "UserActivatedEvent": "identity",
+    "UserDeactivatedEvent": "identity",
+    "UserChangedDateEvent": "contact",
+    "UserChangedEmailEvent": "contact",
+    "UserChangedPhoneEvent": "contact",
+    "UserChangedLanguageCodeEvent": "profile",
+    "UserChangedBioEvent": "profile",
+    "UserChangedAvatarURLEvent": "profile",
+    "UserChangedPrivacySettingsEvent": "privacy",
+}
+
+
+def changed_field_groups(user: User) -> Optional[set[str]]:
+    groups = {EVENT_FIELD_GROUPS.get(event.event_type) for event in user.get_domain_events()}
+    if not groups or None in groups:
+        return None
+    return groups
+
+
+@dataclass
+class CacheMetrics:
+    refreshes: int = 0
+    early_refreshes: int = 0
+    stale_served: int = 0
+    refresh_failures: int = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return asdict(self)
+
 
 class MultiLevelCache:
     def __init__(self, redis_cache: RedisCache, identity_map: UserIdentityMap):
         self.redis = redis_cache
+        self.config = redis_cache.config
         self.identity_map = identity_map
-        self.local_cache_ttl = timedelta(minutes=5)
+        self.responses = UserResponseCache(redis_cache)
+        self.queries = QueryCache(redis_cache)
+        self.shared: Optional[SharedMemoryCache] = None
+        if self.config.shared_cache_path:
+            self.shared = SharedMemoryCache(
+                self.config.shared_cache_path,
+                codec=redis_cache.codec,
+                slots=self.config.shared_cache_slots,
+                slot_size=self.config.shared_cache_slot_size
+            )
+        self.local_cache_ttl = timedelta(seconds=self.config.local_cache_ttl)
+        self._inflight: dict[UUID, asyncio.Task] = {}
+        self._missing: OrderedDict[UUID, float] = OrderedDict()
+        self._negative_window = 0
+        self._negative_writes = 0
+        self._refreshing: dict[UUID, asyncio.Task] = {}
+        self._load_time = 0.05
+        self._access_counts: Counter[UUID] = Counter()
+        self._local_expires: dict[UUID, float] = {}
+        self._sketch = CountMinSketch()
+        self._sketch_window_started = time.monotonic()
+        self._hot_keys: dict[UUID, int] = {}
+        self.metrics = CacheMetrics()
 
     async def get_user(self, user_id: UUID) -> Optional[User]:
-        cached_user = self.identity_map.get(user_id)
+        self._record_access(user_id)
+        cached_user = self._get_local(user_id)
         if cached_user:
             logger.debug(f"User {user_id} found in Identity Map")
             return cached_user
 
-        redis_user_data = await self.redis.get_user(user_id)
-        if redis_user_data:
-            redis_user = UserMapper().to_domain(data=redis_user_data)
-        else:
-            redis_user = None
+        shared_user = self._get_shared(user_id)
+        if shared_user:
+            return shared_user
 
+        redis_user, _ = await self._get_redis_user(user_id)
         if redis_user:
-            logger.debug(f"User {user_id} found in Redis")
-            if hasattr(redis_user, '__dict__'):
-                self.identity_map.add(redis_user)
             return redis_user
 
         logger.debug(f"User {user_id} not found in cache")
         return None
 
-    async def set_user(self, user_id: UUID, user_data: dict) -> bool:
+    async def _get_redis_user(self, user_id: UUID) -> tuple[Optional[User], Optional[CachedUserEntry]]:
+        replicas = self.config.hot_key_replicas if self.is_hot(user_id) else 0
+        replica = random.randint(0, replicas)
+        entry = await self.redis.get_user_entry(user_id, replica)
+        if replica and entry is None:
+            entry = await self.redis.get_user_entry(user_id)
+            if isinstance(entry, CachedUserEntry):
+                await self.redis.set_user_entry(
+                    user_id,
+                    entry.data,
+                    expires_at=entry.expires_at,
+                    delta=entry.delta,
+                    ttl=max(int(entry.expires_at - time.time()), 1) + self.config.stale_ttl,
+                    replicas=replicas
+                )
+
+        if entry == MISSING_USER:
+            logger.debug(f"User {user_id} is marked missing in Redis")
+            self._remember_missing(user_id)
+            return None, None
+
+        if not entry:
+            return None, None
+
+        redis_user = UserMapper().to_domain(data=entry.data)
+        logger.debug(f"User {user_id} found in Redis")
+        self._store_local(redis_user)
+        self._store_shared(user_id, entry.data)
+        return self.identity_map.get(user_id) or redis_user, entry
+
+    async def get_or_load(
+            self,
+            user_id: UUID,
+            loader: Callable[[UUID], Awaitable[Optional[dict]]]
+    ) -> Optional[User]:
+        self._record_access(user_id)
+        cached_user = self._get_local(user_id)
+        if cached_user:
+            logger.debug(f"User {user_id} found in Identity Map")
+            return cached_user
+
+        if self.is_known_missing(user_id):
+            logger.debug(f"User {user_id} is marked missing in Identity Map")
+            return None
+
+        task = self._inflight.get(user_id)
+        if task is None:
+            task = asyncio.ensure_future(self._load_user(user_id, loader))
+            self._inflight[user_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(user_id, None))
+        else:
+            logger.debug(f"Joining in-flight load for user {user_id}")
+
+        return await asyncio.shield(task)
+
+    async def get_or_load_many(
+            self,
+            user_ids: list[UUID],
+            loader_many: Callable[[list[UUID]], Awaitable[list[dict]]]
+    ) -> dict[UUID, User]:
+        users: dict[UUID, User] = {}
+        pending: list[UUID] = []
+        for user_id in dict.fromkeys(user_ids):
+            self._record_access(user_id)
+            cached_user = self._get_local(user_id) or self._get_shared(user_id)
+            if cached_user:
+                users[user_id] = cached_user
+            elif not self.is_known_missing(user_id):
+                pending.append(user_id)
+
+        if not pending:
+            return users
+
+        entries = await self.redis.get_user_entries(pending)
+        for user_id, entry in entries.items():
+            self._store_local(UserMapper().to_domain(entry.data))
+            self._store_shared(user_id, entry.data)
+            users[user_id] = self.identity_map.get(user_id)
+
+        missing_ids = [user_id for user_id in pending if user_id not in entries]
+        if not missing_ids:
+            return users
+
+        started = time.monotonic()
+        rows = await loader_many(missing_ids)
+        self._load_time = 0.8 * self._load_time + 0.2 * (time.monotonic() - started)
+
+        for row in rows:
+            user_id = UUID(str(row["user_id"]))
+            users[user_id] = await self._cache_loaded_user(user_id, row)
+
+        for user_id in missing_ids:
+            if user_id not in users:
+                await self.set_missing(user_id)
+
+        logger.debug(
+            f"Batch lookup of {len(pending)} users: {len(entries)} from Redis, {len(rows)} from database"
+        )
+        return users
+
+    async def _load_user(
+            self,
+            user_id: UUID,
+            loader: Callable[[UUID], Awaitable[Optional[dict]]]
+    ) -> Optional[User]:
+        cached_user = self._get_local(user_id)
+        if cached_user:
+            return cached_user
+
+        shared_user = self._get_shared(user_id)
+        if shared_user:
+            return shared_user
+
+        redis_user, entry = await self._get_redis_user(user_id)
+        if redis_user:
+            self._schedule_refresh_if_due(user_id, entry, loader)
+            return redis_user
+
+        if self.is_known_missing(user_id):
+            return None
+
+        return await self._refresh_user(user_id, loader)
+
+    async def _refresh_user(
+            self,
+            user_id: UUID,
+            loader: Callable[[UUID], Awaitable[Optional[dict]]]
+    ) -> Optional[User]:
+        user_data = await self._load_row(user_id, loader)
+        if not user_data:
+            await self.set_missing(user_id)
+            return None
+
+        return await self._cache_loaded_user(user_id, user_data)
+
+    async def _cache_loaded_user(self, user_id: UUID, user_data: dict) -> User:
+        user = UserMapper().to_domain(user_data)
+        if await self._write_user(user_id, user, user_data) is False:
+            newer_user, _ = await self._get_redis_user(user_id)
+            return newer_user or user
+        return user
+
+    async def _load_row(
+            self,
+            user_id: UUID,
+            loader: Callable[[UUID], Awaitable[Optional[dict]]]
+    ) -> Optional[dict]:
+        started = time.monotonic()
+        user_data = await loader(user_id)
+        self._load_time = 0.8 * self._load_time + 0.2 * (time.monotonic() - started)
+        return user_data
+
+    def _schedule_refresh_if_due(
+            self,
+            user_id: UUID,
+            entry: CachedUserEntry,
+            loader: Callable[[UUID], Awaitable[Optional[dict]]]
+    ) -> None:
+        now = time.time()
+        if now >= entry.expires_at:
+            self.metrics.stale_served += 1
+        elif now - entry.delta * self.config.early_refresh_beta * math.log(1.0 - random.random()) >= entry.expires_at:
+            self.metrics.early_refreshes += 1
+        else:
+            return
+
+        if user_id in self._refreshing:
+            return
+
+        task = asyncio.ensure_future(self._background_refresh(user_id, loader))
+        self._refreshing[user_id] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(user_id, None))
+
+    async def _background_refresh(
+            self,
+            user_id: UUID,
+            loader: Callable[[UUID], Awaitable[Optional[dict]]]
+    ) -> None:
+        self.metrics.refreshes += 1
+        try:
+            user_data = await self._load_row(user_id, loader)
+        except Exception as e:
+            self.metrics.refresh_failures += 1
+            logger.error(f"Background refresh failed for user {user_id}, serving cached entry: {e}")
+            return
+
+        if user_data:
+            await self.set_user(user_id, user_data)
+        else:
+            await self.invalidate_user(user_id)
+            await self.set_missing(user_id)
+
+    def _record_access(self, user_id: UUID) -> None:
+        self._access_counts[user_id] += 1
+        if len(self._access_counts) > self.config.hot_set_size * 10:
+            self._access_counts = Counter(dict(self._access_counts.most_common(self.config.hot_set_size)))
+
+        now = time.monotonic()
+        if now - self._sketch_window_started >= self.config.hot_key_window:
+            self._sketch.decay()
+            self._sketch_window_started = now
+            self._hot_keys = {
+                hot_id: estimate for hot_id in self._hot_keys
+                if (estimate := self._sketch.estimate(str(hot_id))) >= self.config.hot_key_threshold
+            }
+
+        estimate = self._sketch.add(str(user_id))
+        if estimate < self.config.hot_key_threshold:
+            return
+
+        if user_id not in self._hot_keys:
+            if len(self._hot_keys) >= self.config.hot_key_max_entries:
+                return
+            logger.info(f"User {user_id} detected as hot key ({estimate} recent reads)")
+            if user_id in self._local_expires:
+                self._local_expires[user_id] = now + self.config.hot_key_local_ttl
+        self._hot_keys[user_id] = estimate
+
+    def is_hot(self, user_id: UUID) -> bool:
+        return user_id in self._hot_keys
+
+    def hot_keys_snapshot(self) -> list[dict[str, Any]]:
+        return [
+            {"user_id": str(user_id), "estimated_reads": estimate}
+            for user_id, estimate in sorted(self._hot_keys.items(), key=lambda item: item[1], reverse=True)
+        ]
+
+    def _get_local(self, user_id: UUID) -> Optional[User]:
+        cached_user = self.identity_map.get(user_id)
+        if cached_user and self._local_expires.get(user_id, math.inf) < time.monotonic():
+            self.identity_map.remove(user_id)
+            self._local_expires.pop(user_id, None)
+            return None
+        return cached_user
+
+    def _get_shared(self, user_id: UUID) -> Optional[User]:
+        if self.shared is None:
+            return None
+
         try:
-            self.identity_map.add(UserMapper().to_domain(user_data))
+            user_data = self.shared.get(user_id)
+        except Exception as e:
+            logger.error(f"Shared memory cache read failed for user {user_id}: {e}")
+            return None
 
-            ttl = 3600
-            success = await self.redis.set_user(user_id, user_data, ttl)
+        if not user_data:
+            return None
 
-            if success:
-                logger.debug(f"User {user_id} cached in Redis")
-            else:
-                logger.warning(f"Failed to cache user {user_id} in Redis")
+        logger.debug(f"User {user_id} found in shared memory cache")
+        self._store_local(UserMapper().to_domain(user_data))
+        return self.identity_map.get(user_id)
 
-            return success
+    def _store_shared(self, user_id: UUID, user_data: dict) -> None:
+        if self.shared is None:
+            return
+
+        try:
+            self.shared.set(user_id, user_data, self.local_cache_ttl.total_seconds())
+        except Exception as e:
+            logger.error(f"Shared memory cache write failed for user {user_id}: {e}")
+
+    def _store_local(self, user: User) -> None:
+        user.freeze()
+        if self.identity_map.add_if_newer(user):
+            ttl = self.config.hot_key_local_ttl if self.is_hot(user.id) else self.local_cache_ttl.total_seconds()
+            self._local_expires[user.id] = time.monotonic() + ttl
+
+    async def persist_hot_set(self) -> bool:
+        scores = {user_id: 1.0 for user_id in self.identity_map.get_all()}
+        for user_id, count in self._access_counts.most_common(self.config.hot_set_size):
+            scores[user_id] = float(count)
+
+        success = await self.redis.save_hot_users(scores)
+        if success:
+            logger.info(f"Persisted hot set of {len(scores)} users")
+        return success
+
+    async def warm_up(self, loader_many: Callable[[list[UUID]], Awaitable[list[dict]]]) -> int:
+        user_ids = await self.redis.get_hot_users(self.config.hot_set_size)
+        if not user_ids:
+            return 0
+
+        entries = await self.redis.get_user_entries(user_ids)
+        for entry in entries.values():
+            self._store_local(UserMapper().to_domain(entry.data))
+
+        missing_ids = [user_id for user_id in user_ids if user_id not in entries]
+        batch_size = self.config.warmup_batch_size
+        semaphore = asyncio.Semaphore(self.config.warmup_concurrency)
+
+        async def load_batch(batch: list[UUID]) -> int:
+            async with semaphore:
+                try:
+                    rows = await loader_many(batch)
+                except Exception as e:
+                    logger.error(f"Warm-up batch of {len(batch)} users failed: {e}")
+                    return 0
+
+            for row in rows:
+                await self.set_user(UUID(str(row["user_id"])), row)
+            return len(rows)
+
+        loaded = await asyncio.gather(*(
+            load_batch(missing_ids[i:i + batch_size]) for i in range(0, len(missing_ids), batch_size)
+        ))
+
+        warmed = len(entries) + sum(loaded)
+        logger.info(f"Cache warmed with {warmed} of {len(user_ids)} hot users")
+        return warmed
+
+    def is_known_missing(self, user_id: UUID) -> bool:
+        expires_at = self._missing.get(user_id)
+        if expires_at is None:
+            return False
+
+        if expires_at < time.monotonic():
+            self._missing.pop(user_id, None)
+            return False
+
+        return True
+
+    def _remember_missing(self, user_id: UUID) -> None:
+        self._missing[user_id] = time.monotonic() + self.config.negative_local_ttl
+        self._missing.move_to_end(user_id)
+        while len(self._missing) > self.config.negative_cache_max_entries:
+            self._missing.popitem(last=False)
+
+    def forget_missing(self, user_id: UUID) -> None:
+        self._missing.pop(user_id, None)
+
+    def _take_negative_write_budget(self) -> bool:
+        window = int(time.monotonic())
+        if window != self._negative_window:
+            self._negative_window = window
+            self._negative_writes = 0
+
+        if self._negative_writes >= self.config.negative_cache_writes_per_second:
+            return False
+
+        self._negative_writes += 1
+        return True
+
+    async def set_missing(self, user_id: UUID) -> bool:
+        self._remember_missing(user_id)
+
+        if not self._take_negative_write_budget():
+            logger.debug(f"Negative cache budget exhausted, user {user_id} marked missing locally only")
+            return False
+
+        return await self.redis.set_missing_user(user_id, self.config.negative_ttl)
+
+    async def set_user(self, user_id: UUID, user_data: dict) -> bool:
+        try:
+            return bool(await self._write_user(user_id, UserMapper().to_domain(user_data), user_data))
         except Exception as e:
             logger.error(f"Error caching user {user_id}: {e}")
             return False
 
+    async def _write_user(self, user_id: UUID, user: User, user_data: dict) -> Optional[bool]:
+        self.forget_missing(user_id)
+
+        ttl = self.config.default_ttl * (1 + random.uniform(-self.config.ttl_jitter, self.config.ttl_jitter))
+        written = await self.redis.set_user_entry(
+            user_id,
+            user_data,
+            expires_at=time.time() + ttl,
+            delta=self._load_time,
+            ttl=int(ttl) + self.config.stale_ttl,
+            replicas=self.config.hot_key_replicas if self.is_hot(user_id) else 0
+        )
+
+        if written is False:
+            logger.debug(f"Newer version of user {user_id} already cached, skipping")
+            return False
+
+        if written:
+            logger.debug(f"User {user_id} cached in Redis")
+        else:
+            logger.warning(f"Failed to cache user {user_id} in Redis")
+
+        self._store_local(user)
+        self._store_shared(user_id, user_data)
+        return written
+
+    async def get_user_version(self, user_id: UUID) -> Optional[int]:
+        if self.redis.available:
+            return await self.redis.get_user_version(user_id)
+
+        cached_user = self._get_local(user_id)
+        return cached_user.version if cached_user else None
+
+    async def update_user(self, user: User, user_data: dict) -> bool:
+        await self.responses.invalidate(user.id, user.expected_version)
+
+        groups = changed_field_groups(user)
+        if self.config.field_level_storage and groups and not self.is_hot(user.id):
+            self.forget_missing(user.id)
+            self._store_local(UserMapper().to_domain(user_data))
+            self._store_shared(user.id, user_data)
+
+            if await self.redis.patch_user_fields(user.id, user_data, groups, user.expected_version):
+                logger.debug(f"User {user.id} patched in Redis: {sorted(groups)}")
+                return True
+
+        await self.invalidate_user(user.id)
+        return await self.set_user(user.id, user_data)
+
+    async def get_user_fields(self, user_id: UUID, groups: set[str]) -> Optional[dict]:
+        cached_user = self._get_local(user_id)
+        if cached_user:
+            user_data = UserMapper().to_persistence(cached_user)
+            return {
+                name: user_data[name]
+                for group in groups for name in USER_FIELD_GROUPS[group]
+            } | {"version": user_data["version"]}
+
+        return await self.redis.get_user_fields(user_id, groups)
+
     async def invalidate_user(self, user_id: UUID) -> bool:
         try:
+            self.forget_missing(user_id)
             self.identity_map.remove(user_id)
+            self._local_expires.pop(user_id, None)
+            self.responses.forget_local(user_id)
+            if self.shared is not None:
+                self.shared.delete(user_id)
 
             success = await self.redis.delete_user(user_id)
 
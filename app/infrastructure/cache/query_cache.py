@@ -0,0 +1,98 @@
+from hashlib import sha1
+from typing import Optional, Any, Awaitable, Callable
+from uuid import UUID
+import json
+import logging
+from LuminUserService.app.infrastructure.cache.redis_cache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+ALL_QUERIES_TAG = "users"
+TAGGED_ATTRIBUTES = ("status", "language_code")
+
+
+def query_tags(params: dict[str, Any]) -> list[str]:
+    tags = []
+    for attribute in TAGGED_ATTRIBUTES:
+        if params.get(attribute) is not None:
+            tags.extend((attribute, f"{attribute}={params[attribute]}"))
+    return tags or [ALL_QUERIES_TAG]
+
+
+def changed_query_tags(before: Optional[dict], after: Optional[dict]) -> list[str]:
+    if before is None and after is None:
+        return []
+
+    if before is None or after is None:
+        row = before if after is None else after
+        return [ALL_QUERIES_TAG] + [
+            f"{attribute}={row[attribute]}" for attribute in TAGGED_ATTRIBUTES
+            if row.get(attribute) is not None
+        ]
+
+    tags = []
+    for attribute in TAGGED_ATTRIBUTES:
+        if before.get(attribute) != after.get(attribute):
+            tags.extend(
+                f"{attribute}={value}" for value in (before.get(attribute), after.get(attribute))
+                if value is not None
+            )
+    return tags
+
+
+class QueryCache:
+    def __init__(self, redis_cache: RedisCache):
+        self.redis = redis_cache
+        self.config = redis_cache.config
+
+    @staticmethod
+    def fingerprint(name: str, params: dict[str, Any]) -> str:
+        normalized = {key: value for key, value in params.items() if value is not None}
+        payload = json.dumps([name, normalized], sort_keys=True, default=str, separators=(",", ":"))
+        return sha1(payload.encode()).hexdigest()
+
+    @staticmethod
+    def _key(fingerprint: str) -> str:
+        return f"query:{fingerprint}"
+
+    async def get(self, name: str, params: dict[str, Any]) -> Optional[list[UUID]]:
+        user_ids = await self.redis.get(self._key(self.fingerprint(name, params)))
+        if user_ids is None:
+            return None
+        return [UUID(user_id) for user_id in user_ids]
+
+    async def set(self, name: str, params: dict[str, Any], user_ids: list[UUID]) -> bool:
+        key = self._key(self.fingerprint(name, params))
+        ttl = self.config.query_cache_ttl
+        if not await self.redis.set(key, [str(user_id) for user_id in user_ids], ttl):
+            return False
+        return await self.redis.add_to_tags(key, query_tags(params), ttl)
+
+    async def get_or_load(
+            self,
+            name: str,
+            params: dict[str, Any],
+            loader: Callable[[], Awaitable[list[UUID]]]
+    ) -> list[UUID]:
+        user_ids = await self.get(name, params)
+        if user_ids is not None:
+            logger.debug(f"Query {name} {params} served from cache")
+            return user_ids
+
+        user_ids = await loader()
+        await self.set(name, params, user_ids)
+        return user_ids
+
+    async def invalidate_tags(self, tags: list[str]) -> int:
+        if not tags:
+            return 0
+
+        invalidated = await self.redis.invalidate_tags(tags)
+        logger.debug(f"Invalidated {invalidated} cached queries for tags {tags}")
+        return invalidated
+
+    async def invalidate_all(self) -> int:
+        return await self.invalidate_tags([ALL_QUERIES_TAG, *TAGGED_ATTRIBUTES])
+
+    async def invalidate_changes(self, before: Optional[dict], after: Optional[dict]) -> int:
+        return await self.invalidate_tags(changed_query_tags(before, after))
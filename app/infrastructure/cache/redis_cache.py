@@ -1,12 +1,78 @@
-import pickle
-from typing import Optional, Any
+from collections import OrderedDict
+import asyncio
+import random
+import time
+from typing import Optional, Any, Awaitable, Set
 from uuid import UUID
 import redis.asyncio as redis
-from dataclasses import dataclass
+from redis.asyncio.cluster import ClusterNode, RedisCluster
+from dataclasses import dataclass, field
 import logging
+from LuminUserService.app.infrastructure.cache.circuit_breaker import CLOSED, OPEN, CircuitBreaker, CircuitOpenError
+from LuminUserService.app.infrastructure.cache.codec import ValueCodec
+from LuminUserService.app.infrastructure.cache.hash_ring import HashRing
 
 logger = logging.getLogger(__name__)
 
+MISSING_USER = "__missing_user__"
+
+SET_MISSING_USER_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('HSET', KEYS[1], 'm', 1)
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+SET_USER_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'v')
+if current and tonumber(current) > tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], 'v', ARGV[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+PATCH_USER_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'v')
+if not current or tonumber(current) ~= tonumber(ARGV[1]) then
+    redis.call('DEL', KEYS[1])
+    return 0
+end
+redis.call('HSET', KEYS[1], 'v', ARGV[2], unpack(ARGV, 3))
+return 1
+"""
+
+USER_KEY_VERSION = "v2"
+
+USER_FIELD_GROUPS = {
+    "identity": ("user_id", "first_name", "last_name", "status"),
+    "contact": ("date", "phone", "email"),
+    "profile": ("language_code", "bio", "avatar_url"),
+    "privacy": (
+        "profile_avatar_visibility_for_contacts",
+        "profile_avatar_visibility_for_all_users",
+        "profile_avatar_visibility_black_list",
+        "profile_avatar_visibility_white_list",
+        "profile_date_of_born_visibility_for_contacts",
+        "profile_date_of_born_visibility_for_all_users",
+        "profile_date_of_born_visibility_black_list",
+        "profile_date_of_born_visibility_white_list",
+        "profile_phone_number_visibility_for_contacts",
+        "profile_phone_number_visibility_for_all_users",
+        "profile_phone_number_visibility_black_list",
+        "profile_phone_number_visibility_white_list",
+        "profile_email_address_visibility_for_contacts",
+        "profile_email_address_visibility_for_all_users",
+        "profile_email_address_visibility_black_list",
+        "profile_email_address_visibility_white_list",
+    ),
+    "views": ("profile_views",),
+}
+
 
 @dataclass
 class CacheConfig:
@@ -16,27 +82,113 @@ class CacheConfig:
     db: int = 0
     default_ttl: int = 3600
     key_prefix: str = "user_service:"
+    negative_ttl: int = 30
+    negative_local_ttl: int = 5
+    negative_cache_max_entries: int = 10000
+    negative_cache_writes_per_second: int = 100
+    ttl_jitter: float = 0.1
+    stale_ttl: int = 300
+    early_refresh_beta: float = 1.0
+    field_level_storage: bool = False
+    response_cache_max_entries: int = 10000
+    query_cache_ttl: int = 60
+    hot_set_size: int = 1000
+    hot_set_ttl: int = 7 * 24 * 3600
+    warmup_batch_size: int = 100
+    warmup_concurrency: int = 4
+    hot_key_threshold: int = 1000
+    hot_key_window: float = 10.0
+    hot_key_max_entries: int = 100
+    hot_key_local_ttl: int = 1800
+    hot_key_replicas: int = 0
+    local_cache_ttl: int = 300
+    compression_codec: str = "zstd"
+    compression_threshold: int = 1024
+    compression_level: int = 3
+    compression_dictionary_path: Optional[str] = None
+    shared_cache_path: Optional[str] = None
+    shared_cache_slots: int = 16384
+    shared_cache_slot_size: int = 4096
+    cluster_nodes: list[str] = field(default_factory=list)
+    shard_nodes: list[str] = field(default_factory=list)
+    replica_nodes: dict[str, list[str]] = field(default_factory=dict)
+    read_from_replicas: bool = False
+    max_connections_per_node: int = 50
+    operation_timeout: float = 0.05
+    bulk_operation_timeout: float = 1.0
+    breaker_window_size: int = 50
+    breaker_failure_rate: float = 0.5
+    breaker_minimum_calls: int = 10
+    breaker_open_seconds: float = 5.0
+    breaker_half_open_probes: int = 3
+    pending_invalidations_max_entries: int = 10000
+
+
+@dataclass
+class CachedUserEntry:
+    data: dict
+    expires_at: float
+    delta: float
 
 
 class RedisCache:
     def __init__(self, config: CacheConfig):
         self.config = config
-        self._client: Optional[redis.Redis] = None
+        self._client: Optional[redis.Redis | RedisCluster] = None
+        self._nodes: dict[str, redis.Redis] = {}
+        self._replicas: dict[str, list[redis.Redis]] = {}
+        self._ring: Optional[HashRing] = None
         self._connected = False
+        self.codec = ValueCodec(
+            codec=config.compression_codec,
+            threshold=config.compression_threshold,
+            level=config.compression_level,
+            dictionary_path=config.compression_dictionary_path
+        )
+        self.breaker = CircuitBreaker(
+            "redis",
+            window_size=config.breaker_window_size,
+            failure_rate_threshold=config.breaker_failure_rate,
+            minimum_calls=config.breaker_minimum_calls,
+            open_seconds=config.breaker_open_seconds,
+            half_open_probes=config.breaker_half_open_probes
+        )
+        self._set_missing_user_script = None
+        self._set_user_script = None
+        self._patch_user_script = None
+        self._pending_invalidations: OrderedDict[str, bool] = OrderedDict()
+        self._replaying: Optional[asyncio.Task] = None
 
     async def connect(self) -> None:
         if not self._connected:
-            self._client = redis.Redis(
-                host=self.config.host,
-                port=self.config.port,
-                password=self.config.password,
-                db=self.config.db,
-                decode_responses=False,
-                socket_connect_timeout=5,
-                socket_keepalive=True
-            )
+            if self.config.cluster_nodes:
+                self._client = RedisCluster(
+                    startup_nodes=[ClusterNode(*self._parse_node(node)) for node in self.config.cluster_nodes],
+                    password=self.config.password,
+                    decode_responses=False,
+                    read_from_replicas=self.config.read_from_replicas,
+                    max_connections=self.config.max_connections_per_node,
+                    socket_connect_timeout=5,
+                    socket_keepalive=True
+                )
+                self._nodes = {"cluster": self._client}
+                self._ring = None
+            else:
+                nodes = self.config.shard_nodes or [f"{self.config.host}:{self.config.port}"]
+                self._nodes = {node: self._create_client(node) for node in nodes}
+                if self.config.read_from_replicas:
+                    self._replicas = {
+                        node: [self._create_client(replica) for replica in self.config.replica_nodes.get(node, [])]
+                        for node in nodes
+                    }
+                self._ring = HashRing(nodes)
+                self._client = self._nodes[nodes[0]]
+
+            self._set_missing_user_script = self._client.register_script(SET_MISSING_USER_SCRIPT)
+            self._set_user_script = self._client.register_script(SET_USER_SCRIPT)
+            self._patch_user_script = self._client.register_script(PATCH_USER_SCRIPT)
             try:
-                await self._client.ping()
+                await asyncio.gather(*(client.ping() for client in self._all_clients()))
                 self._connected = True
                 logger.info("✅ Redis connected successfully")
             except Exception as e:
@@ -45,74 +197,446 @@ class RedisCache:
 
     async def disconnect(self) -> None:
         if self._client and self._connected:
-            await self._client.close()
+            for client in self._all_clients():
+                await client.close()
             self._connected = False
 
+    def _create_client(self, node: str) -> redis.Redis:
+        host, port = self._parse_node(node)
+        return redis.Redis(
+            host=host,
+            port=port,
+            password=self.config.password,
+            db=self.config.db,
+            decode_responses=False,
+            max_connections=self.config.max_connections_per_node,
+            socket_connect_timeout=5,
+            socket_keepalive=True
+        )
+
+    @staticmethod
+    def _parse_node(node: str) -> tuple[str, int]:
+        host, _, port = node.rpartition(":")
+        return host, int(port)
+
+    def _all_clients(self) -> list[redis.Redis | RedisCluster]:
+        clients = list(self._nodes.values())
+        for replicas in self._replicas.values():
+            clients.extend(replicas)
+        return clients
+
+    def _writer(self, full_key: str) -> redis.Redis | RedisCluster:
+        if self._ring is None:
+            return self._client
+        return self._nodes[self._ring.get_node(full_key)]
+
+    def _reader(self, full_key: str) -> redis.Redis | RedisCluster:
+        if self._ring is None:
+            return self._client
+
+        node = self._ring.get_node(full_key)
+        replicas = self._replicas.get(node)
+        if replicas:
+            return random.choice(replicas)
+        return self._nodes[node]
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    @property
+    def available(self) -> bool:
+        return self._connected and self.breaker.state != OPEN
+
+    @property
+    def pending_invalidations(self) -> int:
+        return len(self._pending_invalidations)
+
+    async def _call(self, awaitable: Awaitable, timeout: Optional[float] = None) -> Any:
+        if not self.breaker.allow():
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise CircuitOpenError(f"Circuit {self.breaker.name} is {self.breaker.state}")
+
+        try:
+            result = await asyncio.wait_for(awaitable, timeout or self.config.operation_timeout)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success()
+        self._schedule_replay()
+        return result
+
+    def _defer_invalidation(self, key: str, pattern: bool = False) -> None:
+        self._pending_invalidations[key] = pattern
+        self._pending_invalidations.move_to_end(key)
+        if len(self._pending_invalidations) > self.config.pending_invalidations_max_entries:
+            dropped, _ = self._pending_invalidations.popitem(last=False)
+            logger.warning(f"Too many pending invalidations, dropped {dropped} (it expires with its TTL)")
+
+    def _schedule_replay(self) -> None:
+        if not self._pending_invalidations or self._replaying is not None or self.breaker.state != CLOSED:
+            return
+
+        self._replaying = asyncio.ensure_future(self._replay_invalidations())
+        self._replaying.add_done_callback(self._replay_done)
+
+    def _replay_done(self, task: asyncio.Task) -> None:
+        self._replaying = None
+
+    async def _replay_invalidations(self) -> None:
+        pending, self._pending_invalidations = self._pending_invalidations, OrderedDict()
+        logger.info(f"Replaying {len(pending)} invalidations deferred while Redis was unavailable")
+
+        for key, pattern in pending.items():
+            if pattern:
+                await self.delete_pattern(key)
+            else:
+                await self.delete(key)
+
     def _build_key(self, key: str) -> str:
         return f"{self.config.key_prefix}{key}"
 
     async def get(self, key: str) -> Optional[Any]:
-        if not self._connected:
+        if not self.available:
             return None
 
         try:
             full_key = self._build_key(key)
-            data = await self._client.get(full_key)
+            data = await self._call(self._reader(full_key).get(full_key))
             if data:
-                return pickle.loads(data)
+                return self.codec.loads(data)
             return None
         except Exception as e:
             logger.error(f"Redis get error for key {key}: {e}")
             return None
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
-        if not self._connected:
+        if not self.available:
             return False
 
         try:
             full_key = self._build_key(key)
-            serialized = pickle.dumps(value)
+            serialized = self.codec.dumps(value)
             ttl = ttl or self.config.default_ttl
-            await self._client.setex(full_key, ttl, serialized)
+            await self._call(self._writer(full_key).setex(full_key, ttl, serialized))
             return True
         except Exception as e:
             logger.error(f"Redis set error for key {key}: {e}")
             return False
 
     async def delete(self, key: str) -> bool:
-        if not self._connected:
+        if not self.available:
+            self._defer_invalidation(key)
             return False
 
         try:
             full_key = self._build_key(key)
-            await self._client.delete(full_key)
+            await self._call(self._writer(full_key).delete(full_key))
             return True
         except Exception as e:
             logger.error(f"Redis delete error for key {key}: {e}")
+            self._defer_invalidation(key)
             return False
 
     async def delete_pattern(self, pattern: str) -> bool:
-        if not self._connected:
+        if not self.available:
+            self._defer_invalidation(pattern, pattern=True)
             return False
 
         try:
             full_pattern = self._build_key(pattern)
-            keys = await self._client.keys(full_pattern)
-            if keys:
-                await self._client.delete(*keys)
+            if self._ring is None:
+                keys = await self._call(
+                    self._client.keys(full_pattern, target_nodes=RedisCluster.PRIMARIES),
+                    self.config.bulk_operation_timeout
+                )
+                if keys:
+                    await self._call(self._client.delete(*keys), self.config.bulk_operation_timeout)
+                return True
+
+            for client in self._nodes.values():
+                keys = await self._call(client.keys(full_pattern), self.config.bulk_operation_timeout)
+                if keys:
+                    await self._call(client.delete(*keys), self.config.bulk_operation_timeout)
             return True
         except Exception as e:
             logger.error(f"Redis delete pattern error: {e}")
+            self._defer_invalidation(pattern, pattern=True)
             return False
 
     async def get_user(self, user_id: UUID) -> Optional[dict]:
-        return await self.get(f"user:{user_id}")
+        entry = await self.get_user_entry(user_id)
+        if isinstance(entry, CachedUserEntry):
+            return entry.data
+        return None
 
     async def set_user(self, user_id: UUID, user_data: dict, ttl: Optional[int] = None) -> bool:
-        return await self.set(f"user:{user_id}", user_data, ttl)
+        ttl = ttl or self.config.default_ttl
+        return bool(await self.set_user_entry(user_id, user_data, expires_at=time.time() + ttl, delta=0.0, ttl=ttl))
+
+    @staticmethod
+    def _user_key(user_id: UUID, replica: int = 0) -> str:
+        if replica:
+            return f"user:{user_id}:{USER_KEY_VERSION}:r{replica}"
+        return f"user:{user_id}:{USER_KEY_VERSION}"
+
+    async def get_user_entry(self, user_id: UUID, replica: int = 0) -> CachedUserEntry | str | None:
+        if not self.available:
+            return None
+
+        try:
+            full_key = self._build_key(self._user_key(user_id, replica))
+            return self._parse_user_entry(await self._call(self._reader(full_key).hgetall(full_key)))
+        except Exception as e:
+            logger.error(f"Redis get entry error for user {user_id}: {e}")
+            return None
+
+    async def get_user_entries(self, user_ids: list[UUID]) -> dict[UUID, CachedUserEntry]:
+        if not user_ids or not self.available:
+            return {}
+
+        try:
+            keys = {self._build_key(self._user_key(user_id)): user_id for user_id in user_ids}
+            if self._ring is None:
+                groups = {"cluster": list(keys)}
+            else:
+                groups = self._ring.group_by_node(list(keys))
+
+            async def fetch_group(group_keys: list[str]) -> list:
+                async with self._reader(group_keys[0]).pipeline(transaction=False) as pipe:
+                    for full_key in group_keys:
+                        pipe.hgetall(full_key)
+                    return list(zip(group_keys, await self._call(pipe.execute(), self.config.bulk_operation_timeout)))
+
+            results = await asyncio.gather(*(fetch_group(group_keys) for group_keys in groups.values()))
+
+            entries = {}
+            for full_key, fields in (item for group in results for item in group):
+                user_id = keys[full_key]
+                entry = self._parse_user_entry(fields)
+                if isinstance(entry, CachedUserEntry):
+                    entries[user_id] = entry
+            return entries
+        except Exception as e:
+            logger.error(f"Redis get entries error: {e}")
+            return {}
+
+    def _parse_user_entry(self, fields: dict[bytes, bytes]) -> CachedUserEntry | str | None:
+        if not fields:
+            return None
+        if b"m" in fields:
+            return MISSING_USER
+
+        data = self._decode_user_fields(fields, USER_FIELD_GROUPS)
+        if data is None:
+            return None
+
+        return CachedUserEntry(
+            data=data,
+            expires_at=float(fields[b"x"]),
+            delta=float(fields[b"t"])
+        )
+
+    async def set_user_entry(
+            self,
+            user_id: UUID,
+            user_data: dict,
+            expires_at: float,
+            delta: float,
+            ttl: int,
+            replicas: int = 0
+    ) -> Optional[bool]:
+        if not self.available:
+            return None
+
+        try:
+            mapping = {"x": expires_at, "t": delta}
+            if self.config.field_level_storage:
+                mapping.update(self._encode_user_fields(user_data, USER_FIELD_GROUPS))
+            else:
+                mapping["d"] = self.codec.dumps(user_data)
+
+            args = [user_data.get("version") or 0, ttl]
+            for field, value in mapping.items():
+                args.extend((field, value))
+
+            for replica in range(replicas + 1):
+                full_key = self._build_key(self._user_key(user_id, replica))
+                written = await self._call(
+                    self._set_user_script(keys=[full_key], args=args, client=self._writer(full_key))
+                )
+                if not written and replica == 0:
+                    logger.debug(f"Stale write rejected for user {user_id}")
+                    return False
+            return True
+        except Exception as e:
+            logger.error(f"Redis set entry error for user {user_id}: {e}")
+            return None
+
+    async def patch_user_fields(
+            self,
+            user_id: UUID,
+            user_data: dict,
+            groups: Set[str],
+            expected_version: int
+    ) -> bool:
+        if not self.available:
+            return False
+
+        try:
+            full_key = self._build_key(self._user_key(user_id))
+            fields = self._encode_user_fields(user_data, {group: USER_FIELD_GROUPS[group] for group in groups})
+            args = [expected_version, user_data.get("version") or 0]
+            for field, value in fields.items():
+                args.extend((field, value))
+
+            patched = await self._call(
+                self._patch_user_script(keys=[full_key], args=args, client=self._writer(full_key))
+            )
+            return bool(patched)
+        except Exception as e:
+            logger.error(f"Redis patch error for user {user_id}: {e}")
+            return False
+
+    async def get_user_version(self, user_id: UUID) -> Optional[int]:
+        if not self.available:
+            return None
+
+        try:
+            full_key = self._build_key(self._user_key(user_id))
+            version = await self._call(self._reader(full_key).hget(full_key, "v"))
+            return int(version) if version is not None else None
+        except Exception as e:
+            logger.error(f"Redis get version error for user {user_id}: {e}")
+            return None
+
+    async def get_user_fields(self, user_id: UUID, groups: Set[str]) -> Optional[dict]:
+        if not self.available:
+            return None
+
+        try:
+            full_key = self._build_key(self._user_key(user_id))
+            if self.config.field_level_storage:
+                names = ["v", *(f"g:{group}" for group in groups)]
+            else:
+                names = ["v", "d"]
+
+            values = await self._call(self._reader(full_key).hmget(full_key, names))
+            fields = {name.encode(): value for name, value in zip(names, values) if value is not None}
+            return self._decode_user_fields(fields, {group: USER_FIELD_GROUPS[group] for group in groups})
+        except Exception as e:
+            logger.error(f"Redis get fields error for user {user_id}: {e}")
+            return None
+
+    def _encode_user_fields(self, user_data: dict, groups: dict[str, tuple]) -> dict[str, bytes]:
+        return {
+            f"g:{group}": self.codec.dumps({name: user_data[name] for name in names})
+            for group, names in groups.items()
+        }
+
+    def _decode_user_fields(self, fields: dict[bytes, bytes], groups: dict[str, tuple]) -> Optional[dict]:
+        if b"d" in fields:
+            data = self.codec.loads(fields[b"d"])
+            if len(groups) < len(USER_FIELD_GROUPS):
+                data = {name: data[name] for names in groups.values() for name in names}
+        else:
+            data = {}
+            for group in groups:
+                value = fields.get(f"g:{group}".encode())
+                if value is None:
+                    return None
+                data.update(self.codec.loads(value))
+
+        if b"v" in fields:
+            data["version"] = int(fields[b"v"])
+        return data
+
+    async def set_missing_user(self, user_id: UUID, ttl: int) -> bool:
+        if not self.available:
+            return False
+
+        try:
+            full_key = self._build_key(self._user_key(user_id))
+            await self._call(
+                self._set_missing_user_script(keys=[full_key], args=[ttl], client=self._writer(full_key))
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Redis set missing error for user {user_id}: {e}")
+            return False
+
+    async def save_hot_users(self, scores: dict[UUID, float]) -> bool:
+        if not scores or not self.available:
+            return False
+
+        try:
+            full_key = self._build_key("hot_users")
+            async with self._writer(full_key).pipeline(transaction=False) as pipe:
+                for user_id, score in scores.items():
+                    pipe.zincrby(full_key, score, str(user_id))
+                pipe.zremrangebyrank(full_key, 0, -self.config.hot_set_size - 1)
+                pipe.expire(full_key, self.config.hot_set_ttl)
+                await self._call(pipe.execute(), self.config.bulk_operation_timeout)
+            return True
+        except Exception as e:
+            logger.error(f"Redis save hot users error: {e}")
+            return False
+
+    async def get_hot_users(self, limit: int) -> list[UUID]:
+        if not self.available:
+            return []
+
+        try:
+            full_key = self._build_key("hot_users")
+            members = await self._call(self._reader(full_key).zrevrange(full_key, 0, limit - 1))
+            return [UUID(member.decode()) for member in members]
+        except Exception as e:
+            logger.error(f"Redis get hot users error: {e}")
+            return []
+
+    async def add_to_tags(self, key: str, tags: list[str], ttl: int) -> bool:
+        if not tags or not self.available:
+            return False
+
+        try:
+            for tag in tags:
+                full_key = self._build_key(f"tag:{tag}")
+                async with self._writer(full_key).pipeline(transaction=False) as pipe:
+                    pipe.sadd(full_key, key)
+                    pipe.expire(full_key, ttl, gt=True)
+                    pipe.expire(full_key, ttl, nx=True)
+                    await self._call(pipe.execute())
+            return True
+        except Exception as e:
+            logger.error(f"Redis tag error for key {key}: {e}")
+            return False
+
+    async def invalidate_tags(self, tags: list[str]) -> int:
+        if not tags or not self.available:
+            return 0
+
+        try:
+            keys: Set[str] = set()
+            for tag in tags:
+                full_key = self._build_key(f"tag:{tag}")
+                async with self._writer(full_key).pipeline(transaction=True) as pipe:
+                    pipe.smembers(full_key)
+                    pipe.delete(full_key)
+                    members, _ = await self._call(pipe.execute())
+                keys.update(member.decode() for member in members)
+
+            for key in keys:
+                full_key = self._build_key(key)
+                await self._call(self._writer(full_key).delete(full_key))
+            return len(keys)
+        except Exception as e:
+            logger.error(f"Redis tag invalidation error for tags {tags}: {e}")
+            return 0
 
     async def delete_user(self, user_id: UUID) -> bool:
-        return await self.delete(f"user:{user_id}")
+        return await self.delete(self._user_key(user_id))
 
     async def invalidate_user_cache(self, user_id: UUID) -> bool:
         await self.delete_user(user_id)
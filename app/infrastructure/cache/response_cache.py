@@ -0,0 +1,52 @@
+from collections import OrderedDict
+from typing import Optional
+from uuid import UUID
+import logging
+from LuminUserService.app.infrastructure.cache.redis_cache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+
+class UserResponseCache:
+    def __init__(self, redis_cache: RedisCache):
+        self.redis = redis_cache
+        self.config = redis_cache.config
+        self._local: OrderedDict[tuple[UUID, int], bytes] = OrderedDict()
+
+    @staticmethod
+    def etag(version: int) -> str:
+        return f'"{version}"'
+
+    @staticmethod
+    def _key(user_id: UUID, version: int) -> str:
+        return f"user:{user_id}:response:{version}"
+
+    async def get(self, user_id: UUID, version: int) -> Optional[bytes]:
+        body = self._local.get((user_id, version))
+        if body is not None:
+            self._local.move_to_end((user_id, version))
+            return body
+
+        body = await self.redis.get(self._key(user_id, version))
+        if body is not None:
+            self._remember(user_id, version, body)
+        return body
+
+    async def set(self, user_id: UUID, version: int, body: bytes) -> bool:
+        self._remember(user_id, version, body)
+        return await self.redis.set(self._key(user_id, version), body, self.config.default_ttl)
+
+    async def invalidate(self, user_id: UUID, version: int) -> None:
+        self.forget_local(user_id)
+        await self.redis.delete(self._key(user_id, version))
+        logger.debug(f"Response cache invalidated for user {user_id} version {version}")
+
+    def forget_local(self, user_id: UUID) -> None:
+        for key in [key for key in self._local if key[0] == user_id]:
+            self._local.pop(key, None)
+
+    def _remember(self, user_id: UUID, version: int, body: bytes) -> None:
+        self._local[(user_id, version)] = body
+        self._local.move_to_end((user_id, version))
+        while len(self._local) > self.config.response_cache_max_entries:
+            self._local.popitem(last=False)
@@ -0,0 +1,157 @@
+from typing import Optional
+from uuid import UUID
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import time
+from LuminUserService.app.infrastructure.cache.codec import ValueCodec
+
+logger = logging.getLogger(__name__)
+
+FILE_HEADER = struct.Struct("<8sII")
+SLOT_HEADER = struct.Struct("<I16sqdI")
+MAGIC = b"LUMUSR01"
+EMPTY_KEY = bytes(16)
+
+
+class SharedMemoryCache:
+    def __init__(
+            self,
+            path: str,
+            codec: ValueCodec,
+            slots: int = 16384,
+            slot_size: int = 4096,
+            probe_limit: int = 8,
+            read_retries: int = 4
+    ):
+        self.path = path
+        self.codec = codec
+        self.slots = slots
+        self.slot_size = slot_size
+        self.probe_limit = probe_limit
+        self.read_retries = read_retries
+        self.max_payload = slot_size - SLOT_HEADER.size
+
+        size = FILE_HEADER.size + slots * slot_size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._lock_fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+
+        with self._write_lock():
+            if os.fstat(self._fd).st_size != size:
+                os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+
+            magic, existing_slots, existing_slot_size = FILE_HEADER.unpack_from(self._map, 0)
+            if (magic, existing_slots, existing_slot_size) != (MAGIC, slots, slot_size):
+                self._map[:] = bytes(size)
+                FILE_HEADER.pack_into(self._map, 0, MAGIC, slots, slot_size)
+                logger.info(f"Shared memory cache initialised at {path} ({slots} slots x {slot_size} bytes)")
+
+    def _write_lock(self):
+        return _FileLock(self._lock_fd)
+
+    def _offset(self, slot: int) -> int:
+        return FILE_HEADER.size + slot * self.slot_size
+
+    def _probe(self, user_id: UUID):
+        start = user_id.int % self.slots
+        for step in range(self.probe_limit):
+            yield (start + step) % self.slots
+
+    def get(self, user_id: UUID) -> Optional[dict]:
+        key = user_id.bytes
+        for slot in self._probe(user_id):
+            offset = self._offset(slot)
+            for _ in range(self.read_retries):
+                seq, slot_key, version, expires_at, length = SLOT_HEADER.unpack_from(self._map, offset)
+                if seq & 1:
+                    continue
+                if slot_key != key:
+                    break
+
+                payload = self._map[offset + SLOT_HEADER.size:offset + SLOT_HEADER.size + length]
+                if SLOT_HEADER.unpack_from(self._map, offset)[0] != seq:
+                    continue
+
+                if expires_at < time.time():
+                    return None
+                return self.codec.loads(payload)
+            else:
+                return None
+
+            if slot_key == EMPTY_KEY:
+                return None
+        return None
+
+    def set(self, user_id: UUID, user_data: dict, ttl: float) -> bool:
+        payload = self.codec.dumps(user_data)
+        if len(payload) > self.max_payload:
+            logger.debug(f"User {user_id} is too large for the shared memory cache ({len(payload)} bytes)")
+            return False
+
+        key = user_id.bytes
+        version = user_data.get("version") or 0
+        with self._write_lock():
+            slot = self._find_slot_for_write(user_id)
+            offset = self._offset(slot)
+            seq, slot_key, current_version, expires_at, _ = SLOT_HEADER.unpack_from(self._map, offset)
+            if slot_key == key and current_version > version and expires_at >= time.time():
+                return False
+
+            self._write_slot(offset, seq, key, version, time.time() + ttl, payload)
+        return True
+
+    def delete(self, user_id: UUID) -> None:
+        key = user_id.bytes
+        with self._write_lock():
+            for slot in self._probe(user_id):
+                offset = self._offset(slot)
+                seq, slot_key, version, _, _ = SLOT_HEADER.unpack_from(self._map, offset)
+                if slot_key == key:
+                    self._write_slot(offset, seq, key, version, 0.0, b"")
+                    return
+                if slot_key == EMPTY_KEY:
+                    return
+
+    def _find_slot_for_write(self, user_id: UUID) -> int:
+        key = user_id.bytes
+        now = time.time()
+        free_slot = None
+        oldest_slot, oldest_expiry = None, None
+
+        for slot in self._probe(user_id):
+            _, slot_key, _, expires_at, _ = SLOT_HEADER.unpack_from(self._map, self._offset(slot))
+            if slot_key == key:
+                return slot
+            if slot_key == EMPTY_KEY:
+                return free_slot if free_slot is not None else slot
+            if free_slot is None and expires_at < now:
+                free_slot = slot
+            if oldest_expiry is None or expires_at < oldest_expiry:
+                oldest_slot, oldest_expiry = slot, expires_at
+
+        return free_slot if free_slot is not None else oldest_slot
+
+    def _write_slot(self, offset: int, seq: int, key: bytes, version: int, expires_at: float, payload: bytes) -> None:
+        struct.pack_into("<I", self._map, offset, seq + 1)
+        SLOT_HEADER.pack_into(self._map, offset, seq + 1, key, version, expires_at, len(payload))
+        self._map[offset + SLOT_HEADER.size:offset + SLOT_HEADER.size + len(payload)] = payload
+        struct.pack_into("<I", self._map, offset, (seq + 2) & 0xFFFFFFFF)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+        os.close(self._lock_fd)
+
+
+class _FileLock:
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def __enter__(self) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
@@ -0,0 +1,30 @@
+from hashlib import blake2b
+
+
+class CountMinSketch:
+    def __init__(self, width: int = 2048, depth: int = 4):
+        self.width = width
+        self.depth = depth
+        self._rows = [[0] * width for _ in range(depth)]
+
+    def _indexes(self, key: str) -> list[int]:
+        digest = blake2b(key.encode(), digest_size=4 * self.depth).digest()
+        return [
+            int.from_bytes(digest[row * 4:row * 4 + 4], "little") % self.width
+            for row in range(self.depth)
+        ]
+
+    def add(self, key: str, count: int = 1) -> int:
+        estimate = None
+        for row, index in zip(self._rows, self._indexes(key)):
+            row[index] += count
+            estimate = row[index] if estimate is None else min(estimate, row[index])
+        return estimate
+
+    def estimate(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def decay(self) -> None:
+        for row in self._rows:
+            for index in range(self.width):
+                row[index] >>= 1
@@ -1,5 +1,6 @@
 from typing import Optional
 from LuminUserService.app.application.commands.activate import ActivateHandler
+from LuminUserService.app.application.commands.batch import BatchCommandHandler
 from LuminUserService.app.application.commands.block import BlockHandler
 from LuminUserService.app.application.commands.change_avatar_url import ChangeAvatarURLHandler
 from LuminUserService.app.application.commands.change_bio import ChangeBioHandler
@@ -16,21 +17,30 @@ from LuminUserService.app.infrastructure.persistanse.identity_map import UserIde
 from LuminUserService.app.infrastructure.cache.multi_level_cache import MultiLevelCache
 from LuminUserService.app.infrastructure.cache.redis_cache import CacheConfig, RedisCache
 from LuminUserService.app.infrastructure.messaging.nats_event_bus import NatsEventBus
+from LuminUserService.app.application.services.command_batcher import CommandBatcher
 from LuminUserService.app.application.services.user_service import UserService
 from LuminUserService.app.application.commands.create import CreateUserHandler
-from LuminUserService.app.application.queries.get_by_id import GetUserByIdHandler
+from LuminUserService.app.application.queries.get_by_id import GetUserByIdHandler, ReadUserByIdHandler
+from LuminUserService.app.infrastructure.persistanse.user_read_repository import UserReadRepository
 
 
 class DependencyContainer:
-    def __init__(self, connection_factory, redis_config: Optional[CacheConfig] = None):
+    def __init__(
+            self,
+            connection_factory,
+            redis_config: Optional[CacheConfig] = None,
+            batch_commands: bool = True
+    ):
         self.connection_factory = connection_factory
         self.redis_config = redis_config or CacheConfig()
+        self.batch_commands = batch_commands
         self._event_bus = None
         self._user_service = None
         self._redis_cache = None
         self._multi_level_cache = None
         self._handlers = {}
         self._identity_map = None
+        self._user_read_repository = None
 
     async def get_redis_cache(self) -> RedisCache:
         if not self._redis_cache:
@@ -61,9 +71,24 @@ class DependencyContainer:
         if not self._user_service:
             cache = await self.get_multi_level_cache()
             self._user_service = UserService(self.connection_factory, cache)
+            if self.batch_commands:
+                self._user_service.batcher = CommandBatcher(self._user_service, await self.get_event_bus())
             print(f"UserService created with connection_factory: {self.connection_factory}")
         return self._user_service
 
+    async def get_user_read_repository(self) -> UserReadRepository:
+        if not self._user_read_repository:
+            cache = await self.get_multi_level_cache()
+            self._user_read_repository = UserReadRepository(self.connection_factory, cache)
+        return self._user_read_repository
+
+    async def get_read_user_by_id_handler(self) -> ReadUserByIdHandler:
+        key = "read_user_by_id"
+        if key not in self._handlers:
+            read_repository = await self.get_user_read_repository()
+            self._handlers[key] = ReadUserByIdHandler(read_repository)
+        return self._handlers[key]
+
     async def get_user_by_id_handler(self) -> GetUserByIdHandler:
         key = "get_user_by_id"
         if key not in self._handlers:
@@ -183,3 +208,11 @@ class DependencyContainer:
             user_service = await self.get_user_service()
             self._handlers[key] = RecordProfileViewHandler(user_service, event_bus)
         return self._handlers[key]
+
+    async def get_batch_command_handler(self) -> BatchCommandHandler:
+        key = "batch_commands"
+        if key not in self._handlers:
+            event_bus = await self.get_event_bus()
+            user_service = await self.get_user_service()
+            self._handlers[key] = BatchCommandHandler(user_service, event_bus)
+        return self._handlers[key]
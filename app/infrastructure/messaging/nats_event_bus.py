@@ -1,21 +1,26 @@
+import asyncio
 import nats
 from nats.aio.msg import Msg
 import json
+from nats.errors import TimeoutError as NatsTimeoutError
 from nats.js.api import ConsumerConfig, DeliverPolicy, AckPolicy
-from typing import Callable, Type
+from typing import Callable, Optional, Type
 from LuminUserService.app.domain.events.domain_event import DomainEvent
 from LuminUserService.app.domain.events.event_bus import EventBus
 from LuminUserService.app.domain.models.aggregates.aggregate_root import AggregateRoot
+from LuminUserService.app.infrastructure.tasks.retry_policy import RetryPolicy, publish_dead_letter
 
 
 class NatsEventBus(EventBus):
-    def __init__(self, nats_url: str = "nats://localhost:4222") -> None:
+    def __init__(self, nats_url: str = "nats://localhost:4222", retry_policy: Optional[RetryPolicy] = None) -> None:
         self.nats_url = nats_url
         self.nc = None
         self.js = None
         self._stream_name = "USERS_EVENTS"
         self._handlers: dict[str, list[Callable]] = {}
         self.stream_subscriptions = {}
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._consumers: dict[str, asyncio.Task] = {}
 
     async def connect(self):
         try:
@@ -70,6 +75,10 @@ class NatsEventBus(EventBus):
                 await msg.ack()
             except Exception as e:
                 print(f"Error handling message: {e}")
+                await self._handle_failure(msg, event_type.__name__, e)
+
+        if subject in self.stream_subscriptions:
+            return
 
         try:
             consumer_config = ConsumerConfig(
@@ -83,9 +92,40 @@ class NatsEventBus(EventBus):
                 durable=consumer_config.durable_name
             )
             self.stream_subscriptions[subject] = sub
+            self._consumers[subject] = asyncio.create_task(self._consume(sub, message_handler))
         except Exception as e:
             print(f"Subscription error: {e}")
 
+    async def _consume(self, subscription, message_handler: Callable) -> None:
+        while True:
+            try:
+                messages = await subscription.fetch(10, timeout=5)
+            except NatsTimeoutError:
+                continue
+            except Exception as e:
+                print(f"Error fetching events: {e}")
+                await asyncio.sleep(5)
+                continue
+
+            for msg in messages:
+                await message_handler(msg)
+
+    async def _handle_failure(self, msg: Msg, event_name: str, error: Exception) -> None:
+        attempt = msg.metadata.num_delivered
+        if self.retry_policy.should_retry(error, attempt):
+            await msg.nak(delay=self.retry_policy.backoff(attempt))
+            return
+
+        try:
+            await publish_dead_letter(
+                self.js, f"events.{event_name}", msg.data, msg.subject, msg.headers, repr(error), attempt
+            )
+        except Exception as e:
+            print(f"Error dead-lettering event {event_name}: {e}")
+            await msg.nak(delay=self.retry_policy.max_delay)
+            return
+        await msg.term()
+
     async def process_events(self, aggregate: AggregateRoot) -> None:
         for event in aggregate.get_domain_events():
             await self.publish(event)
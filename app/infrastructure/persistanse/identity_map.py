@@ -13,13 +13,21 @@ class UserIdentityMap(IdentityMap):
         with self._lock:
             self._map[user.id] = user
 
+    def add_if_newer(self, user: User) -> bool:
+        with self._lock:
+            current = self._map.get(user.id)
+            if current is not None and current.version > user.version:
+                return False
+            self._map[user.id] = user
+            return True
+
     def get(self, user_id: UUID) -> User | None:
         with self._lock:
             return self._map.get(user_id)
 
     def remove(self, user_id: UUID) -> None:
         with self._lock:
-            del self._map[user_id]
+            self._map.pop(user_id, None)
 
     def clear(self) -> None:
         with self._lock:
@@ -1,24 +1,151 @@
+import asyncio
 from uuid import UUID
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_batch
 from LuminUserService.app.domain.models.aggregates.user import User
 from LuminUserService.app.domain.repositories.reposiotries import UserRepository
 from LuminUserService.app.infrastructure.cache.multi_level_cache import MultiLevelCache
 from LuminUserService.app.infrastructure.persistanse.identity_map import UserIdentityMap
+from LuminUserService.app.infrastructure.persistanse.user_loader import current_user_loader
 from LuminUserService.app.infrastructure.persistanse.user_mapper import UserMapper
 
 
+USER_COLUMNS = """
+                user_id,
+                first_name,
+                last_name,
+                date,
+                phone,
+                email,
+                language_code,
+                bio,
+                avatar_url,
+                status,
+                profile_avatar_visibility_for_contacts,
+                profile_avatar_visibility_for_all_users,
+                profile_avatar_visibility_black_list,
+                profile_avatar_visibility_white_list,
+                profile_date_of_born_visibility_for_contacts,
+                profile_date_of_born_visibility_for_all_users,
+                profile_date_of_born_visibility_black_list,
+                profile_date_of_born_visibility_white_list,
+                profile_phone_number_visibility_for_contacts,
+                profile_phone_number_visibility_for_all_users,
+                profile_phone_number_visibility_black_list,
+                profile_phone_number_visibility_white_list,
+                profile_email_address_visibility_for_contacts,
+                profile_email_address_visibility_for_all_users,
+                profile_email_address_visibility_black_list,
+                profile_email_address_visibility_white_list,
+                profile_views,
+                version
+"""
+
+UPDATE_USER_SQL = """
+UPDATE users SET
+    first_name = %s,
+    last_name = %s,
+    date = %s,
+    phone = %s,
+    email = %s,
+    language_code = %s,
+    bio = %s,
+    avatar_url = %s,
+    profile_avatar_visibility_for_contacts = %s,
+    profile_avatar_visibility_for_all_users = %s,
+    profile_avatar_visibility_black_list = %s,
+    profile_avatar_visibility_white_list = %s,
+    profile_date_of_born_visibility_for_contacts = %s,
+    profile_date_of_born_visibility_for_all_users = %s,
+    profile_date_of_born_visibility_black_list = %s,
+    profile_date_of_born_visibility_white_list = %s,
+    profile_phone_number_visibility_for_contacts = %s,
+    profile_phone_number_visibility_for_all_users = %s,
+    profile_phone_number_visibility_black_list = %s,
+    profile_phone_number_visibility_white_list = %s,
+    profile_email_address_visibility_for_contacts = %s,
+    profile_email_address_visibility_for_all_users = %s,
+    profile_email_address_visibility_black_list = %s,
+    profile_email_address_visibility_white_list = %s,
+    status = %s,
+    version = %s,
+    updated_at = CURRENT_TIMESTAMP
+WHERE user_id = %s
+"""
+
+
+def select_user_rows(connection_factory, user_ids: list[UUID]) -> list[dict]:
+    conn = connection_factory()
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+
+    try:
+        select_sql = f"""
+        SELECT {USER_COLUMNS}
+        FROM users 
+        WHERE user_id = ANY(%s::uuid[])
+        """
+
+        cursor.execute(select_sql, ([str(user_id) for user_id in user_ids],))
+        return [dict(row) for row in cursor.fetchall()]
+
+    finally:
+        cursor.close()
+        conn.close()
+
+
+async def fetch_user_rows(connection_factory, user_ids: list[UUID]) -> list[dict]:
+    return await asyncio.to_thread(select_user_rows, connection_factory, user_ids)
+
+
+async def fetch_user_row(connection_factory, user_id: UUID) -> dict | None:
+    rows = await fetch_user_rows(connection_factory, [user_id])
+    return rows[0] if rows else None
+
+
 class PostgresSQLUserRepository(UserRepository):
     def __init__(self, connection_factory, identity_map: UserIdentityMap, cache: MultiLevelCache) -> None:
         self.connection_factory = connection_factory
         self.identity_map = identity_map
         self.mapper = UserMapper()
         self.cache = cache
+        self._snapshots: dict[UUID, User] = {}
 
     def _get_connection(self):
         conn = self.connection_factory()
         cursor = conn.cursor(cursor_factory=RealDictCursor)
         return conn, cursor
 
+    @staticmethod
+    def _update_params(user: User, language_code_value: str) -> tuple:
+        return (
+            user.username.first_name,
+            user.username.last_name,
+            user.date.value if user.date else None,
+            user.phone.value,
+            user.email.value if user.email else None,
+            language_code_value,
+            user.bio.value if user.bio else None,
+            str(user.avatar_url),
+            user.privacy_settings.profile_avatar_visibility_for_contacts,
+            user.privacy_settings.profile_avatar_visibility_for_all_users,
+            user.privacy_settings.profile_avatar_visibility_black_list,
+            user.privacy_settings.profile_avatar_visibility_white_list,
+            user.privacy_settings.profile_date_of_born_visibility_for_contacts,
+            user.privacy_settings.profile_date_of_born_visibility_for_all_users,
+            user.privacy_settings.profile_date_of_born_visibility_black_list,
+            user.privacy_settings.profile_date_of_born_visibility_white_list,
+            user.privacy_settings.profile_phone_number_visibility_for_contacts,
+            user.privacy_settings.profile_phone_number_visibility_for_all_users,
+            user.privacy_settings.profile_phone_number_visibility_black_list,
+            user.privacy_settings.profile_phone_number_visibility_white_list,
+            user.privacy_settings.profile_email_address_visibility_for_contacts,
+            user.privacy_settings.profile_email_address_visibility_for_all_users,
+            user.privacy_settings.profile_email_address_visibility_black_list,
+            user.privacy_settings.profile_email_address_visibility_white_list,
+            user.status,
+            user.version,
+            str(user.id)
+        )
+
     async def save(self, user: User) -> None:
         print(f"Saving user {user.id}")
         print("=" * 50)
@@ -76,67 +203,9 @@ class PostgresSQLUserRepository(UserRepository):
             existing_user = cursor.fetchone()
 
             if existing_user:
-                update_sql = """
-                UPDATE users SET
-                    first_name = %s,
-                    last_name = %s,
-                    date = %s,
-                    phone = %s,
-                    email = %s,
-                    language_code = %s,
-                    bio = %s,
-                    avatar_url = %s,
-                    profile_avatar_visibility_for_contacts = %s,
-                    profile_avatar_visibility_for_all_users = %s,
-                    profile_avatar_visibility_black_list = %s,
-                    profile_avatar_visibility_white_list = %s,
-                    profile_date_of_born_visibility_for_contacts = %s,
-                    profile_date_of_born_visibility_for_all_users = %s,
-                    profile_date_of_born_visibility_black_list = %s,
-                    profile_date_of_born_visibility_white_list = %s,
-                    profile_phone_number_visibility_for_contacts = %s,
-                    profile_phone_number_visibility_for_all_users = %s,
-                    profile_phone_number_visibility_black_list = %s,
-                    profile_phone_number_visibility_white_list = %s,
-                    profile_email_address_visibility_for_contacts = %s,
-                    profile_email_address_visibility_for_all_users = %s,
-                    profile_email_address_visibility_black_list = %s,
-                    profile_email_address_visibility_white_list = %s,
-                    status = %s,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE user_id = %s
-                """
+                user_data = self._update_params(user, language_code_value)
 
-                user_data = (
-                    user.username.first_name,
-                    user.username.last_name,
-                    user.date.value if user.date else None,
-                    user.phone.value,
-                    user.email.value if user.email else None,
-                    language_code_value,
-                    user.bio.value if user.bio else None,
-                    str(user.avatar_url),
-                    user.privacy_settings.profile_avatar_visibility_for_contacts,
-                    user.privacy_settings.profile_avatar_visibility_for_all_users,
-                    user.privacy_settings.profile_avatar_visibility_black_list,
-                    user.privacy_settings.profile_avatar_visibility_white_list,
-                    user.privacy_settings.profile_date_of_born_visibility_for_contacts,
-                    user.privacy_settings.profile_date_of_born_visibility_for_all_users,
-                    user.privacy_settings.profile_date_of_born_visibility_black_list,
-                    user.privacy_settings.profile_date_of_born_visibility_white_list,
-                    user.privacy_settings.profile_phone_number_visibility_for_contacts,
-                    user.privacy_settings.profile_phone_number_visibility_for_all_users,
-                    user.privacy_settings.profile_phone_number_visibility_black_list,
-                    user.privacy_settings.profile_phone_number_visibility_white_list,
-                    user.privacy_settings.profile_email_address_visibility_for_contacts,
-                    user.privacy_settings.profile_email_address_visibility_for_all_users,
-                    user.privacy_settings.profile_email_address_visibility_black_list,
-                    user.privacy_settings.profile_email_address_visibility_white_list,
-                    user.status,
-                    str(user.id)
-                )
-
-                cursor.execute(update_sql, user_data)
+                cursor.execute(UPDATE_USER_SQL, user_data)
                 print(f"User updated: {user.id}")
 
             else:
@@ -190,9 +259,7 @@ class PostgresSQLUserRepository(UserRepository):
 
             conn.commit()
 
-            await self.cache.invalidate_user(user.id)
-            user_dict = self.mapper.to_persistence(user)
-            await self.cache.set_user(user.id, user_dict)
+            await self._publish_saved(user, created=not existing_user)
 
         except Exception as e:
             conn.rollback()
@@ -205,70 +272,123 @@ class PostgresSQLUserRepository(UserRepository):
             conn.close()
 
         self.identity_map.add(user)
+        user.mark_persisted()
         user.clear_domain_events()
 
-    async def get_by_id(self, user_id: UUID) -> User | None:
-        cached_user = await self.cache.get_user(user_id)
+    async def save_many(self, users: list[User]) -> None:
+        if not users:
+            return
 
-        if cached_user:
-            print(f"User {user_id} found in cache")
-            return cached_user
+        try:
+            await asyncio.to_thread(self._update_users, users)
+        except Exception as e:
+            for user in users:
+                await self.cache.invalidate_user(user.id)
+            print(f"Error saving batch of {len(users)} users: {e}")
+            raise
+
+        for user in users:
+            await self._publish_saved(user, created=False)
+            self.identity_map.add(user)
+            user.mark_persisted()
+            user.clear_domain_events()
 
+    def _update_users(self, users: list[User]) -> None:
         conn, cursor = self._get_connection()
 
         try:
-            select_sql = """
-            SELECT 
-                user_id,
-                first_name,
-                last_name,
-                date,
-                phone,
-                email,
-                language_code,
-                bio,
-                avatar_url,
-                status,
-                profile_avatar_visibility_for_contacts,
-                profile_avatar_visibility_for_all_users,
-                profile_avatar_visibility_black_list,
-                profile_avatar_visibility_white_list,
-                profile_date_of_born_visibility_for_contacts,
-                profile_date_of_born_visibility_for_all_users,
-                profile_date_of_born_visibility_black_list,
-                profile_date_of_born_visibility_white_list,
-                profile_phone_number_visibility_for_contacts,
-                profile_phone_number_visibility_for_all_users,
-                profile_phone_number_visibility_black_list,
-                profile_phone_number_visibility_white_list,
-                profile_email_address_visibility_for_contacts,
-                profile_email_address_visibility_for_all_users,
-                profile_email_address_visibility_black_list,
-                profile_email_address_visibility_white_list,
-                profile_views
-            FROM users 
-            WHERE user_id = %s
-            """
+            execute_batch(cursor, UPDATE_USER_SQL, [
+                self._update_params(user, str(user.language_code.value)) for user in users
+            ])
+            conn.commit()
+
+        except Exception:
+            conn.rollback()
+            raise
 
-            cursor.execute(select_sql, (str(user_id),))
-            user_data = cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
 
-            if not user_data:
-                return None
+    async def _publish_saved(self, user: User, created: bool) -> None:
+        user_dict = self.mapper.to_persistence(user)
+        snapshot = self._snapshots.pop(user.id, None) or self.cache.identity_map.get(user.id)
+        await self.cache.update_user(user, user_dict)
 
-            user_dict = dict(user_data)
+        if created:
+            await self.cache.queries.invalidate_changes(None, user_dict)
+        elif snapshot is not None:
+            await self.cache.queries.invalidate_changes(self.mapper.to_persistence(snapshot), user_dict)
+        else:
+            await self.cache.queries.invalidate_all()
 
-            print(user_dict)
+    async def get_by_id(self, user_id: UUID) -> User | None:
+        loader = current_user_loader()
+        if loader is not None:
+            user = await loader.load(user_id)
+        else:
+            user = await self.cache.get_or_load(user_id, self._fetch_user_row)
 
-            user = self.mapper.to_domain(user_dict)
-            await self.cache.set_user(user_id, user_dict)
+        if user:
             self.identity_map.add(user)
 
-            return user
+        return user
 
-        except Exception as e:
-            print(f"Error getting user {user_id}: {e}")
-            return None
+    async def get_for_update(self, user_id: UUID) -> User | None:
+        user = await self.cache.get_or_load(user_id, self._fetch_user_row)
+
+        if user:
+            self._snapshots[user_id] = user
+            user = user.working_copy()
+            self.identity_map.add(user)
+
+        return user
+
+    async def get_many_for_update(self, user_ids: list[UUID]) -> dict[UUID, User]:
+        snapshots = await self.cache.get_or_load_many(user_ids, self.fetch_user_rows)
+
+        users = {}
+        for user_id, snapshot in snapshots.items():
+            self._snapshots[user_id] = snapshot
+            users[user_id] = snapshot.working_copy()
+            self.identity_map.add(users[user_id])
+        return users
+
+    async def _fetch_user_row(self, user_id: UUID) -> dict | None:
+        return await fetch_user_row(self.connection_factory, user_id)
+
+    async def fetch_user_rows(self, user_ids: list[UUID]) -> list[dict]:
+        return await fetch_user_rows(self.connection_factory, user_ids)
+
+    async def find_user_ids(
+            self,
+            status: str | None = None,
+            language_code: str | None = None,
+            limit: int = 100,
+            offset: int = 0
+    ) -> list[UUID]:
+        params = {"status": status, "language_code": language_code, "limit": limit, "offset": offset}
+        return await self.cache.queries.get_or_load(
+            "users_by_attributes",
+            params,
+            lambda: asyncio.to_thread(self._select_user_ids, status, language_code, limit, offset)
+        )
+
+    def _select_user_ids(self, status: str | None, language_code: str | None, limit: int, offset: int) -> list[UUID]:
+        conn, cursor = self._get_connection()
+
+        try:
+            select_sql = """
+            SELECT user_id
+            FROM users
+            WHERE (%s::text IS NULL OR status = %s)
+              AND (%s::text IS NULL OR language_code = %s)
+            ORDER BY user_id
+            LIMIT %s OFFSET %s
+            """
+
+            cursor.execute(select_sql, (status, status, language_code, language_code, limit, offset))
+            return [UUID(str(row["user_id"])) for row in cursor.fetchall()]
 
         finally:
             cursor.close()
@@ -282,7 +402,12 @@ class PostgresSQLUserRepository(UserRepository):
             cursor.execute(delete_sql, (str(user_id),))
             conn.commit()
 
+            snapshot = self.cache.identity_map.get(user_id)
             await self.cache.invalidate_user(user_id)
+            if snapshot is not None:
+                await self.cache.queries.invalidate_changes(self.mapper.to_persistence(snapshot), None)
+            else:
+                await self.cache.queries.invalidate_all()
             self.identity_map.remove(user_id)
 
             print(f"User {user_id} deleted from database and cache")
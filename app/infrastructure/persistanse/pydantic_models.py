@@ -1,6 +1,6 @@
 from uuid import UUID, uuid4
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
 
@@ -86,3 +86,13 @@ class PrivacySettingsUpdate(BaseModel):
     profile_email_address_visibility_for_all_users: bool
     profile_email_address_visibility_black_list: List[str] = []
     profile_email_address_visibility_white_list: List[str] = []
+
+
+class BatchCommandItemModel(BaseModel):
+    user_id: UUID
+    command: str
+    payload: Dict[str, Any] = {}
+
+
+class BatchCommandRequest(BaseModel):
+    items: List[BatchCommandItemModel] = Field(..., min_length=1, max_length=500)
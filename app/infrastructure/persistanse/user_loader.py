@@ -0,0 +1,97 @@
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Optional, AsyncIterator, Awaitable, Callable, Iterator
+from uuid import UUID
+import asyncio
+import logging
+from LuminUserService.app.domain.models.aggregates.user import User
+from LuminUserService.app.infrastructure.cache.multi_level_cache import MultiLevelCache
+
+logger = logging.getLogger(__name__)
+
+_current_loader: ContextVar[Optional["UserLoader"]] = ContextVar("user_loader", default=None)
+
+
+class UserLoader:
+    def __init__(self, cache: MultiLevelCache, loader_many: Callable[[list[UUID]], Awaitable[list[dict]]]):
+        self.cache = cache
+        self.loader_many = loader_many
+        self._results: dict[UUID, asyncio.Future] = {}
+        self._queue: list[UUID] = []
+        self._dispatch_scheduled = False
+        self.batches = 0
+
+    def load(self, user_id: UUID) -> Awaitable[Optional[User]]:
+        future = self._results.get(user_id)
+        if future is not None:
+            return asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._results[user_id] = future
+        self._queue.append(user_id)
+
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._dispatch)
+        return asyncio.shield(future)
+
+    async def load_many(self, user_ids: list[UUID]) -> list[Optional[User]]:
+        return list(await asyncio.gather(*(self.load(user_id) for user_id in user_ids)))
+
+    def _dispatch(self) -> None:
+        batch, self._queue = self._queue, []
+        self._dispatch_scheduled = False
+        asyncio.ensure_future(self._resolve(batch))
+
+    async def _resolve(self, batch: list[UUID]) -> None:
+        self.batches += 1
+        try:
+            users = await self.cache.get_or_load_many(batch, self.loader_many)
+        except Exception as e:
+            logger.error(f"Batch lookup of {len(batch)} users failed: {e}")
+            for user_id in batch:
+                future = self._results.pop(user_id)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for user_id in batch:
+            future = self._results[user_id]
+            if not future.done():
+                future.set_result(users.get(user_id))
+
+
+def current_user_loader() -> Optional[UserLoader]:
+    return _current_loader.get()
+
+
+@contextmanager
+def user_loader_scope(
+        cache: MultiLevelCache,
+        loader_many: Callable[[list[UUID]], Awaitable[list[dict]]]
+) -> Iterator[UserLoader]:
+    loader = UserLoader(cache, loader_many)
+    token = _current_loader.set(loader)
+    try:
+        yield loader
+    finally:
+        _current_loader.reset(token)
+
+
+@asynccontextmanager
+async def request_user_loader_scope() -> AsyncIterator[Optional[UserLoader]]:
+    user_service = None
+    try:
+        from LuminUserService.app.infrastructure.persistanse.database import get_dependency_container
+
+        user_service = await get_dependency_container().get_user_service()
+    except Exception as e:
+        logger.error(f"User loader unavailable, lookups will not be batched: {e}")
+
+    if user_service is None:
+        yield None
+        return
+
+    with user_service.batched_lookups() as loader:
+        yield loader
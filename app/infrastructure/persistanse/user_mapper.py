@@ -73,6 +73,7 @@ class UserMapper(UserDataMapper):
                 profile_views=profile_views,
                 status=data["status"]
             )
+            user.restore_version(data.get("version") or 0)
 
             return user
 
@@ -105,33 +106,33 @@ class UserMapper(UserDataMapper):
                 "profile_avatar_visibility_for_all_users":
                     user.privacy_settings.profile_avatar_visibility_for_all_users,
                 "profile_avatar_visibility_black_list":
-                    user.privacy_settings.profile_avatar_visibility_black_list,
+                    list(user.privacy_settings.profile_avatar_visibility_black_list),
                 "profile_avatar_visibility_white_list":
-                    user.privacy_settings.profile_avatar_visibility_white_list,
+                    list(user.privacy_settings.profile_avatar_visibility_white_list),
                 "profile_date_of_born_visibility_for_contacts":
                     user.privacy_settings.profile_date_of_born_visibility_for_contacts,
                 "profile_date_of_born_visibility_for_all_users":
                     user.privacy_settings.profile_date_of_born_visibility_for_all_users,
                 "profile_date_of_born_visibility_black_list":
-                    user.privacy_settings.profile_date_of_born_visibility_black_list,
+                    list(user.privacy_settings.profile_date_of_born_visibility_black_list),
                 "profile_date_of_born_visibility_white_list":
-                    user.privacy_settings.profile_date_of_born_visibility_white_list,
+                    list(user.privacy_settings.profile_date_of_born_visibility_white_list),
                 "profile_phone_number_visibility_for_contacts":
                     user.privacy_settings.profile_phone_number_visibility_for_contacts,
                 "profile_phone_number_visibility_for_all_users":
                     user.privacy_settings.profile_phone_number_visibility_for_all_users,
                 "profile_phone_number_visibility_black_list":
-                    user.privacy_settings.profile_phone_number_visibility_black_list,
+                    list(user.privacy_settings.profile_phone_number_visibility_black_list),
                 "profile_phone_number_visibility_white_list":
-                    user.privacy_settings.profile_phone_number_visibility_white_list,
+                    list(user.privacy_settings.profile_phone_number_visibility_white_list),
                 "profile_email_address_visibility_for_contacts":
                     user.privacy_settings.profile_email_address_visibility_for_contacts,
                 "profile_email_address_visibility_for_all_users":
                     user.privacy_settings.profile_email_address_visibility_for_all_users,
                 "profile_email_address_visibility_black_list":
-                    user.privacy_settings.profile_email_address_visibility_black_list,
+                    list(user.privacy_settings.profile_email_address_visibility_black_list),
                 "profile_email_address_visibility_white_list":
-                    user.privacy_settings.profile_email_address_visibility_white_list,
+                    list(user.privacy_settings.profile_email_address_visibility_white_list),
                 "profile_views": profile_views_data,
                 "status": user.status,
                 "version": user.version
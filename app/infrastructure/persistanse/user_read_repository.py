@@ -0,0 +1,22 @@
+from uuid import UUID
+from LuminUserService.app.domain.models.aggregates.user import User
+from LuminUserService.app.infrastructure.cache.multi_level_cache import MultiLevelCache
+from LuminUserService.app.infrastructure.persistanse.postgres_sql_user_repository import fetch_user_row, fetch_user_rows
+
+
+class UserReadRepository:
+    def __init__(self, connection_factory, cache: MultiLevelCache) -> None:
+        self.connection_factory = connection_factory
+        self.cache = cache
+
+    async def get_by_id(self, user_id: UUID) -> User | None:
+        return await self.cache.get_or_load(user_id, self._fetch_user_row)
+
+    async def get_many(self, user_ids: list[UUID]) -> dict[UUID, User]:
+        return await self.cache.get_or_load_many(user_ids, self._fetch_user_rows)
+
+    async def _fetch_user_row(self, user_id: UUID) -> dict | None:
+        return await fetch_user_row(self.connection_factory, user_id)
+
+    async def _fetch_user_rows(self, user_ids: list[UUID]) -> list[dict]:
+        return await fetch_user_rows(self.connection_factory, user_ids)
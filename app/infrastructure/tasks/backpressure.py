@@ -0,0 +1,128 @@
+from datetime import datetime, timezone
+from math import ceil
+from typing import Any, Optional
+import asyncio
+import logging
+import time
+from nats.js.errors import NotFoundError
+from LuminUserService.app.infrastructure.tasks.partitioned_broker import INTERACTIVE, PartitionedJetStreamBroker
+
+logger = logging.getLogger(__name__)
+
+
+class QueueLagMonitor:
+    def __init__(
+            self,
+            broker: PartitionedJetStreamBroker,
+            max_lag: dict[str, float],
+            max_depth: int,
+            refresh_interval: float = 1.0,
+            default_retry_after: int = 5,
+            max_retry_after: int = 60
+    ):
+        self.broker = broker
+        self.max_lag = max_lag
+        self.max_depth = max_depth
+        self.refresh_interval = refresh_interval
+        self.default_retry_after = default_retry_after
+        self.max_retry_after = max_retry_after
+
+        self._lock = asyncio.Lock()
+        self._refreshed_at = 0.0
+        self._lanes: dict[str, dict[str, Any]] = {}
+        self._depth = 0
+        self._drain_rate: Optional[float] = None
+        self._last_sample: Optional[tuple[float, int, int]] = None
+
+    def lane_filter(self, lane: str) -> str:
+        if lane == INTERACTIVE:
+            return f"{self.broker.subject_prefix}.*"
+        return f"{self.broker.subject_prefix}.{lane}.>"
+
+    def lane_of(self, subject: str) -> str:
+        tokens = subject[len(self.broker.subject_prefix) + 1:].split(".")
+        return INTERACTIVE if len(tokens) == 1 else tokens[0]
+
+    async def refresh(self) -> None:
+        info = await self.broker.js.stream_info(self.broker.stream, subjects_filter=f"{self.broker.subject_prefix}.>")
+        state = info.state
+        now = time.monotonic()
+
+        if self._last_sample is not None:
+            sampled_at, last_seq, messages = self._last_sample
+            elapsed = now - sampled_at
+            processed = (state.last_seq - last_seq) - (state.messages - messages)
+            if elapsed > 0 and processed >= 0:
+                rate = processed / elapsed
+                self._drain_rate = rate if self._drain_rate is None else 0.7 * self._drain_rate + 0.3 * rate
+        self._last_sample = (now, state.last_seq, state.messages)
+
+        lanes = {lane: {"depth": 0, "lag_seconds": 0.0} for lane in self.broker.lane_weights}
+        for subject, count in (state.subjects or {}).items():
+            lane = self.lane_of(subject)
+            if lane in lanes:
+                lanes[lane]["depth"] += count
+
+        for lane, stats in lanes.items():
+            if stats["depth"]:
+                stats["lag_seconds"] = await self._oldest_age(lane, state.first_seq)
+
+        self._lanes = lanes
+        self._depth = state.messages
+        self._refreshed_at = now
+
+    async def _oldest_age(self, lane: str, first_seq: int) -> float:
+        try:
+            oldest = await self.broker.js.get_msg(
+                self.broker.stream, seq=first_seq, subject=self.lane_filter(lane), next=True
+            )
+        except NotFoundError:
+            return 0.0
+        if oldest.time is None:
+            return 0.0
+        return max((datetime.now(timezone.utc) - oldest.time).total_seconds(), 0.0)
+
+    async def _refresh_if_stale(self) -> None:
+        if time.monotonic() - self._refreshed_at < self.refresh_interval:
+            return
+
+        async with self._lock:
+            if time.monotonic() - self._refreshed_at < self.refresh_interval:
+                return
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Queue lag refresh failed, not applying backpressure: {e}")
+                self._lanes = {}
+                self._depth = 0
+                self._refreshed_at = time.monotonic()
+
+    async def retry_after(self, lane: str) -> Optional[int]:
+        await self._refresh_if_stale()
+
+        if self._depth >= self.max_depth:
+            return self._estimate_retry_after(self._depth - self.max_depth)
+
+        if lane not in self.max_lag:
+            lane = INTERACTIVE
+        stats = self._lanes.get(lane)
+        max_lag = self.max_lag.get(lane)
+        if stats is None or max_lag is None or stats["lag_seconds"] <= max_lag:
+            return None
+        return self._estimate_retry_after(stats["depth"])
+
+    def _estimate_retry_after(self, backlog: int) -> int:
+        if not self._drain_rate:
+            return self.default_retry_after
+        return max(1, min(ceil(backlog / self._drain_rate), self.max_retry_after))
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "depth": self._depth,
+            "max_depth": self.max_depth,
+            "drain_rate": round(self._drain_rate, 2) if self._drain_rate is not None else None,
+            "lanes": {
+                lane: {**stats, "lag_seconds": round(stats["lag_seconds"], 2), "max_lag_seconds": self.max_lag.get(lane)}
+                for lane, stats in self._lanes.items()
+            }
+        }
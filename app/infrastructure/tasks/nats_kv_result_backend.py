@@ -0,0 +1,109 @@
+from typing import Any, Optional
+import asyncio
+import logging
+import time
+import nats
+from nats.errors import TimeoutError as NatsTimeoutError
+from nats.js.api import KeyValueConfig, StorageType
+from nats.js.errors import BucketNotFoundError, KeyNotFoundError
+from nats.js.kv import KV_DEL, KV_PURGE
+from taskiq import AsyncResultBackend, TaskiqResult
+from taskiq.exceptions import ResultGetError
+from LuminUserService.app.infrastructure.cache.codec import ValueCodec
+
+logger = logging.getLogger(__name__)
+
+
+class NatsKVResultBackend(AsyncResultBackend):
+    def __init__(
+            self,
+            servers: str | list[str],
+            bucket: str = "taskiq_results",
+            result_ttl: float = 3600,
+            codec: Optional[ValueCodec] = None,
+            **connect_options: Any
+    ):
+        self.servers = servers
+        self.bucket = bucket
+        self.result_ttl = result_ttl
+        self.codec = codec or ValueCodec(codec="zlib", threshold=512)
+        self.connect_options = connect_options
+        self.nats_client = None
+        self.kv = None
+
+    async def startup(self) -> None:
+        self.nats_client = await nats.connect(servers=self.servers, **self.connect_options)
+        js = self.nats_client.jetstream()
+
+        try:
+            self.kv = await js.key_value(self.bucket)
+        except BucketNotFoundError:
+            self.kv = await js.create_key_value(KeyValueConfig(
+                bucket=self.bucket,
+                history=1,
+                ttl=self.result_ttl,
+                storage=StorageType.FILE
+            ))
+            logger.info(f"Result bucket {self.bucket} created (ttl {self.result_ttl}s)")
+
+    async def shutdown(self) -> None:
+        if self.nats_client is not None and not self.nats_client.is_closed:
+            await self.nats_client.close()
+
+    def encode(self, result: TaskiqResult) -> bytes:
+        return self.codec.dumps(result.model_dump(mode="json", exclude={"log"}))
+
+    def decode(self, data: bytes) -> TaskiqResult:
+        return TaskiqResult.model_validate(self.codec.loads(data))
+
+    async def set_result(self, task_id: str, result: TaskiqResult) -> None:
+        await self.kv.put(task_id, self.encode(result))
+
+    async def is_result_ready(self, task_id: str) -> bool:
+        return await self._get(task_id) is not None
+
+    async def get_result(self, task_id: str, with_logs: bool = False) -> TaskiqResult:
+        result = await self._get(task_id)
+        if result is None:
+            raise ResultGetError
+        return result
+
+    async def _get(self, task_id: str) -> Optional[TaskiqResult]:
+        try:
+            entry = await self.kv.get(task_id)
+        except KeyNotFoundError:
+            return None
+
+        if entry.value is None or entry.operation in (KV_DEL, KV_PURGE):
+            return None
+        return self.decode(entry.value)
+
+    async def get_results(self, task_ids: list[str]) -> dict[str, Optional[TaskiqResult]]:
+        results = await asyncio.gather(*(self._get(task_id) for task_id in task_ids), return_exceptions=True)
+
+        statuses = {}
+        for task_id, result in zip(task_ids, results):
+            if isinstance(result, Exception):
+                logger.error(f"Result lookup failed for task {task_id}: {result}")
+                result = None
+            statuses[task_id] = result
+        return statuses
+
+    async def wait_for_result(self, task_id: str, timeout: float) -> Optional[TaskiqResult]:
+        deadline = time.monotonic() + timeout
+        watcher = await self.kv.watch(task_id, ignore_deletes=True)
+
+        try:
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    entry = await watcher.updates(timeout=remaining)
+                except NatsTimeoutError:
+                    break
+
+                if entry is not None and entry.value:
+                    return self.decode(entry.value)
+        finally:
+            await watcher.stop()
+
+        logger.debug(f"No result for task {task_id} after {timeout}s")
+        return None
@@ -0,0 +1,488 @@
+from hashlib import md5
+from typing import Any, AsyncGenerator, Callable, Optional
+from uuid import NAMESPACE_OID, uuid4, uuid5
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import nats
+from nats.errors import TimeoutError as NatsTimeoutError
+from nats.js.api import AckPolicy, ConsumerConfig, KeyValueConfig, StorageType
+from nats.js.errors import BucketNotFoundError, NoKeysError
+from taskiq import AckableMessage, AsyncBroker, AsyncResultBackend, BrokerMessage, TaskiqMessage, TaskiqMiddleware
+from LuminUserService.app.infrastructure.tasks.retry_policy import publish_dead_letter
+
+logger = logging.getLogger(__name__)
+
+PARTITION_LABEL = "partition_key"
+IDEMPOTENCY_LABEL = "idempotency_key"
+MESSAGE_ID_HEADER = "Nats-Msg-Id"
+TASK_ID_HEADER = "Taskiq-Task-Id"
+PRIORITY_LABEL = "priority"
+INTERACTIVE = "interactive"
+BULK = "bulk"
+DEFAULT_LANE_WEIGHTS = {INTERACTIVE: 4, BULK: 1}
+
+
+def partition_for(key: str, partitions: int) -> int:
+    return int.from_bytes(md5(key.encode()).digest()[:8], "big") % partitions
+
+
+def idempotent_task_id(task_name: str, partition_key: Any, idempotency_key: str) -> str:
+    return uuid5(NAMESPACE_OID, f"{task_name}:{partition_key}:{idempotency_key}").hex
+
+
+def assign_partitions(members: list[str], partitions: int) -> dict[str, set[int]]:
+    assignment: dict[str, set[int]] = {member: set() for member in members}
+    for partition in range(partitions):
+        owner = max(members, key=lambda member: md5(f"{member}:{partition}".encode()).digest())
+        assignment[owner].add(partition)
+    return assignment
+
+
+class LaneStats:
+    def __init__(self) -> None:
+        self.dispatched = 0
+        self.in_flight = 0
+        self.pending: dict[int, int] = {}
+        self.wait_avg = 0.0
+        self.wait_max = 0.0
+
+    def record_fetch(self, partition: int, num_pending: int) -> None:
+        self.pending[partition] = num_pending
+
+    def record_dispatch(self, wait: Optional[float]) -> None:
+        self.dispatched += 1
+        self.in_flight += 1
+        if wait is None:
+            return
+        wait = max(wait, 0.0)
+        self.wait_avg = wait if self.dispatched == 1 else 0.9 * self.wait_avg + 0.1 * wait
+        self.wait_max = max(self.wait_max, wait)
+
+    def snapshot(self, queued: int, owned: list[int]) -> dict[str, Any]:
+        snapshot = {
+            "pending": sum(self.pending.get(partition, 0) for partition in owned),
+            "queued": queued,
+            "in_flight": self.in_flight,
+            "dispatched": self.dispatched,
+            "wait_ms_avg": round(self.wait_avg * 1000, 2),
+            "wait_ms_max": round(self.wait_max * 1000, 2)
+        }
+        self.wait_max = 0.0
+        return snapshot
+
+
+class ExecutionWatchMiddleware(TaskiqMiddleware):
+    def pre_execute(self, message: TaskiqMessage) -> TaskiqMessage:
+        self.broker.watch_execution(message.task_id)
+        return message
+
+
+class PartitionedJetStreamBroker(AsyncBroker):
+    def __init__(
+            self,
+            servers: str | list[str],
+            stream: str = "TASKIQ_STREAM",
+            subject_prefix: str = "taskiq.user_service",
+            partitions: int = 16,
+            membership_bucket: str = "user_service_workers",
+            heartbeat_interval: float = 5.0,
+            member_ttl: float = 15.0,
+            ack_wait: float = 60.0,
+            lane_weights: Optional[dict[str, int]] = None,
+            max_in_flight: int = 32,
+            interactive_reserved: int = 8,
+            prefetch: int = 16,
+            result_backend: Optional[AsyncResultBackend] = None,
+            **connect_options: Any
+    ) -> None:
+        super().__init__()
+        self.add_middlewares(ExecutionWatchMiddleware())
+        if result_backend is not None:
+            self.with_result_backend(result_backend)
+        self.skip_completed = result_backend is not None
+        self.servers = servers
+        self.stream = stream
+        self.subject_prefix = subject_prefix
+        self.partitions = partitions
+        self.membership_bucket = membership_bucket
+        self.heartbeat_interval = heartbeat_interval
+        self.member_ttl = member_ttl
+        self.ack_wait = ack_wait
+        self.connect_options = connect_options
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:6]}"
+
+        self.lane_weights = lane_weights or dict(DEFAULT_LANE_WEIGHTS)
+        if INTERACTIVE not in self.lane_weights:
+            raise ValueError(f"Lane weights must include the {INTERACTIVE} lane")
+        self.max_in_flight = max_in_flight
+        self.interactive_reserved = min(interactive_reserved, max_in_flight - 1)
+        self.prefetch = prefetch
+        self._shared_slots = asyncio.Semaphore(self.max_in_flight - self.interactive_reserved)
+        self._dispatch_slots = asyncio.Semaphore(self.max_in_flight + self.prefetch)
+
+        self.client = None
+        self.js = None
+        self._members_kv = None
+        self._queues: dict[str, asyncio.Queue] = {lane: asyncio.Queue() for lane in self.lane_weights}
+        self._available = asyncio.Semaphore(0)
+        self._credits: dict[str, int] = {lane: 0 for lane in self.lane_weights}
+        self.lane_stats: dict[str, LaneStats] = {lane: LaneStats() for lane in self.lane_weights}
+        self._consumers: dict[tuple[str, int], asyncio.Task] = {}
+        self._inflight: dict[str, Any] = {}
+        self._retry_delays: dict[str, float] = {}
+        self._local_retries: dict[str, int] = {}
+        self._releases: dict[str, Callable[[], None]] = {}
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._members: list[str] = []
+
+    def subject_for(self, partition: int, lane: str = INTERACTIVE) -> str:
+        if lane == INTERACTIVE:
+            return f"{self.subject_prefix}.p{partition}"
+        return f"{self.subject_prefix}.{lane}.p{partition}"
+
+    def durable_for(self, partition: int, lane: str = INTERACTIVE) -> str:
+        prefix = self.subject_prefix.replace('.', '_')
+        if lane == INTERACTIVE:
+            return f"{prefix}_p{partition}"
+        return f"{prefix}_{lane}_p{partition}"
+
+    @property
+    def owned_partitions(self) -> list[int]:
+        return sorted({partition for _, partition in self._consumers})
+
+    async def startup(self) -> None:
+        await super().startup()
+        self.client = await nats.connect(servers=self.servers, **self.connect_options)
+        self.js = self.client.jetstream()
+
+    async def shutdown(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+        for consumer in list(self._consumers):
+            self._stop_consumer(consumer)
+
+        if self._members_kv is not None:
+            try:
+                await self._members_kv.delete(self.worker_id)
+                logger.info(f"Worker {self.worker_id} left the command consumer group")
+            except Exception as e:
+                logger.error(f"Failed to deregister worker {self.worker_id}: {e}")
+
+        if self.client is not None and not self.client.is_closed:
+            await self.client.close()
+        await super().shutdown()
+
+    async def kick(self, message: BrokerMessage) -> None:
+        lane = str(message.labels.get(PRIORITY_LABEL) or INTERACTIVE)
+        if lane not in self.lane_weights:
+            raise ValueError(f"Unknown priority lane {lane}")
+
+        key = str(message.labels.get(PARTITION_LABEL) or message.task_id)
+        partition = partition_for(key, self.partitions)
+        await self.js.publish(
+            self.subject_for(partition, lane),
+            message.message,
+            stream=self.stream,
+            headers={
+                **{name: str(value) for name, value in message.labels.items()},
+                MESSAGE_ID_HEADER: message.task_id,
+                TASK_ID_HEADER: message.task_id
+            }
+        )
+
+    async def listen(self) -> AsyncGenerator[AckableMessage, None]:
+        await self._join()
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+        while True:
+            await self._dispatch_slots.acquire()
+            await self._available.acquire()
+            lane = self._next_lane()
+            message, published_at = self._queues[lane].get_nowait()
+            self.lane_stats[lane].record_dispatch(
+                time.time() - published_at if published_at is not None else None
+            )
+            yield message
+
+    def _next_lane(self) -> str:
+        ready = [lane for lane, queue in self._queues.items() if not queue.empty()]
+        total = sum(self.lane_weights[lane] for lane in ready)
+        for lane in ready:
+            self._credits[lane] += self.lane_weights[lane]
+
+        lane = max(ready, key=lambda candidate: self._credits[candidate])
+        self._credits[lane] -= total
+        return lane
+
+    def lane_snapshot(self) -> dict[str, dict[str, Any]]:
+        owned = self.owned_partitions
+        return {
+            lane: self.lane_stats[lane].snapshot(self._queues[lane].qsize(), owned)
+            for lane in self.lane_weights
+        }
+
+    async def worker_lane_stats(self) -> dict[str, dict[str, Any]]:
+        members_kv = self._members_kv or await self.js.key_value(self.membership_bucket)
+        try:
+            members = await members_kv.keys()
+        except NoKeysError:
+            return {}
+
+        workers = {}
+        for member in members:
+            try:
+                entry = await members_kv.get(member)
+                workers[member] = json.loads(entry.value) if entry.value and entry.value != b"1" else {}
+            except Exception as e:
+                logger.error(f"Failed to read lane stats of worker {member}: {e}")
+        return workers
+
+    @staticmethod
+    def aggregate_lane_stats(workers: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]:
+        lanes: dict[str, dict[str, Any]] = {}
+        for stats in workers.values():
+            for lane, snapshot in stats.items():
+                total = lanes.setdefault(lane, {
+                    "pending": 0, "queued": 0, "in_flight": 0, "dispatched": 0,
+                    "wait_ms_avg": 0.0, "wait_ms_max": 0.0, "workers": 0
+                })
+                for field in ("pending", "queued", "in_flight", "dispatched"):
+                    total[field] += snapshot.get(field, 0)
+                total["wait_ms_avg"] += snapshot.get("wait_ms_avg", 0.0)
+                total["wait_ms_max"] = max(total["wait_ms_max"], snapshot.get("wait_ms_max", 0.0))
+                total["workers"] += 1
+
+        for total in lanes.values():
+            total["wait_ms_avg"] = round(total["wait_ms_avg"] / total["workers"], 2)
+        return lanes
+
+    async def _join(self) -> None:
+        try:
+            self._members_kv = await self.js.key_value(self.membership_bucket)
+        except BucketNotFoundError:
+            self._members_kv = await self.js.create_key_value(KeyValueConfig(
+                bucket=self.membership_bucket,
+                history=1,
+                ttl=self.member_ttl,
+                storage=StorageType.MEMORY
+            ))
+
+        await self._members_kv.put(self.worker_id, self._heartbeat_value())
+        logger.info(f"Worker {self.worker_id} joined the command consumer group")
+        await self._rebalance()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self._members_kv.put(self.worker_id, self._heartbeat_value())
+                await self._rebalance()
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} heartbeat failed: {e}")
+
+    def _heartbeat_value(self) -> bytes:
+        return json.dumps(self.lane_snapshot()).encode()
+
+    async def _rebalance(self) -> None:
+        try:
+            members = sorted(await self._members_kv.keys())
+        except NoKeysError:
+            members = []
+        if self.worker_id not in members:
+            members = sorted(members + [self.worker_id])
+
+        if members == self._members:
+            return
+        self._members = members
+
+        owned = {
+            (lane, partition)
+            for partition in assign_partitions(members, self.partitions)[self.worker_id]
+            for lane in self.lane_weights
+        }
+        for consumer in set(self._consumers) - owned:
+            self._stop_consumer(consumer)
+        for lane, partition in owned - set(self._consumers):
+            self._consumers[(lane, partition)] = asyncio.create_task(self._consume(lane, partition))
+
+        logger.info(
+            f"Worker {self.worker_id} owns partitions {self.owned_partitions} "
+            f"of {self.partitions} ({len(members)} workers)"
+        )
+
+    def _stop_consumer(self, consumer: tuple[str, int]) -> None:
+        task = self._consumers.pop(consumer, None)
+        if task is not None:
+            task.cancel()
+
+    async def _consume(self, lane: str, partition: int) -> None:
+        slots = None if lane == INTERACTIVE else self._shared_slots
+        stats = self.lane_stats[lane]
+        subscription = await self.js.pull_subscribe(
+            self.subject_for(partition, lane),
+            durable=self.durable_for(partition, lane),
+            stream=self.stream,
+            config=ConsumerConfig(
+                ack_policy=AckPolicy.EXPLICIT,
+                max_ack_pending=1,
+                ack_wait=self.ack_wait
+            )
+        )
+
+        try:
+            while True:
+                if slots is not None:
+                    await slots.acquire()
+                try:
+                    await self._consume_once(subscription, lane, partition, stats)
+                finally:
+                    if slots is not None:
+                        slots.release()
+        finally:
+            await subscription.unsubscribe()
+
+    async def _consume_once(self, subscription: Any, lane: str, partition: int, stats: LaneStats) -> None:
+        try:
+            messages = await subscription.fetch(1, timeout=self.heartbeat_interval)
+        except NatsTimeoutError:
+            stats.record_fetch(partition, 0)
+            return
+        except Exception as e:
+            logger.error(f"Fetch from {lane} partition {partition} failed: {e}")
+            await asyncio.sleep(self.heartbeat_interval)
+            return
+
+        for message in messages:
+            if await self._already_completed(message):
+                await message.ack()
+                continue
+
+            published_at = None
+            try:
+                stats.record_fetch(partition, message.metadata.num_pending)
+                published_at = message.metadata.timestamp.timestamp()
+            except Exception as e:
+                logger.debug(f"No JetStream metadata on {lane} message: {e}")
+
+            task_id = (message.headers or {}).get(TASK_ID_HEADER)
+            if task_id is not None:
+                self._inflight[task_id] = message
+            try:
+                while (delay := await self._dispatch(message, lane, stats, published_at, task_id)) is not None:
+                    if not await self._hold(message, delay):
+                        break
+                    self._local_retries[task_id] = self._local_retries.get(task_id, 0) + 1
+                    published_at = None
+            finally:
+                if task_id is not None:
+                    self._inflight.pop(task_id, None)
+                    self._local_retries.pop(task_id, None)
+
+    async def _dispatch(
+            self,
+            message: Any,
+            lane: str,
+            stats: LaneStats,
+            published_at: Optional[float],
+            task_id: Optional[str]
+    ) -> Optional[float]:
+        outcome = asyncio.get_running_loop().create_future()
+
+        def release(delay: Optional[float] = None) -> None:
+            if outcome.done():
+                return
+            if task_id is not None:
+                self._releases.pop(task_id, None)
+            stats.in_flight -= 1
+            self._dispatch_slots.release()
+            outcome.set_result(delay)
+
+        async def ack() -> None:
+            if outcome.done():
+                return
+            delay = self._retry_delays.pop(task_id, None) if task_id is not None else None
+            if delay is None:
+                await message.ack()
+            release(delay)
+
+        def finished() -> None:
+            if outcome.done():
+                return
+            delay = self._retry_delays.pop(task_id, None)
+            if delay is None:
+                logger.warning(f"Task {task_id} finished without an ack, leaving it for redelivery")
+            release(delay)
+
+        if task_id is not None:
+            self._releases[task_id] = finished
+        self._queues[lane].put_nowait((AckableMessage(data=message.data, ack=ack), published_at))
+        self._available.release()
+        try:
+            return await asyncio.wait_for(asyncio.shield(outcome), self.ack_wait)
+        except asyncio.TimeoutError:
+            logger.warning(f"Task {task_id} was not acked within {self.ack_wait}s, leaving it for redelivery")
+            self._retry_delays.pop(task_id, None)
+            release()
+            return None
+
+    def watch_execution(self, task_id: str) -> None:
+        release = self._releases.get(task_id)
+        task = asyncio.current_task()
+        if release is not None and task is not None:
+            task.add_done_callback(lambda _: release())
+
+    async def _hold(self, message: Any, delay: float) -> bool:
+        deadline = time.monotonic() + delay
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                await message.in_progress()
+            except Exception as e:
+                logger.error(f"Failed to extend ack deadline of a retried message, leaving it for redelivery: {e}")
+                return False
+            await asyncio.sleep(min(remaining, self.ack_wait / 2))
+        return True
+
+    def delivery_attempt(self, task_id: str) -> Optional[int]:
+        message = self._inflight.get(task_id)
+        if message is None:
+            return None
+        try:
+            return message.metadata.num_delivered + self._local_retries.get(task_id, 0)
+        except Exception:
+            return None
+
+    async def retry_later(self, task_id: str, delay: float) -> None:
+        if task_id in self._inflight:
+            self._retry_delays[task_id] = delay
+
+    async def dead_letter(self, task_id: str, task_name: str, reason: str, attempts: int) -> None:
+        message = self._inflight.get(task_id)
+        if message is None:
+            return
+        try:
+            await publish_dead_letter(
+                self.js, task_name, message.data, message.subject, message.headers, reason, attempts
+            )
+        except Exception as e:
+            logger.error(f"Failed to dead-letter task {task_id}, retrying it in place: {e}")
+            self._retry_delays[task_id] = self.ack_wait
+
+    async def _already_completed(self, message: Any) -> bool:
+        headers = message.headers or {}
+        if not self.skip_completed or IDEMPOTENCY_LABEL not in headers:
+            return False
+
+        task_id = headers.get(TASK_ID_HEADER)
+        try:
+            completed = await self.result_backend.is_result_ready(task_id)
+        except Exception as e:
+            logger.error(f"Result lookup for idempotent task {task_id} failed: {e}")
+            return False
+
+        if completed:
+            logger.info(f"Task {task_id} already completed for key {headers[IDEMPOTENCY_LABEL]}, skipping duplicate")
+        return completed
@@ -0,0 +1,120 @@
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Optional
+import functools
+import logging
+import random
+import psycopg2
+import redis.exceptions
+from nats.errors import ConnectionClosedError, NoServersError, TimeoutError as NatsTimeoutError
+from taskiq import TaskiqMessage, TaskiqMiddleware, TaskiqResult
+from taskiq.exceptions import NoResultError
+
+logger = logging.getLogger(__name__)
+
+DLQ_STREAM = "TASKIQ_DLQ"
+DLQ_SUBJECT_PREFIX = "dlq.user_service"
+DLQ_MAX_AGE = 14 * 24 * 60 * 60
+
+ORIGINAL_SUBJECT_HEADER = "Dlq-Original-Subject"
+REASON_HEADER = "Dlq-Reason"
+ATTEMPTS_HEADER = "Dlq-Attempts"
+FAILED_AT_HEADER = "Dlq-Failed-At"
+
+RETRYABLE_ERRORS = (
+    psycopg2.OperationalError,
+    psycopg2.InterfaceError,
+    psycopg2.extensions.TransactionRollbackError,
+    redis.exceptions.ConnectionError,
+    redis.exceptions.TimeoutError,
+    NatsTimeoutError,
+    ConnectionClosedError,
+    NoServersError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def is_retryable(error: BaseException) -> bool:
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+def failure_result(key: str = "error", **extra: Any) -> Callable:
+    def decorator(func: Callable[..., Awaitable[dict]]) -> Callable[..., Awaitable[dict]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> dict:
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                if is_retryable(e):
+                    raise
+                return {"success": False, key: str(e), **extra}
+        return wrapper
+    return decorator
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, error: BaseException, attempt: int) -> bool:
+        return is_retryable(error) and attempt < self.max_attempts
+
+    def backoff(self, attempt: int) -> float:
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(ceiling / 2, ceiling)
+
+
+def dead_letter_subject(name: str) -> str:
+    return f"{DLQ_SUBJECT_PREFIX}.{name}"
+
+
+async def publish_dead_letter(
+        js: Any,
+        name: str,
+        data: bytes,
+        original_subject: str,
+        headers: Optional[dict[str, str]],
+        reason: str,
+        attempts: int
+) -> None:
+    await js.publish(
+        dead_letter_subject(name),
+        data,
+        stream=DLQ_STREAM,
+        headers={
+            **(headers or {}),
+            ORIGINAL_SUBJECT_HEADER: original_subject,
+            REASON_HEADER: reason[:1024],
+            ATTEMPTS_HEADER: str(attempts),
+            FAILED_AT_HEADER: datetime.now(timezone.utc).isoformat()
+        }
+    )
+    logger.warning(f"Dead-lettered {name} from {original_subject} after {attempts} attempts: {reason}")
+
+
+class RetryMiddleware(TaskiqMiddleware):
+    def __init__(self, policy: Optional[RetryPolicy] = None):
+        super().__init__()
+        self.policy = policy or RetryPolicy()
+
+    async def post_execute(self, message: TaskiqMessage, result: TaskiqResult[Any]) -> None:
+        if not result.is_err or not is_retryable(result.error):
+            return
+
+        attempt = self.broker.delivery_attempt(message.task_id)
+        if attempt is None:
+            return
+
+        if self.policy.should_retry(result.error, attempt):
+            delay = self.policy.backoff(attempt)
+            await self.broker.retry_later(message.task_id, delay)
+            logger.warning(
+                f"Task {message.task_name} {message.task_id} failed on attempt {attempt}, "
+                f"retrying in {delay:.1f}s: {result.error!r}"
+            )
+            result.error = NoResultError()
+            return
+
+        await self.broker.dead_letter(message.task_id, message.task_name, repr(result.error), attempt)
@@ -1,12 +1,33 @@
 import asyncio
 import logging
-from taskiq_nats import NatsBroker
 import nats
 from nats.js.api import StreamConfig, RetentionPolicy, StorageType
+from LuminUserService.app.infrastructure.tasks.backpressure import QueueLagMonitor
+from LuminUserService.app.infrastructure.tasks.nats_kv_result_backend import NatsKVResultBackend
+from LuminUserService.app.infrastructure.tasks.partitioned_broker import BULK, INTERACTIVE, PartitionedJetStreamBroker
+from LuminUserService.app.infrastructure.tasks.retry_policy import (
+    DLQ_MAX_AGE, DLQ_STREAM, DLQ_SUBJECT_PREFIX, RetryMiddleware, RetryPolicy
+)
+from LuminUserService.app.infrastructure.tasks.user_loader_middleware import UserLoaderMiddleware
 
 logger = logging.getLogger(__name__)
 
+RESULT_BUCKET = "user_service_results"
+RESULT_TTL = 60 * 60
+COMMAND_SUBJECT = "taskiq.user_service"
+COMMAND_PARTITIONS = 16
+COMMAND_LANE_WEIGHTS = {INTERACTIVE: 4, BULK: 1}
+WORKER_CONCURRENCY = 32
+WORKER_PREFETCH = 16
+INTERACTIVE_RESERVED = 8
+MAX_COMMAND_LAG = {INTERACTIVE: 5.0, BULK: 300.0}
+MAX_COMMAND_BACKLOG = 50000
+RETRY_MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
 _broker_instance = None
+_lag_monitor_instance = None
 
 
 async def create_taskiq_stream():
@@ -28,17 +49,27 @@ async def create_taskiq_stream():
             duplicate_window=120,
         )
 
-        try:
-            stream = await js.add_stream(stream_config)
-            logger.info(f"Taskiq stream created: {stream.config.name}")
-            logger.info(f"   Subjects: {stream.config.subjects}")
+        dead_letter_config = StreamConfig(
+            name=DLQ_STREAM,
+            subjects=[f"{DLQ_SUBJECT_PREFIX}.>"],
+            retention=RetentionPolicy.LIMITS,
+            max_age=DLQ_MAX_AGE,
+            storage=StorageType.FILE,
+            num_replicas=1,
+        )
 
-        except Exception as e:
-            if "stream name already in use" in str(e):
-                logger.info("Taskiq stream already exists")
-            else:
-                logger.error(f"Failed to create Taskiq stream: {e}")
-                raise
+        for config in (stream_config, dead_letter_config):
+            try:
+                stream = await js.add_stream(config)
+                logger.info(f"Stream created: {stream.config.name}")
+                logger.info(f"   Subjects: {stream.config.subjects}")
+
+            except Exception as e:
+                if "stream name already in use" in str(e):
+                    logger.info(f"Stream {config.name} already exists")
+                else:
+                    logger.error(f"Failed to create stream {config.name}: {e}")
+                    raise
 
         await nc.close()
 
@@ -47,7 +78,7 @@ async def create_taskiq_stream():
         raise
 
 
-def get_taskiq_broker() -> NatsBroker:
+def get_taskiq_broker() -> PartitionedJetStreamBroker:
     global _broker_instance
 
     if _broker_instance is None:
@@ -63,14 +94,41 @@ def get_taskiq_broker() -> NatsBroker:
             except RuntimeError:
                 logger.warning("No event loop, stream will be created later")
 
-            _broker_instance = NatsBroker(
+            _broker_instance = PartitionedJetStreamBroker(
                 servers="nats://localhost:4222",
-                queue="user_service",
+                stream="TASKIQ_STREAM",
+                subject_prefix=COMMAND_SUBJECT,
+                partitions=COMMAND_PARTITIONS,
+                lane_weights=COMMAND_LANE_WEIGHTS,
+                max_in_flight=WORKER_CONCURRENCY,
+                interactive_reserved=INTERACTIVE_RESERVED,
+                prefetch=WORKER_PREFETCH,
+                result_backend=NatsKVResultBackend(
+                    servers="nats://localhost:4222",
+                    bucket=RESULT_BUCKET,
+                    result_ttl=RESULT_TTL,
+                ),
+            )
+            _broker_instance.add_middlewares(
+                RetryMiddleware(RetryPolicy(
+                    max_attempts=RETRY_MAX_ATTEMPTS,
+                    base_delay=RETRY_BASE_DELAY,
+                    max_delay=RETRY_MAX_DELAY
+                )),
+                UserLoaderMiddleware()
             )
 
             logger.info("Taskiq broker created")
-            logger.info("Queue: user_service")
-            logger.info("Full subject: taskiq.user_service")
+            logger.info(f"Subjects: {COMMAND_SUBJECT}.p0..p{COMMAND_PARTITIONS - 1}, partitioned by user_id")
+            logger.info(
+                f"Lanes: {COMMAND_LANE_WEIGHTS}, {INTERACTIVE_RESERVED} of {WORKER_CONCURRENCY} "
+                f"in-flight slots reserved for {INTERACTIVE}, prefetch {WORKER_PREFETCH}"
+            )
+            logger.info(
+                f"Retries: up to {RETRY_MAX_ATTEMPTS} attempts, backoff {RETRY_BASE_DELAY}-{RETRY_MAX_DELAY}s, "
+                f"then {DLQ_STREAM}"
+            )
+            logger.info(f"Results: NATS KV bucket {RESULT_BUCKET}, ttl {RESULT_TTL}s")
 
         except Exception as e:
             logger.error(f"Failed to create Taskiq broker: {e}")
@@ -79,6 +137,20 @@ def get_taskiq_broker() -> NatsBroker:
     return _broker_instance
 
 
+def get_queue_lag_monitor() -> QueueLagMonitor:
+    global _lag_monitor_instance
+
+    if _lag_monitor_instance is None:
+        _lag_monitor_instance = QueueLagMonitor(
+            get_taskiq_broker(),
+            max_lag=MAX_COMMAND_LAG,
+            max_depth=MAX_COMMAND_BACKLOG
+        )
+        logger.info(f"Backpressure: max lag {MAX_COMMAND_LAG}s, max backlog {MAX_COMMAND_BACKLOG} commands")
+
+    return _lag_monitor_instance
+
+
 async def startup_broker():
     await create_taskiq_stream()
 
@@ -88,11 +160,12 @@ async def startup_broker():
 
 
 async def shutdown_broker():
-    global _broker_instance
+    global _broker_instance, _lag_monitor_instance
 
     if _broker_instance is not None:
         await _broker_instance.shutdown()
         _broker_instance = None
+        _lag_monitor_instance = None
         logger.info("Broker shutdown")
 
 
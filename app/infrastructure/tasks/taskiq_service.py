@@ -1,12 +1,17 @@
-from typing import Dict, Any, Optional
-from taskiq import TaskiqResult
+from typing import Dict, Any, List, Optional
+import asyncio
+from taskiq import AsyncTaskiqDecoratedTask, AsyncTaskiqTask, TaskiqResult
 from uuid import UUID
-from LuminUserService.app.infrastructure.tasks.taskiq_broker import get_taskiq_broker
+from LuminUserService.app.infrastructure.tasks.partitioned_broker import (
+    BULK, IDEMPOTENCY_LABEL, INTERACTIVE, PARTITION_LABEL, PRIORITY_LABEL, idempotent_task_id, partition_for
+)
+from LuminUserService.app.infrastructure.tasks.taskiq_broker import get_queue_lag_monitor, get_taskiq_broker
 from LuminUserService.app.application.taskiq.user_commands import (
     create_user_task, change_username_task, change_email_task,
     change_phone_task, change_bio_task, activate_user_task,
     deactivate_user_task, block_user_task, record_profile_view_task, get_user_by_id_task, change_date_task,
-    change_language_code_task, change_avatar_url_task, change_privacy_settings_task, delete_user_task
+    change_language_code_task, change_avatar_url_task, change_privacy_settings_task, delete_user_task,
+    batch_commands_task
 )
 
 
@@ -14,29 +19,47 @@ class TaskiqService:
     def __init__(self) -> None:
         self.broker = get_taskiq_broker()
 
+    @staticmethod
+    async def _kiq(
+            task: AsyncTaskiqDecoratedTask,
+            partition_key: Any,
+            *args: Any,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> AsyncTaskiqTask:
+        kicker = task.kicker().with_labels(**{PARTITION_LABEL: str(partition_key), PRIORITY_LABEL: priority})
+        if idempotency_key:
+            task_id = idempotent_task_id(task.task_name, partition_key, idempotency_key)
+            result_backend = get_taskiq_broker().result_backend
+            try:
+                if await result_backend.is_result_ready(task_id):
+                    print(f"[TaskiqService] Idempotency key {idempotency_key} already completed as task {task_id}")
+                    return AsyncTaskiqTask(task_id, result_backend)
+            except Exception as e:
+                print(f"[TaskiqService] Result lookup for task {task_id} failed: {e}")
+
+            kicker = kicker.with_task_id(task_id).with_labels(**{IDEMPOTENCY_LABEL: idempotency_key})
+        return await kicker.kiq(*args)
+
     @staticmethod
     async def send_get_user_by_id_task(user_id: UUID) -> Optional[Dict]:
         try:
             print(f"[TaskiqService] Sending get_user_by_id_task for {user_id}")
 
-            task = get_user_by_id_task.kiq(str(user_id))
-            result: TaskiqResult = await task
-
-            print(f"[TaskiqService] Task sent, task_id: {result.task_id}")
+            task = await TaskiqService._kiq(get_user_by_id_task, user_id, str(user_id))
 
-            try:
-                task_result = await result.wait_result(timeout=10)
-                print("[TaskiqService] Task result received")
+            print(f"[TaskiqService] Task sent, task_id: {task.task_id}")
 
-                if task_result.is_success:
-                    return task_result.return_value
-                else:
-                    print(f"[TaskiqService] Task failed: {task_result.error}")
-                    return None
+            task_result = await get_taskiq_broker().result_backend.wait_for_result(task.task_id, timeout=10)
+            if task_result is None:
+                print(f"[TaskiqService] Task timeout for task_id: {task.task_id}")
+                return None
 
-            except TimeoutError:
-                print(f"[TaskiqService] Task timeout for task_id: {result.task_id}")
+            print("[TaskiqService] Task result received")
+            if task_result.is_err:
+                print(f"[TaskiqService] Task failed: {task_result.error}")
                 return None
+            return task_result.return_value
 
         except Exception as e:
             print(f"[TaskiqService] Error in send_get_user_by_id_task: {e}")
@@ -45,90 +68,350 @@ class TaskiqService:
             return None
 
     @staticmethod
-    async def send_create_user_task(user_data: Dict[str, Any]) -> str:
-        task = await create_user_task.kiq(user_data)
+    async def send_create_user_task(
+            user_data: Dict[str, Any],
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            create_user_task,
+            user_data["user_id"],
+            user_data,
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
     @staticmethod
-    async def send_change_username_task(user_id: UUID, new_username: Dict[str, str]) -> str:
-        task = await change_username_task.kiq(str(user_id), new_username)
+    async def send_change_username_task(
+            user_id: UUID,
+            new_username: Dict[str, str],
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            change_username_task,
+            user_id,
+            str(user_id),
+            new_username,
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
     @staticmethod
-    async def send_change_email_task(user_id: UUID, new_email: str) -> str:
-        task = await change_email_task.kiq(str(user_id), new_email)
+    async def send_change_email_task(
+            user_id: UUID,
+            new_email: str,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            change_email_task,
+            user_id,
+            str(user_id),
+            new_email,
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
     @staticmethod
-    async def send_change_date_task(user_id: UUID, new_date: str) -> str:
-        task = await change_date_task.kiq(str(user_id), new_date)
+    async def send_change_date_task(
+            user_id: UUID,
+            new_date: str,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            change_date_task,
+            user_id,
+            str(user_id),
+            new_date,
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
     @staticmethod
-    async def send_change_phone_task(user_id: UUID, new_phone: str) -> str:
-        task = await change_phone_task.kiq(str(user_id), new_phone)
+    async def send_change_phone_task(
+            user_id: UUID,
+            new_phone: str,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            change_phone_task,
+            user_id,
+            str(user_id),
+            new_phone,
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
     @staticmethod
-    async def send_change_bio_task(user_id: UUID, new_bio: str) -> str:
-        task = await change_bio_task.kiq(str(user_id), new_bio)
+    async def send_change_bio_task(
+            user_id: UUID,
+            new_bio: str,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            change_bio_task,
+            user_id,
+            str(user_id),
+            new_bio,
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
     @staticmethod
-    async def send_change_language_code_task(user_id: UUID, new_language_code: str) -> str:
-        task = await change_language_code_task.kiq(str(user_id), new_language_code)
+    async def send_change_language_code_task(
+            user_id: UUID,
+            new_language_code: str,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            change_language_code_task,
+            user_id,
+            str(user_id),
+            new_language_code,
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
     @staticmethod
-    async def send_change_avatar_url_task(user_id: UUID, new_avatar_url: str) -> str:
-        task = await change_avatar_url_task.kiq(str(user_id), new_avatar_url)
+    async def send_change_avatar_url_task(
+            user_id: UUID,
+            new_avatar_url: str,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            change_avatar_url_task,
+            user_id,
+            str(user_id),
+            new_avatar_url,
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
     @staticmethod
-    async def send_change_privacy_settings_task(user_id: UUID, new_privacy_settings: dict) -> str:
+    async def send_change_privacy_settings_task(
+            user_id: UUID,
+            new_privacy_settings: dict,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
         print("Start taskiq service send_change_privacy_settings_task method")
-        task = await change_privacy_settings_task.kiq(str(user_id), new_privacy_settings)
+        task = await TaskiqService._kiq(
+            change_privacy_settings_task,
+            user_id,
+            str(user_id),
+            new_privacy_settings,
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
     @staticmethod
-    async def send_activate_user_task(user_id: UUID) -> str:
-        task = await activate_user_task.kiq(str(user_id))
+    async def send_activate_user_task(
+            user_id: UUID,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            activate_user_task,
+            user_id,
+            str(user_id),
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
     @staticmethod
-    async def send_deactivate_user_task(user_id: UUID) -> str:
-        task = await deactivate_user_task.kiq(str(user_id))
+    async def send_deactivate_user_task(
+            user_id: UUID,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            deactivate_user_task,
+            user_id,
+            str(user_id),
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
     @staticmethod
-    async def send_block_user_task(user_id: UUID) -> str:
-        task = await block_user_task.kiq(str(user_id))
+    async def send_block_user_task(
+            user_id: UUID,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            block_user_task,
+            user_id,
+            str(user_id),
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
     @staticmethod
-    async def send_record_profile_view_task(user_id: UUID, viewer_id: UUID, viewer_ip: str) -> str:
-        task = await record_profile_view_task.kiq(str(user_id), str(viewer_id), viewer_ip)
+    async def send_record_profile_view_task(
+            user_id: UUID,
+            viewer_id: UUID,
+            viewer_ip: str,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            record_profile_view_task,
+            user_id,
+            str(user_id),
+            str(viewer_id),
+            viewer_ip,
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
 
-    async def get_task_result(self, task_id: str) -> Dict[str, Any]:
+    async def send_batch_task(
+            self,
+            items: List[Dict[str, Any]],
+            idempotency_key: Optional[str] = None,
+            priority: str = BULK
+    ) -> List[str]:
+        groups: Dict[int, List[Dict[str, Any]]] = {}
+        for index, item in enumerate(items):
+            partition = partition_for(str(item["user_id"]), self.broker.partitions)
+            groups.setdefault(partition, []).append({
+                "index": index,
+                "user_id": str(item["user_id"]),
+                "command": item["command"],
+                "payload": item.get("payload") or {}
+            })
+
+        tasks = await asyncio.gather(*(
+            TaskiqService._kiq(
+                batch_commands_task,
+                group[0]["user_id"],
+                group,
+                idempotency_key=idempotency_key,
+                priority=priority
+            )
+            for group in groups.values()
+        ))
+        return [task.task_id for task in tasks]
+
+    async def await_batch(self, task_ids: List[str], wait_ms: Optional[int]) -> Dict[str, Any]:
+        queued_response = {"task_ids": task_ids, "status": "queued"}
+        if not wait_ms:
+            return queued_response
+
         try:
-            if self.broker:
-                result = await self.broker.result_backend.get_result(task_id)
-                if result:
-                    return {
-                        "status": "completed",
-                        "result": result.return_value,
-                        "error": result.error,
-                        "task_id": task_id
-                    }
+            results = await asyncio.gather(*(
+                self.broker.result_backend.wait_for_result(task_id, timeout=wait_ms / 1000)
+                for task_id in task_ids
+            ))
+        except Exception as e:
+            print(f"Error waiting for batch tasks {task_ids}: {e}")
+            return queued_response
+
+        items = []
+        pending = []
+        for task_id, result in zip(task_ids, results):
+            if result is None:
+                pending.append(task_id)
+            elif isinstance(result.return_value, dict) and "results" in result.return_value:
+                items.extend(result.return_value["results"])
+            else:
+                items.append(self._task_status(task_id, result))
 
+        items.sort(key=lambda item: item.get("index", -1))
+        failed = sum(1 for item in items if not item.get("success"))
+        return {
+            "task_ids": task_ids,
+            "status": "queued" if pending else "completed",
+            "pending_task_ids": pending,
+            "success": not pending and failed == 0,
+            "succeeded": len(items) - failed,
+            "failed": failed,
+            "results": items
+        }
+
+    @staticmethod
+    def _task_status(task_id: str, result: Optional[TaskiqResult]) -> Dict[str, Any]:
+        if result is None:
             return {"status": "pending", "task_id": task_id}
 
+        return {
+            "status": "failed" if result.is_err else "completed",
+            "result": result.return_value,
+            "error": repr(result.error) if result.error else None,
+            "task_id": task_id
+        }
+
+    async def await_task(self, task_id: str, wait_ms: Optional[int], **queued: Any) -> Dict[str, Any]:
+        queued_response = {"task_id": task_id, "status": "queued", **queued}
+        if not wait_ms:
+            return queued_response
+
+        try:
+            result = await self.broker.result_backend.wait_for_result(task_id, timeout=wait_ms / 1000)
+        except Exception as e:
+            print(f"Error waiting for task {task_id}: {e}")
+            return queued_response
+
+        if result is None:
+            return queued_response
+
+        status = self._task_status(task_id, result)
+        if isinstance(result.return_value, dict):
+            status["success"] = result.return_value.get("success", not result.is_err)
+            status["version"] = result.return_value.get("version")
+        return status
+
+    async def get_lane_stats(self) -> Dict[str, Any]:
+        workers = await self.broker.worker_lane_stats()
+        monitor = get_queue_lag_monitor()
+        await monitor.retry_after(INTERACTIVE)
+        return {
+            "lanes": self.broker.aggregate_lane_stats(workers),
+            "backlog": monitor.snapshot(),
+            "workers": workers
+        }
+
+    async def get_task_result(self, task_id: str) -> Dict[str, Any]:
+        return (await self.get_task_results([task_id]))[task_id]
+
+    async def get_task_results(self, task_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        try:
+            results = await self.broker.result_backend.get_results(task_ids)
+            return {task_id: self._task_status(task_id, results[task_id]) for task_id in task_ids}
+
         except Exception as e:
-            print(f"Error getting task result: {e}")
-            return {"status": "error", "task_id": task_id, "error": str(e)}
+            print(f"Error getting task results: {e}")
+            return {task_id: {"status": "error", "task_id": task_id, "error": str(e)} for task_id in task_ids}
 
     @staticmethod
-    async def send_delete_user_task(user_id: UUID) -> str:
-        task = await delete_user_task.kiq(str(user_id))
+    async def send_delete_user_task(
+            user_id: UUID,
+            idempotency_key: Optional[str] = None,
+            priority: str = INTERACTIVE
+    ) -> str:
+        task = await TaskiqService._kiq(
+            delete_user_task,
+            user_id,
+            str(user_id),
+            idempotency_key=idempotency_key,
+            priority=priority
+        )
         return task.task_id
@@ -0,0 +1,20 @@
+from typing import Any, AsyncContextManager
+from taskiq import TaskiqMessage, TaskiqMiddleware, TaskiqResult
+from LuminUserService.app.infrastructure.persistanse.user_loader import request_user_loader_scope
+
+
+class UserLoaderMiddleware(TaskiqMiddleware):
+    def __init__(self) -> None:
+        super().__init__()
+        self._scopes: dict[str, AsyncContextManager] = {}
+
+    async def pre_execute(self, message: TaskiqMessage) -> TaskiqMessage:
+        scope = request_user_loader_scope()
+        await scope.__aenter__()
+        self._scopes[message.task_id] = scope
+        return message
+
+    async def post_execute(self, message: TaskiqMessage, result: TaskiqResult[Any]) -> None:
+        scope = self._scopes.pop(message.task_id, None)
+        if scope is not None:
+            await scope.__aexit__(None, None, None)
@@ -1,14 +1,29 @@
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 from litestar import Litestar
 from litestar.logging import LoggingConfig
 from litestar.openapi import OpenAPIConfig
 from LuminUserService.app.infrastructure.cache.redis_cache import CacheConfig
-from LuminUserService.app.presentation.api.controllers import UserController
+from LuminUserService.app.presentation.api.controllers import AdminController, HealthController, UserController
+from LuminUserService.app.presentation.api.middleware import UserLoaderMiddleware
 
 logger = logging.getLogger(__name__)
 
 
+async def warm_up_cache(app: Litestar) -> None:
+    try:
+        from LuminUserService.app.infrastructure.persistanse.database import get_dependency_container
+
+        user_service = await get_dependency_container().get_user_service()
+        warmed = await user_service.warm_up_cache()
+        logger.info(f"Cache warm-up finished: {warmed} users")
+    except Exception as e:
+        logger.error(f"Cache warm-up failed: {e}")
+    finally:
+        app.state.ready = True
+
+
 @asynccontextmanager
 async def lifespan(app: Litestar):
     logger.info("🔄 Starting application lifespan...")
@@ -19,10 +34,17 @@ async def lifespan(app: Litestar):
             port=6379,
             password=None,
             db=0,
-            default_ttl=3600
+            default_ttl=3600,
+            ttl_jitter=0.1,
+            stale_ttl=300,
+            early_refresh_beta=1.0,
+            hot_set_size=1000,
+            warmup_batch_size=100,
+            warmup_concurrency=4
         )
 
         app.state.redis_config = redis_config
+        app.state.ready = False
 
         from LuminUserService.app.infrastructure.tasks.taskiq_broker import startup_broker
         await startup_broker()
@@ -34,6 +56,7 @@ async def lifespan(app: Litestar):
         logger.info("EventBus connected")
 
         app.state.event_bus = event_bus
+        app.state.warm_up = asyncio.create_task(warm_up_cache(app))
 
         yield
 
@@ -43,6 +66,10 @@ async def lifespan(app: Litestar):
 
     finally:
         logger.info("🔄 Shutting down...")
+        warm_up = getattr(app.state, "warm_up", None)
+        if warm_up is not None and not warm_up.done():
+            warm_up.cancel()
+
         try:
             from LuminUserService.app.infrastructure.tasks.taskiq_broker import shutdown_broker
             await shutdown_broker()
@@ -51,6 +78,10 @@ async def lifespan(app: Litestar):
             from LuminUserService.app.infrastructure.persistanse.database import get_dependency_container
 
             container = get_dependency_container()
+            cache = await container.get_multi_level_cache()
+            await cache.persist_hot_set()
+            logger.info("Hot user set persisted")
+
             if hasattr(container, "_redis_cache") and container._redis_cache:
                 await container._redis_cache.disconnect()
 
@@ -71,8 +102,9 @@ openapi_config = OpenAPIConfig(
 )
 
 app = Litestar(
-    route_handlers=[UserController],
+    route_handlers=[UserController, AdminController, HealthController],
     lifespan=[lifespan],
+    middleware=[UserLoaderMiddleware],
     logging_config=logging_config,
     openapi_config=openapi_config,
     debug=True
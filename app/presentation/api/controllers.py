@@ -1,12 +1,25 @@
-from typing import Annotated, Dict, Any
+from typing import Annotated, Dict, Any, List, Optional
 from uuid import UUID
-from litestar import Controller, get, post, patch
+from litestar import Controller, MediaType, Request, Response, get, post, patch
+from litestar.connection import ASGIConnection
 from litestar.di import Provide
 from litestar.exceptions import HTTPException
+from litestar.handlers import BaseRouteHandler
 from litestar.params import Parameter
-from litestar.status_codes import HTTP_404_NOT_FOUND, HTTP_500_INTERNAL_SERVER_ERROR
+from litestar.serialization import encode_json
+from litestar.status_codes import (
+    HTTP_304_NOT_MODIFIED, HTTP_404_NOT_FOUND, HTTP_429_TOO_MANY_REQUESTS, HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_503_SERVICE_UNAVAILABLE
+)
 
-from LuminUserService.app.infrastructure.persistanse.pydantic_models import CreateUserRequest, PrivacySettingsUpdate
+from LuminUserService.app.application.queries.get_by_id import GetUserByIdQuery, ReadUserByIdHandler
+from LuminUserService.app.infrastructure.cache.multi_level_cache import MultiLevelCache
+from LuminUserService.app.infrastructure.cache.response_cache import UserResponseCache
+from LuminUserService.app.infrastructure.persistanse.pydantic_models import (
+    BatchCommandRequest, CreateUserRequest, PrivacySettingsUpdate
+)
+from LuminUserService.app.infrastructure.tasks.partitioned_broker import BULK, INTERACTIVE
+from LuminUserService.app.infrastructure.tasks.taskiq_broker import get_queue_lag_monitor
 from LuminUserService.app.infrastructure.tasks.taskiq_service import TaskiqService
 
 
@@ -15,6 +28,60 @@ def get_taskiq_service() -> TaskiqService:
     return TaskiqService()
 
 
+async def get_read_user_by_id_handler() -> ReadUserByIdHandler:
+    from LuminUserService.app.infrastructure.persistanse.database import get_dependency_container
+
+    container = get_dependency_container()
+    return await container.get_read_user_by_id_handler()
+
+
+async def get_multi_level_cache() -> MultiLevelCache:
+    from LuminUserService.app.infrastructure.persistanse.database import get_dependency_container
+
+    container = get_dependency_container()
+    return await container.get_multi_level_cache()
+
+
+MAX_COMMAND_WAIT_MS = 10000
+
+WaitParameter = Annotated[Optional[int], Parameter(
+    query="wait",
+    ge=0,
+    le=MAX_COMMAND_WAIT_MS,
+    description="Сколько миллисекунд ждать завершения задачи перед ответом"
+)]
+
+IdempotencyKeyParameter = Annotated[Optional[str], Parameter(
+    header="Idempotency-Key",
+    min_length=1,
+    max_length=255,
+    description="Ключ идемпотентности: повтор запроса с тем же ключом не выполняет команду повторно"
+)]
+
+
+async def ensure_command_capacity(lane: str) -> None:
+    retry_after = await get_queue_lag_monitor().retry_after(lane)
+    if retry_after is not None:
+        raise HTTPException(
+            detail=f"Command queue {lane} is lagging, retry in {retry_after}s",
+            status_code=HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+async def command_backpressure(_: ASGIConnection, route_handler: BaseRouteHandler) -> None:
+    await ensure_command_capacity(route_handler.opt.get("priority", INTERACTIVE))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
 class UserController(Controller):
     path = "/api/users"
     dependencies = {"taskiq_service": Provide(get_taskiq_service)}
@@ -23,42 +90,57 @@ class UserController(Controller):
         "/{user_id:uuid}",
         summary="Get user by ID",
         description="Получить информацию о пользователе по его идентификатору",
+        dependencies={
+            "cache": Provide(get_multi_level_cache),
+            "read_handler": Provide(get_read_user_by_id_handler)
+        },
     )
     async def get_user_by_id(
         self,
+        request: Request,
         user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
-        taskiq_service: TaskiqService
-    ) -> Dict[str, Any]:
+        taskiq_service: TaskiqService,
+        cache: MultiLevelCache,
+        read_handler: ReadUserByIdHandler,
+        via_taskiq: Annotated[bool, Parameter(
+            query="via_taskiq",
+            description="Читать через Taskiq-воркер вместо прямого пути чтения"
+        )] = False
+    ) -> Response[bytes]:
         try:
-            print(f"[taskiq_handlers] Getting user by id: {user_id}")
+            version = await cache.get_user_version(user_id)
+            if version is not None:
+                etag = UserResponseCache.etag(version)
+                if etag_matches(request, etag):
+                    return Response(content=b"", status_code=HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-            result = await taskiq_service.send_get_user_by_id_task(user_id)
+                body = await cache.responses.get(user_id, version)
+                if body is not None:
+                    return Response(content=body, media_type=MediaType.JSON, headers={"ETag": etag})
 
-            if result is None:
-                print("[taskiq_handlers] Taskiq returned None, trying direct approach...")
+            result = None
+            if via_taskiq:
+                result = await taskiq_service.send_get_user_by_id_task(user_id)
 
-                from LuminUserService.app.infrastructure.persistanse.database import get_dependency_container
-                from LuminUserService.app.infrastructure.persistanse.user_mapper import UserMapper
+            if result is None or not result.get("success"):
+                result = await read_handler.handle(GetUserByIdQuery(user_id=user_id))
 
-                container = get_dependency_container()
-                user_service = await container.get_user_service()
-                user = await user_service.get_user_by_id(user_id)
+            if not result.get("success"):
+                raise HTTPException(
+                    detail="User not found",
+                    status_code=HTTP_404_NOT_FOUND
+                )
 
-                if not user:
-                    raise HTTPException(
-                        detail="User not found",
-                        status_code=HTTP_404_NOT_FOUND
-                    )
+            version = result["user"].get("version")
+            body = encode_json(result)
+            if version is None:
+                return Response(content=body, media_type=MediaType.JSON)
 
-                return UserMapper().to_persistence(user)
-
-            print(f"[taskiq_handlers] Taskiq result: {result}")
-
-            if isinstance(result, dict):
-                return result
-            else:
-                from LuminUserService.app.infrastructure.persistanse.user_mapper import UserMapper
-                return result
+            etag = UserResponseCache.etag(version)
+            await cache.responses.set(user_id, version, body)
+            if etag_matches(request, etag):
+                return Response(content=b"", status_code=HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            return Response(content=body, media_type=MediaType.JSON, headers={"ETag": etag})
 
         except ValueError as e:
             raise HTTPException(
@@ -80,21 +162,51 @@ class UserController(Controller):
         "/",
         summary="Create new user",
         description="Создать нового пользователя",
+        guards=[command_backpressure],
     )
     async def create_user(
         self,
         data: CreateUserRequest,
-        taskiq_service: TaskiqService
+        taskiq_service: TaskiqService,
+        wait: WaitParameter = None,
+        idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
             user_dict = data.dict()
 
-            task_id = await taskiq_service.send_create_user_task(user_dict)
-            return {
-                "task_id": task_id,
-                "status": "queued",
-                "user_id": data.user_id
-            }
+            task_id = await taskiq_service.send_create_user_task(user_dict, idempotency_key=idempotency_key)
+            return await taskiq_service.await_task(task_id, wait, user_id=data.user_id)
+        except Exception as e:
+            raise HTTPException(
+                detail=str(e),
+                status_code=HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    @post(
+        "/batch",
+        summary="Run a batch of commands",
+        description="Выполнить пакет команд над несколькими пользователями; результат возвращается по каждой команде",
+    )
+    async def run_batch(
+        self,
+        data: BatchCommandRequest,
+        taskiq_service: TaskiqService,
+        wait: WaitParameter = None,
+        idempotency_key: IdempotencyKeyParameter = None,
+        priority: Annotated[str, Parameter(
+            query="priority",
+            pattern=f"^({INTERACTIVE}|{BULK})$",
+            description="Очередь выполнения: interactive или bulk"
+        )] = BULK
+    ) -> Dict[str, Any]:
+        await ensure_command_capacity(priority)
+        try:
+            task_ids = await taskiq_service.send_batch_task(
+                [item.dict() for item in data.items],
+                idempotency_key=idempotency_key,
+                priority=priority
+            )
+            return await taskiq_service.await_batch(task_ids, wait)
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
@@ -105,20 +217,23 @@ class UserController(Controller):
         "/{user_id:uuid}/username",
         summary="Change username",
         description="Изменить имя пользователя (first name и last name)",
+        guards=[command_backpressure],
     )
     async def change_username(
         self,
         user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
         new_first_name: Annotated[str, Parameter(description="New first name")],
         new_last_name: Annotated[str, Parameter(description="New last name")],
-        taskiq_service: TaskiqService
+        taskiq_service: TaskiqService,
+        wait: WaitParameter = None,
+        idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
             task_id = await taskiq_service.send_change_username_task(user_id, {
                 "first_name": new_first_name,
                 "last_name": new_last_name
-            })
-            return {"task_id": task_id, "status": "queued"}
+            }, idempotency_key=idempotency_key)
+            return await taskiq_service.await_task(task_id, wait)
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
@@ -129,16 +244,19 @@ class UserController(Controller):
         "/{user_id:uuid}/email",
         summary="Change email",
         description="Изменить email пользователя",
+        guards=[command_backpressure],
     )
     async def change_email(
         self,
         user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
         new_email: Annotated[str, Parameter(description="New email")],
-        taskiq_service: TaskiqService
+        taskiq_service: TaskiqService,
+        wait: WaitParameter = None,
+        idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
-            task_id = await taskiq_service.send_change_email_task(user_id, new_email)
-            return {"task_id": task_id, "status": "queued"}
+            task_id = await taskiq_service.send_change_email_task(user_id, new_email, idempotency_key=idempotency_key)
+            return await taskiq_service.await_task(task_id, wait)
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
@@ -149,16 +267,19 @@ class UserController(Controller):
         "/{user_id:uuid}/phone",
         summary="Change phone number",
         description="Изменить номер телефона пользователя",
+        guards=[command_backpressure],
     )
     async def change_phone(
         self,
         user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
         new_phone: Annotated[str, Parameter(description="New phone")],
-        taskiq_service: TaskiqService
+        taskiq_service: TaskiqService,
+        wait: WaitParameter = None,
+        idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
-            task_id = await taskiq_service.send_change_phone_task(user_id, new_phone)
-            return {"task_id": task_id, "status": "queued"}
+            task_id = await taskiq_service.send_change_phone_task(user_id, new_phone, idempotency_key=idempotency_key)
+            return await taskiq_service.await_task(task_id, wait)
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
@@ -169,16 +290,19 @@ class UserController(Controller):
         "/{user_id:uuid}/date",
         summary="Change date of birth",
         description="Изменить дату рождения пользователя",
+        guards=[command_backpressure],
     )
     async def change_date(
         self,
         user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
         new_date: Annotated[str, Parameter(description="New date (ISO format)")],
-        taskiq_service: TaskiqService
+        taskiq_service: TaskiqService,
+        wait: WaitParameter = None,
+        idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
-            task_id = await taskiq_service.send_change_date_task(user_id, new_date)
-            return {"task_id": task_id, "status": "queued"}
+            task_id = await taskiq_service.send_change_date_task(user_id, new_date, idempotency_key=idempotency_key)
+            return await taskiq_service.await_task(task_id, wait)
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
@@ -189,16 +313,19 @@ class UserController(Controller):
         "/{user_id:uuid}/bio",
         summary="Change bio",
         description="Изменить биографию пользователя",
+        guards=[command_backpressure],
     )
     async def change_bio(
         self,
         user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
         new_bio: Annotated[str, Parameter(description="New bio")],
-        taskiq_service: TaskiqService
+        taskiq_service: TaskiqService,
+        wait: WaitParameter = None,
+        idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
-            task_id = await taskiq_service.send_change_bio_task(user_id, new_bio)
-            return {"task_id": task_id, "status": "queued"}
+            task_id = await taskiq_service.send_change_bio_task(user_id, new_bio, idempotency_key=idempotency_key)
+            return await taskiq_service.await_task(task_id, wait)
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
@@ -209,16 +336,23 @@ class UserController(Controller):
         "/{user_id:uuid}/language_code",
         summary="Change language code",
         description="Изменить языковой код пользователя",
+        guards=[command_backpressure],
     )
     async def change_language_code(
         self,
         user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
         new_language_code: Annotated[str, Parameter(description="New language code")],
-        taskiq_service: TaskiqService
+        taskiq_service: TaskiqService,
+        wait: WaitParameter = None,
+        idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
-            task_id = await taskiq_service.send_change_language_code_task(user_id, new_language_code)
-            return {"task_id": task_id, "status": "queued"}
+            task_id = await taskiq_service.send_change_language_code_task(
+                user_id,
+                new_language_code,
+                idempotency_key=idempotency_key
+            )
+            return await taskiq_service.await_task(task_id, wait)
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
@@ -229,16 +363,23 @@ class UserController(Controller):
         "/{user_id:uuid}/avatar_url",
         summary="Change avatar URL",
         description="Изменить URL аватара пользователя",
+        guards=[command_backpressure],
     )
     async def change_avatar_url(
         self,
         user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
         new_avatar_url: Annotated[str, Parameter(description="New avatar URL")],
-        taskiq_service: TaskiqService
+        taskiq_service: TaskiqService,
+        wait: WaitParameter = None,
+        idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
-            task_id = await taskiq_service.send_change_avatar_url_task(user_id, new_avatar_url)
-            return {"task_id": task_id, "status": "queued"}
+            task_id = await taskiq_service.send_change_avatar_url_task(
+                user_id,
+                new_avatar_url,
+                idempotency_key=idempotency_key
+            )
+            return await taskiq_service.await_task(task_id, wait)
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
@@ -249,20 +390,24 @@ class UserController(Controller):
         "/{user_id:uuid}/privacy_settings",
         summary="Change privacy settings",
         description="Изменить настройки приватности пользователя",
+        guards=[command_backpressure],
     )
     async def change_privacy_settings(
         self,
         user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
         data: PrivacySettingsUpdate,
-        taskiq_service: TaskiqService
+        taskiq_service: TaskiqService,
+        wait: WaitParameter = None,
+        idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
             print(f"Privacy settings received: {data.dict()}")
             task_id = await taskiq_service.send_change_privacy_settings_task(
                 user_id,
-                data.dict()
+                data.dict(),
+                idempotency_key=idempotency_key
             )
-            return {"task_id": task_id, "status": "queued"}
+            return await taskiq_service.await_task(task_id, wait)
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
@@ -273,15 +418,18 @@ class UserController(Controller):
         "/{user_id:uuid}/activate",
         summary="Activate user",
         description="Активировать пользователя",
+        guards=[command_backpressure],
     )
     async def activate_user(
         self,
         user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
-        taskiq_service: TaskiqService
+        taskiq_service: TaskiqService,
+        wait: WaitParameter = None,
+        idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
-            task_id = await taskiq_service.send_activate_user_task(user_id)
-            return {"task_id": task_id, "status": "queued"}
+            task_id = await taskiq_service.send_activate_user_task(user_id, idempotency_key=idempotency_key)
+            return await taskiq_service.await_task(task_id, wait)
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
@@ -292,15 +440,18 @@ class UserController(Controller):
         "/{user_id:uuid}/deactivate",
         summary="Deactivate user",
         description="Деактивировать пользователя",
+        guards=[command_backpressure],
     )
     async def deactivate_user(
         self,
         user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
-        taskiq_service: TaskiqService
+        taskiq_service: TaskiqService,
+        wait: WaitParameter = None,
+        idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
-            task_id = await taskiq_service.send_deactivate_user_task(user_id)
-            return {"task_id": task_id, "status": "queued"}
+            task_id = await taskiq_service.send_deactivate_user_task(user_id, idempotency_key=idempotency_key)
+            return await taskiq_service.await_task(task_id, wait)
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
@@ -326,23 +477,40 @@ class UserController(Controller):
                 status_code=HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @get(
+        "/tasks",
+        summary="Get status of many tasks",
+        description="Получить статусы нескольких асинхронных задач одним запросом",
+    )
+    async def get_task_statuses(
+        self,
+        task_ids: Annotated[List[str], Parameter(query="ids", description="Task IDs", max_items=100)],
+        taskiq_service: TaskiqService
+    ) -> Dict[str, Any]:
+        try:
+            return await taskiq_service.get_task_results(task_ids)
+        except Exception as e:
+            raise HTTPException(
+                detail=str(e),
+                status_code=HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
     @patch(
         "/{user_id:uuid}/delete",
         summary="Delete user",
         description="Удалить пользователя",
+        guards=[command_backpressure],
     )
     async def delete_user(
             self,
             user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
-            taskiq_service: TaskiqService
+            taskiq_service: TaskiqService,
+            wait: WaitParameter = None,
+            idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
-            task_id = await taskiq_service.send_delete_user_task(user_id)
-            return {
-                "task_id": task_id,
-                "status": "queued",
-                "user_id": user_id
-            }
+            task_id = await taskiq_service.send_delete_user_task(user_id, idempotency_key=idempotency_key)
+            return await taskiq_service.await_task(task_id, wait, user_id=user_id)
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
@@ -353,21 +521,86 @@ class UserController(Controller):
         "/{user_id:uuid}/block",
         summary="Block user",
         description="Заблокировать пользователя",
+        guards=[command_backpressure],
     )
     async def block_user(
             self,
             user_id: Annotated[UUID, Parameter(description="User ID (UUID)")],
-            taskiq_service: TaskiqService
+            taskiq_service: TaskiqService,
+            wait: WaitParameter = None,
+            idempotency_key: IdempotencyKeyParameter = None
     ) -> Dict[str, Any]:
         try:
-            task_id = await taskiq_service.send_block_user_task(user_id)
+            task_id = await taskiq_service.send_block_user_task(user_id, idempotency_key=idempotency_key)
+            return await taskiq_service.await_task(task_id, wait, user_id=user_id)
+        except Exception as e:
+            raise HTTPException(
+                detail=str(e),
+                status_code=HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class AdminController(Controller):
+    path = "/api/admin"
+    dependencies = {"cache": Provide(get_multi_level_cache)}
+
+    @get(
+        "/cache/metrics",
+        summary="Get cache metrics",
+        description="Получить метрики кэша пользователей",
+    )
+    async def get_cache_metrics(self, cache: MultiLevelCache) -> Dict[str, Any]:
+        try:
             return {
-                "task_id": task_id,
-                "status": "queued",
-                "user_id": user_id
+                **cache.metrics.snapshot(),
+                "redis_breaker": cache.redis.breaker.snapshot(),
+                "pending_invalidations": cache.redis.pending_invalidations
             }
         except Exception as e:
             raise HTTPException(
                 detail=str(e),
                 status_code=HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+    @get(
+        "/cache/hot-keys",
+        summary="Get hot cache keys",
+        description="Получить список самых читаемых профилей (горячих ключей кэша)",
+    )
+    async def get_cache_hot_keys(self, cache: MultiLevelCache) -> Dict[str, Any]:
+        try:
+            return {"hot_keys": cache.hot_keys_snapshot()}
+        except Exception as e:
+            raise HTTPException(
+                detail=str(e),
+                status_code=HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    @get(
+        "/tasks/lanes",
+        summary="Get command lane metrics",
+        description="Получить глубину очередей и время ожидания по приоритетным очередям команд",
+        dependencies={"taskiq_service": Provide(get_taskiq_service)},
+    )
+    async def get_lane_stats(self, taskiq_service: TaskiqService) -> Dict[str, Any]:
+        try:
+            return await taskiq_service.get_lane_stats()
+        except Exception as e:
+            raise HTTPException(
+                detail=str(e),
+                status_code=HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class HealthController(Controller):
+    path = "/health"
+
+    @get(
+        "/",
+        summary="Readiness check",
+        description="Проверить готовность сервиса (кэш прогрет)",
+    )
+    async def get_health(self, request: Request) -> Response[Dict[str, Any]]:
+        if not getattr(request.app.state, "ready", False):
+            return Response(content={"status": "warming_up"}, status_code=HTTP_503_SERVICE_UNAVAILABLE)
+        return Response(content={"status": "ok"})
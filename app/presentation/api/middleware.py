@@ -0,0 +1,12 @@
+from litestar.enums import ScopeType
+from litestar.middleware import AbstractMiddleware
+from litestar.types import Receive, Scope, Send
+from LuminUserService.app.infrastructure.persistanse.user_loader import request_user_loader_scope
+
+
+class UserLoaderMiddleware(AbstractMiddleware):
+    scopes = {ScopeType.HTTP}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async with request_user_loader_scope():
+            await self.app(scope, receive, send)
@@ -0,0 +1,69 @@
+import datetime
+import logging
+import time
+from uuid import uuid4
+from LuminUserService.app.infrastructure.cache.codec import ValueCodec, available_codecs
+from LuminUserService.benchmarks.users import build_user_row
+
+ITERATIONS = 200
+PROFILES = {
+    "small": (0, 0),
+    "medium": (50, 200),
+    "large": (500, 2000),
+}
+
+
+def build_profile_row(list_size: int, views: int) -> dict:
+    row = build_user_row()
+
+    for name in row:
+        if name.endswith("_black_list") or name.endswith("_white_list"):
+            row[name] = [str(uuid4()) for _ in range(list_size)]
+
+    viewed_at = datetime.datetime.now()
+    row["profile_views"] = [
+        {
+            "view_id": str(uuid4()),
+            "viewer_id": str(uuid4()),
+            "view_ip": f"10.0.{index % 256}.{index // 256 % 256}",
+            "viewed_at": (viewed_at - datetime.timedelta(minutes=index)).isoformat()
+        }
+        for index in range(views)
+    ]
+    return row
+
+
+def measure(codec: ValueCodec, row: dict) -> tuple[int, float, float]:
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        encoded = codec.dumps(row)
+    encode_time = (time.perf_counter() - started) / ITERATIONS
+
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        codec.loads(encoded)
+    decode_time = (time.perf_counter() - started) / ITERATIONS
+
+    return len(encoded), encode_time, decode_time
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.ERROR)
+    print(f"Codecs available: {', '.join(available_codecs())}")
+    print(f"{'profile':<8} {'codec':<6} {'bytes':>9} {'ratio':>6} {'encode us':>10} {'decode us':>10}")
+
+    for profile, (list_size, views) in PROFILES.items():
+        row = build_profile_row(list_size, views)
+        raw_size, raw_encode, raw_decode = measure(ValueCodec(threshold=2 ** 31), row)
+        print(f"{profile:<8} {'none':<6} {raw_size:>9} {1.0:>6.2f} {raw_encode * 1e6:>10.1f} {raw_decode * 1e6:>10.1f}")
+
+        for name in available_codecs():
+            size, encode_time, decode_time = measure(ValueCodec(codec=name), row)
+            print(
+                f"{profile:<8} {name:<6} {size:>9} {raw_size / size:>6.2f} "
+                f"{encode_time * 1e6:>10.1f} {decode_time * 1e6:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import asyncio
+import logging
+import time
+from LuminUserService.app.domain.models.aggregates.user import User
+from LuminUserService.app.infrastructure.cache.multi_level_cache import MultiLevelCache
+from LuminUserService.app.infrastructure.cache.redis_cache import CacheConfig, RedisCache
+from LuminUserService.app.infrastructure.persistanse.identity_map import UserIdentityMap
+from LuminUserService.benchmarks.users import build_user_row
+
+CONCURRENT_READS = 1000
+DB_LATENCY = 0.005
+
+
+class CountingLoader:
+    def __init__(self, row: dict) -> None:
+        self.row = row
+        self.queries = 0
+
+    async def __call__(self, user_id) -> dict:
+        self.queries += 1
+        await asyncio.sleep(DB_LATENCY)
+        return self.row
+
+
+async def read_without_coalescing(cache: MultiLevelCache, loader: CountingLoader, user_id) -> User:
+    user = await cache.get_user(user_id)
+    if user:
+        return user
+
+    row = await loader(user_id)
+    await cache.set_user(user_id, row)
+    return cache.identity_map.get(user_id)
+
+
+async def run_scenario(name: str, coalesce: bool) -> None:
+    row = build_user_row()
+    cache = MultiLevelCache(RedisCache(CacheConfig()), UserIdentityMap())
+    loader = CountingLoader(row)
+
+    started = time.perf_counter()
+    if coalesce:
+        await asyncio.gather(*(
+            cache.get_or_load(row["user_id"], loader) for _ in range(CONCURRENT_READS)
+        ))
+    else:
+        await asyncio.gather(*(
+            read_without_coalescing(cache, loader, row["user_id"]) for _ in range(CONCURRENT_READS)
+        ))
+    elapsed = time.perf_counter() - started
+
+    print(f"{name:<22} reads={CONCURRENT_READS:<6} db_queries={loader.queries:<6} elapsed={elapsed * 1000:.1f} ms")
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.ERROR)
+    print(f"Cold key stampede: {CONCURRENT_READS} simultaneous reads, {DB_LATENCY * 1000:.0f} ms per DB query")
+    await run_scenario("without single-flight", coalesce=False)
+    await run_scenario("with single-flight", coalesce=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import statistics
+import time
+from LuminUserService.app.application.queries.get_by_id import GetUserByIdQuery, ReadUserByIdHandler
+from LuminUserService.app.infrastructure.cache.multi_level_cache import MultiLevelCache
+from LuminUserService.app.infrastructure.cache.redis_cache import CacheConfig, RedisCache
+from LuminUserService.app.infrastructure.persistanse.identity_map import UserIdentityMap
+from LuminUserService.app.infrastructure.persistanse.user_read_repository import UserReadRepository
+from LuminUserService.benchmarks.users import build_user_row
+
+USERS = 200
+REQUESTS = 5000
+CONCURRENCY = 100
+DB_LATENCY = 0.005
+BROKER_HOP = 0.001
+WORKERS = 10
+
+
+class SimulatedDatabaseReadRepository(UserReadRepository):
+    def __init__(self, rows: dict, cache: MultiLevelCache) -> None:
+        super().__init__(connection_factory=None, cache=cache)
+        self.rows = rows
+
+    async def _fetch_user_rows(self, user_ids: list) -> list[dict]:
+        await asyncio.sleep(DB_LATENCY)
+        return [self.rows[user_id] for user_id in user_ids if user_id in self.rows]
+
+
+class SimulatedBroker:
+    def __init__(self, handler: ReadUserByIdHandler) -> None:
+        self.handler = handler
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+    async def worker(self) -> None:
+        while True:
+            query, future = await self.queue.get()
+            result = await self.handler.handle(query)
+            await asyncio.sleep(BROKER_HOP)
+            future.set_result(result)
+
+    async def send(self, query: GetUserByIdQuery) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        await asyncio.sleep(BROKER_HOP)
+        await self.queue.put((query, future))
+        return await future
+
+
+def build_handler(rows: dict) -> ReadUserByIdHandler:
+    cache = MultiLevelCache(RedisCache(CacheConfig()), UserIdentityMap())
+    return ReadUserByIdHandler(SimulatedDatabaseReadRepository(rows, cache))
+
+
+async def measure(name: str, read, user_ids: list) -> None:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies = []
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await read(GetUserByIdQuery(user_id=user_ids[index % len(user_ids)]))
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(one(index) for index in range(REQUESTS)))
+
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:<14} requests={REQUESTS:<6} p50={p50:7.2f} ms  p99={p99:7.2f} ms")
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.ERROR)
+    rows = {row["user_id"]: row for row in (build_user_row() for _ in range(USERS))}
+    user_ids = list(rows)
+
+    print(
+        f"GET user: {USERS} users, {CONCURRENCY} concurrent clients, "
+        f"{DB_LATENCY * 1000:.0f} ms per DB query, {BROKER_HOP * 1000:.0f} ms per broker hop, {WORKERS} workers"
+    )
+
+    await measure("direct read", build_handler(rows).handle, user_ids)
+
+    broker = SimulatedBroker(build_handler(rows))
+    workers = [asyncio.ensure_future(broker.worker()) for _ in range(WORKERS)]
+    await measure("via taskiq", broker.send, user_ids)
+    for worker in workers:
+        worker.cancel()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,25 @@
+import datetime
+from uuid import uuid4
+from LuminUserService.app.domain.models.aggregates.user import User
+from LuminUserService.app.domain.models.common.value_objects import (
+    Username, Date, Email, Bio, AvatarURL,
+    PrivacySettings, PhoneNumber, LanguageCode
+)
+from LuminUserService.app.infrastructure.persistanse.user_mapper import UserMapper
+
+
+def build_user_row() -> dict:
+    user = User(
+        user_id=uuid4(),
+        username=Username(first_name="John", last_name="Doe"),
+        date=Date(value=datetime.datetime.now()),
+        phone=PhoneNumber(value="+1234567890"),
+        email=Email(value="john.doe@example.com"),
+        language_code=LanguageCode(value="en"),
+        bio=Bio(value="Software Developer"),
+        avatar_url=AvatarURL(value="https://example.com/avatar.jpg"),
+        privacy_settings=PrivacySettings(),
+        profile_views=[],
+        status="active"
+    )
+    return UserMapper().to_persistence(user)
@@ -0,0 +1,43 @@
+import datetime
+import pytest
+from typing import Callable
+from uuid import uuid4
+from LuminUserService.app.domain.models.aggregates.user import User
+from LuminUserService.app.domain.models.common.value_objects import (
+    Username, Date, Email, Bio, AvatarURL,
+    PrivacySettings, PhoneNumber, LanguageCode
+)
+from LuminUserService.app.infrastructure.persistanse.user_mapper import UserMapper
+
+
+@pytest.fixture
+def make_user() -> Callable[[], User]:
+    def build_user() -> User:
+        user = User(
+            user_id=uuid4(),
+            username=Username(first_name="John", last_name="Doe"),
+            date=Date(value=datetime.datetime.now()),
+            phone=PhoneNumber(value="+1234567890"),
+            email=Email(value="john.doe@example.com"),
+            language_code=LanguageCode(value="en"),
+            bio=Bio(value="Software Developer"),
+            avatar_url=AvatarURL(value="https://example.com/avatar.jpg"),
+            privacy_settings=PrivacySettings(),
+            profile_views=[],
+            status="active"
+        )
+        user.mark_persisted()
+        user.clear_domain_events()
+        return user
+
+    return build_user
+
+
+@pytest.fixture
+def user(make_user) -> User:
+    return make_user()
+
+
+@pytest.fixture
+def user_row(user) -> dict:
+    return UserMapper().to_persistence(user)
@@ -0,0 +1,88 @@
+import pytest
+from uuid import uuid4
+from LuminUserService.app.application.commands.batch import (
+    BatchCommand, BatchCommandHandler, BatchCommandItem, build_mutation
+)
+
+
+class TestBatchCommandHandler:
+    @pytest.fixture
+    def mock_user_service(self, mocker):
+        mock = mocker.Mock()
+        mock.apply_batch = mocker.AsyncMock()
+        return mock
+
+    @pytest.fixture
+    def mock_event_bus(self, mocker):
+        mock = mocker.Mock()
+        mock.publish = mocker.AsyncMock()
+        return mock
+
+    def test_build_mutation_applies_payload(self, user):
+        mutate = build_mutation(BatchCommandItem(
+            user_id=user.id,
+            command="change_bio",
+            payload={"new_bio": "Platform Engineer"}
+        ))
+
+        mutate(user)
+
+        assert user.bio.value == "Platform Engineer"
+
+    @pytest.mark.asyncio
+    async def test_items_are_applied_in_one_batch(self, mock_user_service, mock_event_bus, user):
+        mock_user_service.apply_batch.return_value = ([user, user], ["event"])
+        handler = BatchCommandHandler(mock_user_service, mock_event_bus)
+
+        result = await handler.handle(BatchCommand(items=[
+            BatchCommandItem(user_id=user.id, command="block"),
+            BatchCommandItem(user_id=user.id, command="change_email", payload={"new_email": "john@example.com"})
+        ]))
+
+        mock_user_service.apply_batch.assert_called_once()
+        mock_event_bus.publish.assert_awaited_once_with("event")
+        assert result["success"] is True
+        assert result["succeeded"] == 2
+        assert [item["index"] for item in result["results"]] == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_partial_failures_are_reported_per_item(self, mock_user_service, mock_event_bus, user):
+        mock_user_service.apply_batch.return_value = ([ValueError("User is blocked")], [])
+        handler = BatchCommandHandler(mock_user_service, mock_event_bus)
+
+        result = await handler.handle(BatchCommand(items=[
+            BatchCommandItem(user_id=user.id, command="rename"),
+            BatchCommandItem(user_id=user.id, command="change_phone", payload={}),
+            BatchCommandItem(user_id=user.id, command="activate", index=7)
+        ]))
+
+        assert result["success"] is False
+        assert result["failed"] == 3
+        assert "Unknown command type" in result["results"][0]["exception"]
+        assert "new_phone" in result["results"][1]["exception"]
+        assert result["results"][2] == {
+            "index": 7,
+            "user_id": user.id,
+            "command": "activate",
+            "success": False,
+            "exception": "User is blocked"
+        }
+        assert len(mock_user_service.apply_batch.call_args.args[0]) == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_falls_back_to_single_items(self, mock_user_service, mock_event_bus, user):
+        async def apply_batch(commands):
+            if len(commands) > 1:
+                raise RuntimeError("serialization failure")
+            return [user], []
+
+        mock_user_service.apply_batch.side_effect = apply_batch
+        handler = BatchCommandHandler(mock_user_service, mock_event_bus)
+
+        result = await handler.handle(BatchCommand(items=[
+            BatchCommandItem(user_id=user.id, command="block"),
+            BatchCommandItem(user_id=uuid4(), command="activate")
+        ]))
+
+        assert result["succeeded"] == 2
+        assert mock_user_service.apply_batch.call_count == 3
@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from uuid import uuid4
+from LuminUserService.app.application.services.command_batcher import CommandBatcher
+
+
+class TestCommandBatcher:
+    @pytest.fixture
+    def user_service(self, mocker):
+        mock = mocker.Mock()
+        mock.apply_batch = mocker.AsyncMock()
+        return mock
+
+    @pytest.fixture
+    def event_bus(self, mocker):
+        mock = mocker.Mock()
+        mock.publish = mocker.AsyncMock()
+        return mock
+
+    @pytest.mark.asyncio
+    async def test_concurrent_commands_share_one_commit(self, user_service, event_bus):
+        async def apply_batch(commands):
+            return [f"user-{index}" for index in range(len(commands))], ["event"]
+
+        user_service.apply_batch.side_effect = apply_batch
+        batcher = CommandBatcher(user_service, event_bus)
+
+        results = await asyncio.gather(*(batcher.submit(uuid4(), lambda user: None) for _ in range(5)))
+
+        assert results == ["user-0", "user-1", "user-2", "user-3", "user-4"]
+        user_service.apply_batch.assert_called_once()
+        assert len(user_service.apply_batch.call_args.args[0]) == 5
+        event_bus.publish.assert_awaited_once_with("event")
+        assert batcher.batches == 1
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_flushed_without_waiting(self, user_service, event_bus):
+        async def apply_batch(commands):
+            return [None] * len(commands), []
+
+        user_service.apply_batch.side_effect = apply_batch
+        batcher = CommandBatcher(user_service, event_bus, max_batch_size=2, min_window=10, max_window=10)
+
+        await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(uuid4(), lambda user: None) for _ in range(4))),
+            timeout=1
+        )
+
+        assert user_service.apply_batch.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_command_errors_are_reported_per_command(self, user_service, event_bus):
+        error = ValueError("User is not active")
+        user_service.apply_batch.return_value = (["user", error], [])
+        batcher = CommandBatcher(user_service, event_bus)
+
+        first = batcher.submit(uuid4(), lambda user: None)
+        second = batcher.submit(uuid4(), lambda user: None)
+
+        assert await first == "user"
+        with pytest.raises(ValueError):
+            await second
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_falls_back_to_individual_commits(self, user_service, event_bus):
+        calls = []
+
+        async def apply_batch(commands):
+            calls.append(len(commands))
+            if len(commands) > 1:
+                raise RuntimeError("deadlock detected")
+            return ["user"], []
+
+        user_service.apply_batch.side_effect = apply_batch
+        batcher = CommandBatcher(user_service, event_bus)
+
+        results = await asyncio.gather(*(batcher.submit(uuid4(), lambda user: None) for _ in range(3)))
+
+        assert results == ["user", "user", "user"]
+        assert calls == [3, 1, 1, 1]
@@ -1,7 +1,9 @@
 import datetime
+import psycopg2
 import pytest
 from unittest.mock import AsyncMock
 from uuid import uuid4
+from nats.errors import TimeoutError as NatsTimeoutError
 from LuminUserService.app.application.commands.create import CreateUserCommand, CreateUserHandler
 from LuminUserService.app.application.commands.change_username import ChangeUsernameCommand, ChangeUsernameHandler
 from LuminUserService.app.application.commands.change_email import ChangeEmailCommand, ChangeEmailHandler
@@ -76,6 +78,7 @@ class TestCommandHandlers:
         )
         mock_event_bus.process_events.assert_called_once()
         assert result["success"] is True
+        assert result["version"] == mock_user_service.change_username.return_value.version
 
     @pytest.mark.asyncio
     async def test_change_email_handler(self, mock_user_service, mock_event_bus):
@@ -137,3 +140,23 @@ class TestCommandHandlers:
 
         assert result["success"] is False
         assert "Service error" in result["exception"]
+
+    @pytest.mark.asyncio
+    async def test_transient_error_before_commit_is_raised_for_retry(self, mock_user_service, mock_event_bus):
+        handler = ChangeEmailHandler(mock_user_service, mock_event_bus)
+        mock_user_service.change_email.side_effect = psycopg2.OperationalError("connection reset")
+
+        with pytest.raises(psycopg2.OperationalError):
+            await handler.handle(ChangeEmailCommand(user_id=uuid4(), new_email=Email("jane.smith@example.com")))
+
+        mock_event_bus.process_events.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_publish_failure_after_commit_is_not_retried(self, mock_user_service, mock_event_bus):
+        handler = ChangeEmailHandler(mock_user_service, mock_event_bus)
+        mock_event_bus.process_events.side_effect = NatsTimeoutError()
+
+        result = await handler.handle(ChangeEmailCommand(user_id=uuid4(), new_email=Email("jane.smith@example.com")))
+
+        assert result["success"] is True
+        assert result["version"] == mock_user_service.change_email.return_value.version
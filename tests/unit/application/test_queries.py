@@ -0,0 +1,32 @@
+import pytest
+from uuid import uuid4
+from LuminUserService.app.application.queries.get_by_id import GetUserByIdQuery, ReadUserByIdHandler
+
+
+class TestQueryHandlers:
+    @pytest.fixture
+    def mock_read_repository(self, mocker):
+        mock = mocker.AsyncMock()
+        mock.get_by_id = mocker.AsyncMock()
+        return mock
+
+    @pytest.mark.asyncio
+    async def test_read_user_by_id_handler(self, mock_read_repository, user):
+        mock_read_repository.get_by_id.return_value = user
+        handler = ReadUserByIdHandler(mock_read_repository)
+
+        result = await handler.handle(GetUserByIdQuery(user_id=user.id))
+
+        mock_read_repository.get_by_id.assert_called_once_with(user.id)
+        assert result["success"] is True
+        assert result["user"]["user_id"] == user.id
+        assert result["user"]["version"] == user.version
+
+    @pytest.mark.asyncio
+    async def test_read_user_by_id_handler_not_found(self, mock_read_repository):
+        mock_read_repository.get_by_id.return_value = None
+        handler = ReadUserByIdHandler(mock_read_repository)
+
+        result = await handler.handle(GetUserByIdQuery(user_id=uuid4()))
+
+        assert result["success"] is False
@@ -0,0 +1,38 @@
+import pytest
+from uuid import uuid4
+from LuminUserService.app.domain.exceptions import FrozenAggregateException
+from LuminUserService.app.domain.models.common.value_objects import Bio
+
+
+class TestUserSnapshot:
+    @pytest.fixture
+    def snapshot(self, user):
+        user.freeze()
+        return user
+
+    def test_snapshot_rejects_commands(self, snapshot):
+        with pytest.raises(FrozenAggregateException):
+            snapshot.change_bio(Bio(value="Architect"))
+
+        with pytest.raises(AttributeError):
+            snapshot.profile_views.append(object())
+        with pytest.raises(AttributeError):
+            snapshot.privacy_settings.profile_avatar_visibility_black_list.append(uuid4())
+
+        assert snapshot.bio.value == "Software Developer"
+        assert snapshot.version == 0
+
+    def test_working_copy_does_not_leak_into_snapshot(self, snapshot):
+        working_copy = snapshot.working_copy()
+
+        working_copy.record_profile_view(uuid4(), uuid4(), "127.0.0.1")
+        working_copy.change_bio(Bio(value="Architect"))
+        working_copy.privacy_settings.profile_email_address_visibility_white_list.append(uuid4())
+
+        assert not working_copy.is_frozen
+        assert len(working_copy.profile_views) == 1
+        assert working_copy.version == 2
+        assert snapshot.profile_views == ()
+        assert snapshot.privacy_settings.profile_email_address_visibility_white_list == ()
+        assert snapshot.bio.value == "Software Developer"
+        assert snapshot.get_domain_events() == []
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from nats.js.errors import NotFoundError
+from LuminUserService.app.infrastructure.tasks.backpressure import QueueLagMonitor
+from LuminUserService.app.infrastructure.tasks.partitioned_broker import BULK, INTERACTIVE, PartitionedJetStreamBroker
+
+
+def stream_state(subjects: dict[str, int], last_seq: int = 100) -> SimpleNamespace:
+    messages = sum(subjects.values())
+    return SimpleNamespace(state=SimpleNamespace(
+        subjects=subjects, messages=messages, first_seq=last_seq - messages + 1, last_seq=last_seq
+    ))
+
+
+class TestQueueLagMonitor:
+    @pytest.fixture
+    def broker(self, mocker):
+        broker = PartitionedJetStreamBroker(servers="nats://localhost:4222")
+        broker.js = mocker.Mock()
+        broker.js.stream_info = mocker.AsyncMock()
+        broker.js.get_msg = mocker.AsyncMock()
+        return broker
+
+    @pytest.fixture
+    def monitor(self, broker):
+        return QueueLagMonitor(broker, max_lag={INTERACTIVE: 5.0, BULK: 300.0}, max_depth=1000, refresh_interval=0)
+
+    def oldest(self, broker, ages: dict[str, float]) -> None:
+        async def get_msg(stream, seq, subject, next):
+            lane = BULK if ".bulk." in subject else INTERACTIVE
+            if lane not in ages:
+                raise NotFoundError()
+            return SimpleNamespace(time=datetime.now(timezone.utc) - timedelta(seconds=ages[lane]))
+
+        broker.js.get_msg.side_effect = get_msg
+
+    @pytest.mark.asyncio
+    async def test_depth_is_split_by_lane(self, monitor, broker):
+        broker.js.stream_info.return_value = stream_state({
+            "taskiq.user_service.p0": 3, "taskiq.user_service.p7": 2, "taskiq.user_service.bulk.p0": 40
+        })
+        self.oldest(broker, {INTERACTIVE: 1.0, BULK: 30.0})
+
+        await monitor.refresh()
+        lanes = monitor.snapshot()["lanes"]
+
+        assert lanes[INTERACTIVE]["depth"] == 5
+        assert lanes[BULK]["depth"] == 40
+        assert lanes[BULK]["lag_seconds"] == pytest.approx(30.0, abs=1.0)
+
+    @pytest.mark.asyncio
+    async def test_lagging_lane_is_throttled_alone(self, monitor, broker):
+        broker.js.stream_info.return_value = stream_state({
+            "taskiq.user_service.p0": 20, "taskiq.user_service.bulk.p0": 10
+        })
+        self.oldest(broker, {INTERACTIVE: 12.0, BULK: 12.0})
+
+        assert await monitor.retry_after(INTERACTIVE) == monitor.default_retry_after
+        assert await monitor.retry_after(BULK) is None
+
+    @pytest.mark.asyncio
+    async def test_unknown_lane_is_held_to_the_interactive_limit(self, monitor, broker):
+        broker.js.stream_info.return_value = stream_state({"taskiq.user_service.p0": 20})
+        self.oldest(broker, {INTERACTIVE: 30.0})
+
+        assert await monitor.retry_after("xyz") == monitor.default_retry_after
+
+    @pytest.mark.asyncio
+    async def test_retry_after_follows_drain_rate(self, monitor, broker, mocker):
+        clock = mocker.patch("LuminUserService.app.infrastructure.tasks.backpressure.time.monotonic")
+        self.oldest(broker, {INTERACTIVE: 10.0})
+
+        clock.return_value = 100.0
+        broker.js.stream_info.return_value = stream_state({"taskiq.user_service.p0": 100}, last_seq=1000)
+        await monitor.refresh()
+
+        clock.return_value = 110.0
+        broker.js.stream_info.return_value = stream_state({"taskiq.user_service.p0": 80}, last_seq=1020)
+
+        assert await monitor.retry_after(INTERACTIVE) == 20
+
+    @pytest.mark.asyncio
+    async def test_backlog_limit_applies_to_every_lane(self, monitor, broker):
+        broker.js.stream_info.return_value = stream_state({"taskiq.user_service.bulk.p3": 1500})
+        self.oldest(broker, {BULK: 1.0})
+
+        assert await monitor.retry_after(INTERACTIVE) is not None
+        assert await monitor.retry_after(BULK) is not None
+
+    @pytest.mark.asyncio
+    async def test_fails_open_when_stream_is_unavailable(self, monitor, broker):
+        broker.js.stream_info.side_effect = ConnectionError("nats down")
+
+        assert await monitor.retry_after(INTERACTIVE) is None
+
+    @pytest.mark.asyncio
+    async def test_refresh_is_rate_limited(self, broker):
+        monitor = QueueLagMonitor(broker, max_lag={INTERACTIVE: 5.0}, max_depth=1000, refresh_interval=60)
+        broker.js.stream_info.return_value = stream_state({})
+
+        for _ in range(5):
+            await monitor.retry_after(INTERACTIVE)
+
+        assert broker.js.stream_info.await_count == 1
@@ -0,0 +1,110 @@
+import asyncio
+import time
+import fakeredis
+import pytest
+from uuid import uuid4
+from LuminUserService.app.infrastructure.cache.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from LuminUserService.app.infrastructure.cache.redis_cache import CacheConfig, RedisCache
+
+
+class TestCircuitBreaker:
+    @pytest.fixture
+    def breaker(self):
+        return CircuitBreaker("test", window_size=10, minimum_calls=4, failure_rate_threshold=0.5,
+                              open_seconds=0.05, half_open_probes=2)
+
+    def test_opens_on_failure_rate(self, breaker):
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+
+        breaker.record_failure()
+
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+        assert breaker.snapshot()["rejected_calls"] == 1
+
+    def test_half_open_probes_close_circuit(self, breaker):
+        for _ in range(4):
+            breaker.record_failure()
+
+        time.sleep(0.06)
+
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow() and breaker.allow()
+        assert not breaker.allow()
+        breaker.record_success()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+
+    def test_failed_probe_reopens_circuit(self, breaker):
+        for _ in range(4):
+            breaker.record_failure()
+        time.sleep(0.06)
+
+        assert breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == OPEN
+        assert breaker.times_opened == 2
+
+
+class TestRedisCacheCircuitBreaker:
+    @pytest.fixture
+    async def redis_cache(self, mocker):
+        server = fakeredis.FakeServer()
+        mocker.patch(
+            "LuminUserService.app.infrastructure.cache.redis_cache.redis.Redis",
+            side_effect=lambda **kwargs: fakeredis.FakeAsyncRedis(server=server)
+        )
+        redis_cache = RedisCache(CacheConfig(operation_timeout=0.01, breaker_minimum_calls=3))
+        await redis_cache.connect()
+        yield redis_cache
+        await redis_cache.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_slow_redis_opens_breaker_and_is_skipped(self, redis_cache, mocker):
+        async def slow_hgetall(*args, **kwargs):
+            await asyncio.sleep(1)
+
+        client = redis_cache._client
+        mocker.patch.object(client, "hgetall", side_effect=slow_hgetall)
+
+        for _ in range(3):
+            assert await redis_cache.get_user_entry(uuid4()) is None
+
+        started = time.monotonic()
+        assert await redis_cache.get_user_entry(uuid4()) is None
+
+        assert time.monotonic() - started < 0.01
+        assert client.hgetall.call_count == 3
+        assert not redis_cache.available
+        assert redis_cache.breaker.snapshot()["state"] == OPEN
+
+    @pytest.mark.asyncio
+    async def test_invalidations_during_outage_are_replayed_on_recovery(self, mocker):
+        server = fakeredis.FakeServer()
+        mocker.patch(
+            "LuminUserService.app.infrastructure.cache.redis_cache.redis.Redis",
+            side_effect=lambda **kwargs: fakeredis.FakeAsyncRedis(server=server)
+        )
+        redis_cache = RedisCache(CacheConfig(breaker_open_seconds=0.01, breaker_half_open_probes=1))
+        await redis_cache.connect()
+        user_id = uuid4()
+        await redis_cache.set_user(user_id, {"user_id": user_id, "version": 0})
+
+        redis_cache.breaker._open()
+        await redis_cache.invalidate_user_cache(user_id)
+
+        assert redis_cache.pending_invalidations == 2
+        await asyncio.sleep(0.02)
+        assert redis_cache.breaker.state == HALF_OPEN
+
+        await redis_cache.get("probe")
+        await redis_cache._replaying
+
+        assert redis_cache.breaker.state == CLOSED
+        assert redis_cache.pending_invalidations == 0
+        assert await redis_cache.get_user_entry(user_id) is None
+        await redis_cache.disconnect()
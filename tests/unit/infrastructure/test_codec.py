@@ -0,0 +1,32 @@
+import pickle
+import pytest
+from uuid import uuid4
+from LuminUserService.app.infrastructure.cache.codec import CODEC_FLAGS, PICKLE_MARKER, ValueCodec, available_codecs
+
+
+class TestValueCodec:
+    @pytest.fixture
+    def large_value(self):
+        return {"profile_email_address_visibility_black_list": [str(uuid4()) for _ in range(200)]}
+
+    def test_small_values_stay_plain_pickle(self):
+        encoded = ValueCodec(threshold=1024).dumps({"bio": "short"})
+
+        assert encoded[0] == PICKLE_MARKER
+        assert pickle.loads(encoded) == {"bio": "short"}
+
+    @pytest.mark.parametrize("codec", available_codecs())
+    def test_large_values_are_compressed_and_flagged(self, codec, large_value):
+        value_codec = ValueCodec(codec=codec, threshold=1024)
+
+        encoded = value_codec.dumps(large_value)
+
+        assert encoded[0] == CODEC_FLAGS[codec]
+        assert len(encoded) < len(pickle.dumps(large_value))
+        assert value_codec.loads(encoded) == large_value
+
+    def test_legacy_pickled_entries_still_decode(self, large_value):
+        assert ValueCodec().loads(pickle.dumps(large_value)) == large_value
+
+    def test_unknown_codec_falls_back_to_zlib(self):
+        assert ValueCodec(codec="brotli").codec == "zlib"
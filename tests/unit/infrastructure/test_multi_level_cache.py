@@ -0,0 +1,445 @@
+import asyncio
+import time
+import fakeredis
+import pytest
+from uuid import uuid4
+from LuminUserService.app.domain.models.common.value_objects import Bio
+from LuminUserService.app.infrastructure.cache.multi_level_cache import MultiLevelCache
+from LuminUserService.app.infrastructure.cache.redis_cache import CacheConfig, CachedUserEntry, RedisCache
+from LuminUserService.app.infrastructure.persistanse.identity_map import UserIdentityMap
+from LuminUserService.app.infrastructure.persistanse.user_mapper import UserMapper
+
+
+class TestMultiLevelCacheSingleFlight:
+    @pytest.fixture
+    def cache(self):
+        return MultiLevelCache(RedisCache(CacheConfig()), UserIdentityMap())
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self, cache, user_row):
+        calls = 0
+
+        async def loader(user_id):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return user_row
+
+        users = await asyncio.gather(*(
+            cache.get_or_load(user_row["user_id"], loader) for _ in range(1000)
+        ))
+
+        assert calls == 1
+        assert all(user is users[0] for user in users)
+        assert users[0].id == user_row["user_id"]
+
+    @pytest.mark.asyncio
+    async def test_loader_error_reaches_all_waiters(self, cache, user_row):
+        async def loader(user_id):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("database unavailable")
+
+        results = await asyncio.gather(
+            *(cache.get_or_load(user_row["user_id"], loader) for _ in range(10)),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert user_row["user_id"] not in cache._inflight
+
+    @pytest.mark.asyncio
+    async def test_missing_user_is_not_cached(self, cache):
+        async def loader(user_id):
+            return None
+
+        assert await cache.get_or_load(uuid4(), loader) is None
+        assert cache._inflight == {}
+
+
+class TestMultiLevelCacheNegativeCaching:
+    @pytest.fixture
+    def cache(self):
+        config = CacheConfig(negative_cache_max_entries=3, negative_cache_writes_per_second=2)
+        return MultiLevelCache(RedisCache(config), UserIdentityMap())
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_hits_loader_once(self, cache):
+        calls = 0
+
+        async def loader(user_id):
+            nonlocal calls
+            calls += 1
+            return None
+
+        user_id = uuid4()
+        assert await cache.get_or_load(user_id, loader) is None
+        assert await cache.get_or_load(user_id, loader) is None
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_loader_error_is_not_cached_as_missing(self, cache):
+        async def loader(user_id):
+            raise TimeoutError("statement timeout")
+
+        user_id = uuid4()
+        with pytest.raises(TimeoutError):
+            await cache.get_or_load(user_id, loader)
+
+        assert not cache.is_known_missing(user_id)
+
+    @pytest.mark.asyncio
+    async def test_set_user_clears_tombstone(self, cache, user):
+        await cache.set_missing(user.id)
+        assert cache.is_known_missing(user.id)
+
+        await cache.set_user(user.id, UserMapper().to_persistence(user))
+
+        assert not cache.is_known_missing(user.id)
+
+    @pytest.mark.asyncio
+    async def test_tombstones_are_bounded(self, cache):
+        user_ids = [uuid4() for _ in range(10)]
+        for user_id in user_ids:
+            await cache.set_missing(user_id)
+
+        assert len(cache._missing) == 3
+        assert all(cache.is_known_missing(user_id) for user_id in user_ids[-3:])
+        assert cache._negative_writes <= 2
+
+
+class TestMultiLevelCacheEarlyRefresh:
+    @pytest.fixture
+    def redis_cache(self, mocker):
+        redis_cache = mocker.AsyncMock()
+        redis_cache.config = CacheConfig()
+        redis_cache.set_user_entry.return_value = True
+        return redis_cache
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_is_served_while_one_refresh_runs(self, redis_cache, user_row):
+        redis_cache.get_user_entry.return_value = CachedUserEntry(
+            data=user_row, expires_at=time.time() - 1, delta=0.01
+        )
+        cache = MultiLevelCache(redis_cache, UserIdentityMap())
+        calls = 0
+
+        async def loader(user_id):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return user_row
+
+        user = await cache.get_or_load(user_row["user_id"], loader)
+        cache.identity_map.remove(user_row["user_id"])
+        await cache.get_or_load(user_row["user_id"], loader)
+
+        assert user.id == user_row["user_id"]
+        await asyncio.gather(*cache._refreshing.values())
+        assert calls == 1
+        assert cache.metrics.stale_served == 2
+        assert cache.metrics.refreshes == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_serving_the_entry(self, redis_cache, user_row):
+        redis_cache.get_user_entry.return_value = CachedUserEntry(
+            data=user_row, expires_at=time.time() - 1, delta=0.01
+        )
+        cache = MultiLevelCache(redis_cache, UserIdentityMap())
+
+        async def loader(user_id):
+            raise ConnectionError("database unavailable")
+
+        assert await cache.get_or_load(user_row["user_id"], loader)
+        await asyncio.gather(*cache._refreshing.values())
+
+        assert cache.metrics.refresh_failures == 1
+        assert not cache.is_known_missing(user_row["user_id"])
+        redis_cache.set_missing_user.assert_not_called()
+        redis_cache.delete_user.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_fresh_entry_is_not_refreshed(self, redis_cache, user_row):
+        redis_cache.get_user_entry.return_value = CachedUserEntry(
+            data=user_row, expires_at=time.time() + 3600, delta=0.01
+        )
+        cache = MultiLevelCache(redis_cache, UserIdentityMap())
+
+        async def loader(user_id):
+            return user_row
+
+        await cache.get_or_load(user_row["user_id"], loader)
+
+        assert cache._refreshing == {}
+        assert cache.metrics.snapshot() == {
+            "refreshes": 0, "early_refreshes": 0, "stale_served": 0, "refresh_failures": 0
+        }
+
+    @pytest.mark.asyncio
+    async def test_ttl_is_jittered(self, redis_cache, user_row):
+        cache = MultiLevelCache(redis_cache, UserIdentityMap())
+
+        for _ in range(20):
+            await cache.set_user(user_row["user_id"], user_row)
+
+        ttls = {call.kwargs["ttl"] for call in redis_cache.set_user_entry.call_args_list}
+        assert len(ttls) > 1
+        assert all(3240 + 300 <= ttl <= 3960 + 300 for ttl in ttls)
+
+
+class TestMultiLevelCacheFieldLevelStorage:
+    @pytest.fixture
+    async def cache(self, mocker):
+        server = fakeredis.FakeServer()
+        mocker.patch(
+            "LuminUserService.app.infrastructure.cache.redis_cache.redis.Redis",
+            side_effect=lambda **kwargs: fakeredis.FakeAsyncRedis(server=server)
+        )
+        redis_cache = RedisCache(CacheConfig(field_level_storage=True))
+        await redis_cache.connect()
+        yield MultiLevelCache(redis_cache, UserIdentityMap())
+        await redis_cache.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_single_field_change_patches_hash(self, cache, user, mocker):
+        await cache.set_user(user.id, UserMapper().to_persistence(user))
+        set_user_entry = mocker.spy(cache.redis, "set_user_entry")
+
+        user.change_bio(Bio(value="Architect"))
+        await cache.update_user(user, UserMapper().to_persistence(user))
+
+        set_user_entry.assert_not_called()
+        fields = await cache.redis.get_user_fields(user.id, {"profile"})
+        assert fields["bio"] == "Architect"
+        assert fields["version"] == user.version
+        assert "first_name" not in fields
+
+        entry = await cache.redis.get_user_entry(user.id)
+        assert entry.data["bio"] == "Architect"
+        assert entry.data["email"] == "john.doe@example.com"
+
+    @pytest.mark.asyncio
+    async def test_version_mismatch_rewrites_whole_entry(self, cache, user, mocker):
+        await cache.set_user(user.id, UserMapper().to_persistence(user))
+        set_user_entry = mocker.spy(cache.redis, "set_user_entry")
+
+        user.change_bio(Bio(value="Architect"))
+        user.mark_persisted()
+        user.change_bio(Bio(value="CTO"))
+        await cache.update_user(user, UserMapper().to_persistence(user))
+
+        set_user_entry.assert_called_once()
+        entry = await cache.redis.get_user_entry(user.id)
+        assert entry.data["bio"] == "CTO"
+        assert entry.data["version"] == user.version
+
+
+class TestMultiLevelCacheVersionGuard:
+    @pytest.fixture
+    async def cache(self, mocker):
+        server = fakeredis.FakeServer()
+        mocker.patch(
+            "LuminUserService.app.infrastructure.cache.redis_cache.redis.Redis",
+            side_effect=lambda **kwargs: fakeredis.FakeAsyncRedis(server=server)
+        )
+        redis_cache = RedisCache(CacheConfig())
+        await redis_cache.connect()
+        yield MultiLevelCache(redis_cache, UserIdentityMap())
+        await redis_cache.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_slow_reader_does_not_overwrite_newer_save(self, cache, user):
+        stale_row = UserMapper().to_persistence(user)
+        row_read = asyncio.Event()
+        save_done = asyncio.Event()
+
+        async def slow_loader(user_id):
+            row_read.set()
+            await save_done.wait()
+            return stale_row
+
+        async def save():
+            await row_read.wait()
+            user.change_bio(Bio(value="Architect"))
+            await cache.update_user(user, UserMapper().to_persistence(user))
+            user.mark_persisted()
+            save_done.set()
+
+        loaded, _ = await asyncio.gather(cache.get_or_load(user.id, slow_loader), save())
+
+        entry = await cache.redis.get_user_entry(user.id)
+        assert entry.data["version"] == 1
+        assert entry.data["bio"] == "Architect"
+        assert cache.identity_map.get(user.id).version == 1
+        assert loaded.bio.value == "Architect"
+
+    @pytest.mark.asyncio
+    async def test_equal_version_refreshes_entry(self, cache, user):
+        user_data = UserMapper().to_persistence(user)
+
+        assert await cache.set_user(user.id, user_data)
+        assert await cache.set_user(user.id, user_data)
+
+    @pytest.mark.asyncio
+    async def test_redis_write_error_still_returns_loaded_user(self, cache, user, mocker):
+        mocker.patch.object(cache.redis, "_set_user_script", side_effect=ConnectionError("connection reset"))
+
+        async def loader(user_id):
+            return UserMapper().to_persistence(user)
+
+        loaded = await cache.get_or_load(user.id, loader)
+
+        assert cache.redis.available
+        assert loaded.id == user.id
+        assert cache.identity_map.get(user.id) is loaded
+
+    @pytest.mark.asyncio
+    async def test_rejected_write_returns_newer_cached_user(self, cache, user):
+        stale_row = UserMapper().to_persistence(user)
+        user.change_bio(Bio(value="Architect"))
+        await cache.redis.set_user(user.id, UserMapper().to_persistence(user))
+
+        async def loader(user_id):
+            return stale_row
+
+        loaded = await cache._refresh_user(user.id, loader)
+
+        assert loaded.version == 1
+        assert loaded.bio.value == "Architect"
+        assert not cache.is_known_missing(user.id)
+
+
+class TestMultiLevelCacheWarmUp:
+    @pytest.fixture
+    async def redis_cache(self, mocker):
+        server = fakeredis.FakeServer()
+        mocker.patch(
+            "LuminUserService.app.infrastructure.cache.redis_cache.redis.Redis",
+            side_effect=lambda **kwargs: fakeredis.FakeAsyncRedis(server=server)
+        )
+        redis_cache = RedisCache(CacheConfig(warmup_batch_size=2, warmup_concurrency=2))
+        await redis_cache.connect()
+        yield redis_cache
+        await redis_cache.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_hot_set_survives_restart(self, redis_cache, make_user):
+        rows = {row["user_id"]: row for row in (UserMapper().to_persistence(make_user()) for _ in range(7))}
+        user_ids = list(rows)
+
+        old_worker = MultiLevelCache(redis_cache, UserIdentityMap())
+        for user_id in user_ids:
+            await old_worker.set_user(user_id, rows[user_id])
+            await old_worker.get_user(user_id)
+        await old_worker.persist_hot_set()
+
+        for user_id in user_ids[:5]:
+            await redis_cache.delete_user(user_id)
+
+        in_flight = 0
+        peak = 0
+        loaded = []
+
+        async def loader_many(batch):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            loaded.extend(batch)
+            return [rows[user_id] for user_id in batch]
+
+        new_worker = MultiLevelCache(redis_cache, UserIdentityMap())
+        warmed = await new_worker.warm_up(loader_many)
+
+        assert warmed == 7
+        assert sorted(loaded) == sorted(user_ids[:5])
+        assert peak <= 2
+        assert all(new_worker.identity_map.contains(user_id) for user_id in user_ids)
+
+    @pytest.mark.asyncio
+    async def test_warm_up_without_hot_set_is_noop(self, redis_cache):
+        cache = MultiLevelCache(redis_cache, UserIdentityMap())
+
+        async def loader_many(batch):
+            raise AssertionError("should not be called")
+
+        assert await cache.warm_up(loader_many) == 0
+
+
+class TestMultiLevelCacheHotKeys:
+    @pytest.fixture
+    async def cache(self, mocker):
+        server = fakeredis.FakeServer()
+        mocker.patch(
+            "LuminUserService.app.infrastructure.cache.redis_cache.redis.Redis",
+            side_effect=lambda **kwargs: fakeredis.FakeAsyncRedis(server=server)
+        )
+        redis_cache = RedisCache(CacheConfig(hot_key_threshold=50, hot_key_replicas=3, local_cache_ttl=0))
+        await redis_cache.connect()
+        yield MultiLevelCache(redis_cache, UserIdentityMap())
+        await redis_cache.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_hot_user_is_pinned_and_replicated(self, cache, user_row):
+        user_id = user_row["user_id"]
+        cold_id = uuid4()
+
+        async def loader(requested_id):
+            return user_row if requested_id == user_id else None
+
+        for _ in range(60):
+            await cache.get_or_load(user_id, loader)
+        await cache.get_or_load(cold_id, loader)
+
+        assert cache.is_hot(user_id)
+        assert not cache.is_hot(cold_id)
+        assert cache.hot_keys_snapshot()[0]["user_id"] == str(user_id)
+
+        await cache.set_user(user_id, user_row)
+        for replica in range(1, 4):
+            entry = await cache.redis.get_user_entry(user_id, replica)
+            assert entry.data["user_id"] == user_id
+
+        assert cache._local_expires[user_id] - time.monotonic() > 1000
+        assert cache._get_local(user_id) is not None
+
+    @pytest.mark.asyncio
+    async def test_cold_user_expires_from_l1(self, cache, user_row):
+        await cache.set_user(user_row["user_id"], user_row)
+
+        assert cache._get_local(user_row["user_id"]) is None
+        assert await cache.redis.get_user_entry(user_row["user_id"], 1) is None
+
+
+class TestMultiLevelCacheSnapshots:
+    @pytest.fixture
+    def cache(self):
+        return MultiLevelCache(RedisCache(CacheConfig()), UserIdentityMap())
+
+    @pytest.mark.asyncio
+    async def test_readers_share_one_frozen_snapshot(self, cache, user_row):
+        async def loader(user_id):
+            return user_row
+
+        first = await cache.get_or_load(user_row["user_id"], loader)
+        second = await cache.get_or_load(user_row["user_id"], loader)
+
+        assert first is second
+        assert first.is_frozen
+
+    @pytest.mark.asyncio
+    async def test_command_changes_are_published_only_after_save(self, cache, user_row):
+        async def loader(user_id):
+            return user_row
+
+        snapshot = await cache.get_or_load(user_row["user_id"], loader)
+        working_copy = snapshot.working_copy()
+        working_copy.record_profile_view(uuid4(), uuid4(), "127.0.0.1")
+
+        assert (await cache.get_or_load(user_row["user_id"], loader)).profile_views == ()
+
+        await cache.update_user(working_copy, UserMapper().to_persistence(working_copy))
+
+        published = await cache.get_or_load(user_row["user_id"], loader)
+        assert published.version == 1
+        assert len(published.profile_views) == 1
@@ -0,0 +1,69 @@
+import pytest
+from nats.errors import TimeoutError as NatsTimeoutError
+from nats.js.errors import KeyNotFoundError
+from nats.js.kv import KeyValue
+from taskiq import TaskiqResult
+from LuminUserService.app.infrastructure.tasks.nats_kv_result_backend import NatsKVResultBackend
+
+
+def make_entry(key: str, value: bytes) -> KeyValue.Entry:
+    return KeyValue.Entry(bucket="results", key=key, value=value, revision=1, delta=0, created=None, operation=None)
+
+
+class TestNatsKVResultBackend:
+    @pytest.fixture
+    def backend(self, mocker):
+        backend = NatsKVResultBackend(servers="nats://localhost:4222")
+        backend.kv = mocker.AsyncMock()
+        return backend
+
+    @pytest.fixture
+    def result(self):
+        return TaskiqResult(
+            is_err=False,
+            return_value={"success": True, "user_id": "42", "bio": "x" * 2000},
+            execution_time=0.01
+        )
+
+    def test_encoding_round_trip_is_compact(self, backend, result):
+        encoded = backend.encode(result)
+
+        assert len(encoded) < 600
+        assert backend.decode(encoded).return_value == result.return_value
+
+    @pytest.mark.asyncio
+    async def test_batched_status_lookup(self, backend, result):
+        stored = {"done": make_entry("done", backend.encode(result))}
+
+        async def get(task_id):
+            if task_id not in stored:
+                raise KeyNotFoundError
+            return stored[task_id]
+
+        backend.kv.get.side_effect = get
+
+        results = await backend.get_results(["done", "pending"])
+
+        assert results["done"].return_value == result.return_value
+        assert results["pending"] is None
+
+    @pytest.mark.asyncio
+    async def test_wait_for_result_is_woken_by_watch(self, backend, result, mocker):
+        watcher = mocker.AsyncMock()
+        watcher.updates.side_effect = [None, make_entry("task", backend.encode(result))]
+        backend.kv.watch.return_value = watcher
+
+        awaited = await backend.wait_for_result("task", timeout=1)
+
+        assert awaited.return_value == result.return_value
+        backend.kv.watch.assert_called_once_with("task", ignore_deletes=True)
+        watcher.stop.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_wait_for_result_times_out(self, backend, mocker):
+        watcher = mocker.AsyncMock()
+        watcher.updates.side_effect = [None, NatsTimeoutError]
+        backend.kv.watch.return_value = watcher
+
+        assert await backend.wait_for_result("task", timeout=0.1) is None
+        watcher.stop.assert_awaited_once()
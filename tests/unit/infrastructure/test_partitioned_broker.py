@@ -0,0 +1,238 @@
+import asyncio
+import time
+import pytest
+from uuid import uuid4
+from taskiq import BrokerMessage
+from LuminUserService.app.infrastructure.tasks.partitioned_broker import (
+    BULK, IDEMPOTENCY_LABEL, INTERACTIVE, MESSAGE_ID_HEADER, PARTITION_LABEL, PRIORITY_LABEL, TASK_ID_HEADER,
+    PartitionedJetStreamBroker, assign_partitions, idempotent_task_id, partition_for
+)
+
+
+class TestPartitionAssignment:
+    def test_same_user_always_maps_to_same_partition(self):
+        user_id = str(uuid4())
+
+        assert len({partition_for(user_id, 16) for _ in range(10)}) == 1
+        assert 0 <= partition_for(user_id, 16) < 16
+
+    def test_every_partition_has_exactly_one_owner(self):
+        assignment = assign_partitions(["worker-a", "worker-b", "worker-c"], 16)
+
+        owned = [partition for partitions in assignment.values() for partition in partitions]
+        assert sorted(owned) == list(range(16))
+
+    def test_joining_worker_only_takes_partitions(self):
+        before = assign_partitions(["worker-a", "worker-b"], 64)
+        after = assign_partitions(["worker-a", "worker-b", "worker-c"], 64)
+
+        assert after["worker-a"] <= before["worker-a"]
+        assert after["worker-b"] <= before["worker-b"]
+        assert after["worker-c"]
+
+    def test_leaving_worker_partitions_are_redistributed(self):
+        before = assign_partitions(["worker-a", "worker-b", "worker-c"], 64)
+        after = assign_partitions(["worker-a", "worker-b"], 64)
+
+        assert after["worker-a"] >= before["worker-a"]
+        assert after["worker-a"] | after["worker-b"] == set(range(64))
+
+
+class TestPartitionedJetStreamBroker:
+    @pytest.mark.asyncio
+    async def test_kick_routes_by_partition_key(self, mocker):
+        broker = PartitionedJetStreamBroker(servers="nats://localhost:4222", partitions=8)
+        broker.js = mocker.AsyncMock()
+        user_id = str(uuid4())
+
+        for _ in range(2):
+            await broker.kick(BrokerMessage(
+                task_id=uuid4().hex,
+                task_name="change_email_task",
+                message=b"{}",
+                labels={PARTITION_LABEL: user_id}
+            ))
+
+        subjects = {call.args[0] for call in broker.js.publish.call_args_list}
+        assert subjects == {f"taskiq.user_service.p{partition_for(user_id, 8)}"}
+
+    @pytest.mark.asyncio
+    async def test_kick_sends_task_id_as_message_id(self, mocker):
+        broker = PartitionedJetStreamBroker(servers="nats://localhost:4222")
+        broker.js = mocker.AsyncMock()
+        task_id = idempotent_task_id("change_email_task", "user", "retry-key")
+
+        await broker.kick(BrokerMessage(
+            task_id=task_id,
+            task_name="change_email_task",
+            message=b"{}",
+            labels={PARTITION_LABEL: "user", IDEMPOTENCY_LABEL: "retry-key"}
+        ))
+
+        headers = broker.js.publish.call_args.kwargs["headers"]
+        assert headers[MESSAGE_ID_HEADER] == task_id
+        assert headers[IDEMPOTENCY_LABEL] == "retry-key"
+
+    def test_idempotent_task_id_is_scoped_to_task_and_user(self):
+        task_id = idempotent_task_id("change_email_task", "user-a", "retry-key")
+
+        assert task_id == idempotent_task_id("change_email_task", "user-a", "retry-key")
+        assert task_id != idempotent_task_id("change_phone_task", "user-a", "retry-key")
+        assert task_id != idempotent_task_id("change_email_task", "user-b", "retry-key")
+
+    @pytest.mark.asyncio
+    async def test_completed_idempotent_task_is_not_run_again(self, mocker):
+        result_backend = mocker.AsyncMock()
+        result_backend.is_result_ready.return_value = True
+        broker = PartitionedJetStreamBroker(servers="nats://localhost:4222", result_backend=result_backend)
+        message = mocker.Mock(headers={IDEMPOTENCY_LABEL: "retry-key", TASK_ID_HEADER: "task"})
+
+        assert await broker._already_completed(message) is True
+        result_backend.is_result_ready.assert_awaited_once_with("task")
+
+    @pytest.mark.asyncio
+    async def test_messages_without_idempotency_key_skip_the_lookup(self, mocker):
+        result_backend = mocker.AsyncMock()
+        broker = PartitionedJetStreamBroker(servers="nats://localhost:4222", result_backend=result_backend)
+        message = mocker.Mock(headers={TASK_ID_HEADER: "task"})
+
+        assert await broker._already_completed(message) is False
+        result_backend.is_result_ready.assert_not_awaited()
+
+
+class TestDispatch:
+    @pytest.fixture
+    def broker(self):
+        return PartitionedJetStreamBroker(servers="nats://localhost:4222", ack_wait=0.2)
+
+    def consume(self, broker, mocker, message):
+        message.metadata = mocker.Mock(num_delivered=1)
+        subscription = mocker.AsyncMock()
+        subscription.fetch.return_value = [message]
+        return asyncio.create_task(broker._consume_once(subscription, INTERACTIVE, 0, broker.lane_stats[INTERACTIVE]))
+
+    @pytest.mark.asyncio
+    async def test_task_that_dies_without_ack_releases_the_partition(self, broker, mocker):
+        message = mocker.AsyncMock(data=b"payload", headers={TASK_ID_HEADER: "task"})
+        consuming = self.consume(broker, mocker, message)
+        await broker._queues[INTERACTIVE].get()
+
+        async def run_task():
+            broker.watch_execution("task")
+            raise RuntimeError("result backend unavailable")
+
+        with pytest.raises(RuntimeError):
+            await asyncio.create_task(run_task())
+
+        await asyncio.wait_for(consuming, timeout=0.1)
+        message.ack.assert_not_awaited()
+        assert "task" not in broker._inflight
+
+    @pytest.mark.asyncio
+    async def test_unacked_dispatch_times_out_after_ack_wait(self, broker, mocker):
+        message = mocker.AsyncMock(data=b"payload", headers={TASK_ID_HEADER: "task"})
+        consuming = self.consume(broker, mocker, message)
+        dispatched, _ = await broker._queues[INTERACTIVE].get()
+
+        await asyncio.wait_for(consuming, timeout=1)
+        await dispatched.ack()
+
+        message.ack.assert_not_awaited()
+        assert broker._dispatch_slots._value == broker.max_in_flight + broker.prefetch + 1
+
+
+class TestPriorityLanes:
+    @pytest.fixture
+    def broker(self):
+        return PartitionedJetStreamBroker(servers="nats://localhost:4222", partitions=4)
+
+    def fill(self, broker, lane, count):
+        for index in range(count):
+            broker._queues[lane].put_nowait((f"{lane}-{index}", None))
+            broker._available.release()
+
+    @pytest.mark.asyncio
+    async def test_bulk_commands_use_their_own_subject(self, broker, mocker):
+        broker.js = mocker.AsyncMock()
+        user_id = str(uuid4())
+
+        await broker.kick(BrokerMessage(
+            task_id=uuid4().hex,
+            task_name="batch_commands_task",
+            message=b"{}",
+            labels={PARTITION_LABEL: user_id, PRIORITY_LABEL: BULK}
+        ))
+
+        assert broker.js.publish.call_args.args[0] == f"taskiq.user_service.bulk.p{partition_for(user_id, 4)}"
+
+    @pytest.mark.asyncio
+    async def test_unknown_lane_is_rejected(self, broker, mocker):
+        broker.js = mocker.AsyncMock()
+
+        with pytest.raises(ValueError):
+            await broker.kick(BrokerMessage(
+                task_id=uuid4().hex,
+                task_name="change_email_task",
+                message=b"{}",
+                labels={PRIORITY_LABEL: "urgent"}
+            ))
+
+    def test_lanes_are_served_by_weight(self, broker):
+        self.fill(broker, INTERACTIVE, 20)
+        self.fill(broker, BULK, 20)
+
+        served = [broker._next_lane() for _ in range(10)]
+        for lane in served:
+            broker._queues[lane].get_nowait()
+
+        assert served.count(INTERACTIVE) == 8
+        assert served.count(BULK) == 2
+
+    def test_bulk_lane_is_not_starved(self, broker):
+        self.fill(broker, BULK, 3)
+
+        assert [broker._next_lane() for _ in range(3)] == [BULK, BULK, BULK]
+
+    @pytest.mark.asyncio
+    async def test_dispatch_reports_wait_time_per_lane(self, broker, mocker):
+        mocker.patch.object(broker, "_join", mocker.AsyncMock())
+        mocker.patch.object(broker, "_heartbeat_loop", mocker.AsyncMock())
+        broker._queues[BULK].put_nowait(("message", time.time() - 0.5))
+        broker._available.release()
+
+        assert await broker.listen().__anext__() == "message"
+
+        snapshot = broker.lane_snapshot()
+        assert snapshot[BULK]["dispatched"] == 1
+        assert snapshot[BULK]["in_flight"] == 1
+        assert snapshot[BULK]["wait_ms_max"] >= 500
+        assert snapshot[INTERACTIVE]["dispatched"] == 0
+
+    @pytest.mark.asyncio
+    async def test_dispatch_stops_at_concurrency_plus_prefetch(self, mocker):
+        broker = PartitionedJetStreamBroker(
+            servers="nats://localhost:4222", partitions=4, max_in_flight=2, interactive_reserved=1, prefetch=1
+        )
+        mocker.patch.object(broker, "_join", mocker.AsyncMock())
+        mocker.patch.object(broker, "_heartbeat_loop", mocker.AsyncMock())
+        self.fill(broker, INTERACTIVE, 5)
+        messages = broker.listen()
+
+        assert [await messages.__anext__() for _ in range(3)] == ["interactive-0", "interactive-1", "interactive-2"]
+        blocked = asyncio.create_task(messages.__anext__())
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+
+        broker._dispatch_slots.release()
+        assert await blocked == "interactive-3"
+
+    def test_lane_stats_are_aggregated_across_workers(self):
+        lanes = PartitionedJetStreamBroker.aggregate_lane_stats({
+            "worker-a": {BULK: {"pending": 900, "in_flight": 2, "wait_ms_avg": 100.0, "wait_ms_max": 400.0}},
+            "worker-b": {BULK: {"pending": 100, "in_flight": 1, "wait_ms_avg": 50.0, "wait_ms_max": 90.0}}
+        })
+
+        assert lanes[BULK]["pending"] == 1000
+        assert lanes[BULK]["in_flight"] == 3
+        assert lanes[BULK]["wait_ms_avg"] == 75.0
+        assert lanes[BULK]["wait_ms_max"] == 400.0
@@ -0,0 +1,78 @@
+import fakeredis
+import pytest
+from uuid import uuid4
+from LuminUserService.app.infrastructure.cache.query_cache import QueryCache, changed_query_tags
+from LuminUserService.app.infrastructure.cache.redis_cache import CacheConfig, RedisCache
+
+
+class TestQueryCache:
+    @pytest.fixture
+    async def redis_cache(self, mocker):
+        server = fakeredis.FakeServer()
+        mocker.patch(
+            "LuminUserService.app.infrastructure.cache.redis_cache.redis.Redis",
+            side_effect=lambda **kwargs: fakeredis.FakeAsyncRedis(server=server)
+        )
+        redis_cache = RedisCache(CacheConfig())
+        await redis_cache.connect()
+        yield redis_cache
+        await redis_cache.disconnect()
+
+    def test_fingerprint_is_normalized(self):
+        assert QueryCache.fingerprint("users", {"status": "active", "language_code": None, "limit": 10}) == \
+            QueryCache.fingerprint("users", {"limit": 10, "status": "active"})
+        assert QueryCache.fingerprint("users", {"status": "active"}) != \
+            QueryCache.fingerprint("users", {"status": "blocked"})
+
+    @pytest.mark.asyncio
+    async def test_loader_runs_once_until_invalidated(self, redis_cache):
+        queries = QueryCache(redis_cache)
+        user_ids = [uuid4(), uuid4()]
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return user_ids
+
+        assert await queries.get_or_load("users", {"status": "active"}, loader) == user_ids
+        assert await queries.get_or_load("users", {"status": "active"}, loader) == user_ids
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_status_change_invalidates_only_matching_tags(self, redis_cache):
+        queries = QueryCache(redis_cache)
+        await queries.set("users", {"status": "active"}, [uuid4()])
+        await queries.set("users", {"status": "blocked"}, [uuid4()])
+        await queries.set("users", {"status": "deactivated"}, [uuid4()])
+        await queries.set("users", {"language_code": "en"}, [uuid4()])
+
+        before = {"status": "active", "language_code": "en", "bio": "old"}
+        after = {"status": "blocked", "language_code": "en", "bio": "new"}
+        assert await queries.invalidate_changes(before, after) == 2
+
+        assert await queries.get("users", {"status": "active"}) is None
+        assert await queries.get("users", {"status": "blocked"}) is None
+        assert await queries.get("users", {"status": "deactivated"}) is not None
+        assert await queries.get("users", {"language_code": "en"}) is not None
+
+    @pytest.mark.asyncio
+    async def test_creation_invalidates_unfiltered_queries(self, redis_cache):
+        queries = QueryCache(redis_cache)
+        await queries.set("users", {"limit": 100}, [uuid4()])
+        await queries.set("users", {"language_code": "fr"}, [uuid4()])
+
+        await queries.invalidate_changes(None, {"status": "active", "language_code": "en"})
+
+        assert await queries.get("users", {"limit": 100}) is None
+        assert await queries.get("users", {"language_code": "fr"}) is not None
+
+    def test_unrelated_changes_produce_no_tags(self):
+        assert changed_query_tags({"status": "active", "bio": "a"}, {"status": "active", "bio": "b"}) == []
+
+    @pytest.mark.asyncio
+    async def test_invalidate_all_drops_every_query(self, redis_cache):
+        queries = QueryCache(redis_cache)
+        await queries.set("users", {"limit": 100}, [uuid4()])
+        await queries.set("users", {"status": "active", "language_code": "en"}, [uuid4()])
+
+        assert await queries.invalidate_all() == 2
@@ -0,0 +1,88 @@
+import time
+import fakeredis
+import pytest
+from uuid import uuid4
+from LuminUserService.app.infrastructure.cache.hash_ring import HashRing
+from LuminUserService.app.infrastructure.cache.redis_cache import CacheConfig, RedisCache
+
+
+class TestHashRing:
+    def test_keys_spread_over_all_nodes(self):
+        ring = HashRing(["redis-a:6379", "redis-b:6379", "redis-c:6379"])
+
+        groups = ring.group_by_node([f"user:{uuid4()}" for _ in range(3000)])
+
+        assert set(groups) == set(ring.nodes)
+        assert all(len(keys) > 600 for keys in groups.values())
+
+    def test_adding_node_moves_few_keys(self):
+        keys = [f"user:{uuid4()}" for _ in range(3000)]
+        before = HashRing(["redis-a:6379", "redis-b:6379", "redis-c:6379"])
+        after = HashRing(["redis-a:6379", "redis-b:6379", "redis-c:6379", "redis-d:6379"])
+
+        moved = sum(before.get_node(key) != after.get_node(key) for key in keys)
+
+        assert moved < len(keys) / 2
+
+
+class TestRedisCacheSharding:
+    @pytest.fixture
+    def servers(self):
+        return {6379: fakeredis.FakeServer(), 6380: fakeredis.FakeServer(), 6381: fakeredis.FakeServer()}
+
+    @pytest.fixture
+    async def redis_cache(self, mocker, servers):
+        clients = []
+
+        def create_client(**kwargs):
+            client = fakeredis.FakeAsyncRedis(server=servers[kwargs["port"]])
+            clients.append(client)
+            return client
+
+        mocker.patch(
+            "LuminUserService.app.infrastructure.cache.redis_cache.redis.Redis",
+            side_effect=create_client
+        )
+        redis_cache = RedisCache(CacheConfig(
+            shard_nodes=["localhost:6379", "localhost:6380"],
+            replica_nodes={"localhost:6379": ["localhost:6381"]},
+            read_from_replicas=True
+        ))
+        await redis_cache.connect()
+        yield redis_cache
+        await redis_cache.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_users_are_sharded_and_batch_read_per_node(self, redis_cache, servers, mocker):
+        user_ids = [uuid4() for _ in range(20)]
+        for user_id in user_ids:
+            await redis_cache.set_user_entry(
+                user_id, {"user_id": user_id, "version": 0}, expires_at=time.time() + 60, delta=0.01, ttl=60
+            )
+
+        primary_a = fakeredis.FakeAsyncRedis(server=servers[6379])
+        primary_b = fakeredis.FakeAsyncRedis(server=servers[6380])
+        assert await primary_a.dbsize() + await primary_b.dbsize() == 20
+        assert await primary_a.dbsize() > 0 and await primary_b.dbsize() > 0
+
+        replica = fakeredis.FakeAsyncRedis(server=servers[6381])
+        for key in await primary_a.keys("*"):
+            await replica.hset(key, mapping=await primary_a.hgetall(key))
+
+        pipelines = [mocker.spy(client, "pipeline") for client in redis_cache._all_clients()]
+        entries = await redis_cache.get_user_entries(user_ids)
+
+        assert set(entries) == set(user_ids)
+        assert sum(pipeline.call_count for pipeline in pipelines) == 2
+        assert redis_cache._nodes["localhost:6379"].pipeline.call_count == 0
+
+    @pytest.mark.asyncio
+    async def test_legacy_string_entries_do_not_block_the_hash_layout(self, redis_cache):
+        user_id = uuid4()
+        full_key = redis_cache._build_key(f"user:{user_id}")
+        await redis_cache._writer(full_key).setex(full_key, 60, b"legacy pickled user")
+
+        assert await redis_cache.set_user(user_id, {"user_id": user_id, "version": 3}) is True
+        hash_key = redis_cache._build_key(redis_cache._user_key(user_id))
+        assert await redis_cache._writer(hash_key).hget(hash_key, "v") == b"3"
+        assert redis_cache.breaker.state == "closed"
@@ -0,0 +1,50 @@
+import fakeredis
+import pytest
+from uuid import uuid4
+from LuminUserService.app.infrastructure.cache.redis_cache import CacheConfig, RedisCache
+from LuminUserService.app.infrastructure.cache.response_cache import UserResponseCache
+
+
+class TestUserResponseCache:
+    @pytest.fixture
+    async def redis_cache(self, mocker):
+        server = fakeredis.FakeServer()
+        mocker.patch(
+            "LuminUserService.app.infrastructure.cache.redis_cache.redis.Redis",
+            side_effect=lambda **kwargs: fakeredis.FakeAsyncRedis(server=server)
+        )
+        redis_cache = RedisCache(CacheConfig(response_cache_max_entries=2))
+        await redis_cache.connect()
+        yield redis_cache
+        await redis_cache.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_body_is_shared_through_redis(self, redis_cache):
+        user_id = uuid4()
+        await UserResponseCache(redis_cache).set(user_id, 3, b'{"version": 3}')
+
+        other_process = UserResponseCache(redis_cache)
+
+        assert await other_process.get(user_id, 3) == b'{"version": 3}'
+        assert await other_process.get(user_id, 4) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_previous_version(self, redis_cache):
+        responses = UserResponseCache(redis_cache)
+        user_id = uuid4()
+        await responses.set(user_id, 3, b'{"version": 3}')
+
+        await responses.invalidate(user_id, 3)
+
+        assert await responses.get(user_id, 3) is None
+
+    @pytest.mark.asyncio
+    async def test_local_entries_are_bounded(self, redis_cache):
+        responses = UserResponseCache(redis_cache)
+        for version in range(5):
+            await responses.set(uuid4(), version, b"{}")
+
+        assert len(responses._local) == 2
+
+    def test_etag_is_quoted_version(self):
+        assert UserResponseCache.etag(7) == '"7"'
@@ -0,0 +1,174 @@
+import asyncio
+import psycopg2
+import pytest
+import redis.exceptions
+from nats.errors import ConnectionClosedError
+from taskiq import TaskiqMessage, TaskiqResult
+from taskiq.exceptions import NoResultError
+from LuminUserService.app.domain.exceptions import EmailValidationException
+from LuminUserService.app.infrastructure.tasks.partitioned_broker import (
+    INTERACTIVE, TASK_ID_HEADER, PartitionedJetStreamBroker
+)
+from LuminUserService.app.infrastructure.tasks.retry_policy import RetryMiddleware, RetryPolicy, is_retryable
+
+
+def failed_result(error: Exception) -> TaskiqResult:
+    return TaskiqResult(is_err=True, return_value=None, execution_time=0.01, error=error)
+
+
+class TestRetryPolicy:
+    def test_transient_errors_are_retryable(self):
+        assert is_retryable(psycopg2.OperationalError("server closed the connection"))
+        assert is_retryable(redis.exceptions.ConnectionError("Connection refused"))
+        assert is_retryable(TimeoutError())
+
+    def test_domain_errors_are_permanent(self):
+        assert not is_retryable(ValueError("User not found"))
+        assert not is_retryable(EmailValidationException("invalid email"))
+
+    def test_backoff_grows_and_is_capped(self):
+        policy = RetryPolicy(max_attempts=10, base_delay=1.0, max_delay=8.0)
+
+        for _ in range(50):
+            assert 0.5 <= policy.backoff(1) <= 1.0
+            assert 2.0 <= policy.backoff(3) <= 4.0
+            assert 4.0 <= policy.backoff(9) <= 8.0
+
+    def test_attempts_are_limited(self):
+        policy = RetryPolicy(max_attempts=3)
+        error = psycopg2.OperationalError()
+
+        assert policy.should_retry(error, 2)
+        assert not policy.should_retry(error, 3)
+
+
+class TestRetryMiddleware:
+    @pytest.fixture
+    def broker(self, mocker):
+        broker = mocker.Mock()
+        broker.retry_later = mocker.AsyncMock()
+        broker.dead_letter = mocker.AsyncMock()
+        return broker
+
+    @pytest.fixture
+    def middleware(self, broker):
+        middleware = RetryMiddleware(RetryPolicy(max_attempts=3))
+        middleware.set_broker(broker)
+        return middleware
+
+    @pytest.fixture
+    def message(self):
+        return TaskiqMessage(task_id="task", task_name="change_email_task", labels={}, args=[], kwargs={})
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_is_retried_without_saving(self, middleware, broker, message):
+        broker.delivery_attempt.return_value = 1
+        result = failed_result(psycopg2.OperationalError("connection reset"))
+
+        await middleware.post_execute(message, result)
+
+        broker.retry_later.assert_awaited_once()
+        assert broker.retry_later.call_args.args[0] == "task"
+        assert isinstance(result.error, NoResultError)
+
+    @pytest.mark.asyncio
+    async def test_exhausted_task_is_dead_lettered(self, middleware, broker, message):
+        broker.delivery_attempt.return_value = 3
+        result = failed_result(psycopg2.OperationalError("connection reset"))
+
+        await middleware.post_execute(message, result)
+
+        broker.retry_later.assert_not_awaited()
+        broker.dead_letter.assert_awaited_once()
+        assert broker.dead_letter.call_args.args[:2] == ("task", "change_email_task")
+        assert isinstance(result.error, psycopg2.OperationalError)
+
+    @pytest.mark.asyncio
+    async def test_permanent_failure_is_saved_as_is(self, middleware, broker, message):
+        broker.delivery_attempt.return_value = 1
+        result = failed_result(ValueError("User not found"))
+
+        await middleware.post_execute(message, result)
+
+        broker.retry_later.assert_not_awaited()
+        broker.dead_letter.assert_not_awaited()
+
+
+class TestBrokerRetries:
+    @pytest.mark.asyncio
+    async def test_retry_holds_the_partition_until_rerun(self, mocker):
+        broker = PartitionedJetStreamBroker(servers="nats://localhost:4222")
+        message = mocker.AsyncMock(data=b"payload", headers={TASK_ID_HEADER: "task"})
+        message.metadata = mocker.Mock(num_delivered=2)
+        subscription = mocker.AsyncMock()
+        subscription.fetch.return_value = [message]
+        consuming = asyncio.create_task(broker._consume_once(subscription, INTERACTIVE, 0, broker.lane_stats[INTERACTIVE]))
+
+        first, _ = await broker._queues[INTERACTIVE].get()
+        assert broker.delivery_attempt("task") == 2
+        await broker.retry_later("task", 0.05)
+        await first.ack()
+
+        second, _ = await asyncio.wait_for(broker._queues[INTERACTIVE].get(), timeout=1)
+        assert second.data == b"payload"
+        assert broker.delivery_attempt("task") == 3
+        message.in_progress.assert_awaited()
+        message.nak.assert_not_awaited()
+        message.ack.assert_not_awaited()
+        assert not consuming.done()
+
+        await second.ack()
+        await consuming
+        message.ack.assert_awaited_once()
+        subscription.fetch.assert_awaited_once()
+        assert "task" not in broker._inflight
+
+    @pytest.mark.asyncio
+    async def test_retry_survives_a_task_that_dies_before_acking(self, mocker):
+        broker = PartitionedJetStreamBroker(servers="nats://localhost:4222")
+        message = mocker.AsyncMock(data=b"payload", headers={TASK_ID_HEADER: "task"})
+        message.metadata = mocker.Mock(num_delivered=1)
+        subscription = mocker.AsyncMock()
+        subscription.fetch.return_value = [message]
+        consuming = asyncio.create_task(broker._consume_once(subscription, INTERACTIVE, 0, broker.lane_stats[INTERACTIVE]))
+        await broker._queues[INTERACTIVE].get()
+
+        async def run_task():
+            broker.watch_execution("task")
+            await broker.retry_later("task", 0.01)
+            raise RuntimeError("post_execute failed")
+
+        with pytest.raises(RuntimeError):
+            await asyncio.create_task(run_task())
+
+        rerun, _ = await asyncio.wait_for(broker._queues[INTERACTIVE].get(), timeout=1)
+        await rerun.ack()
+        await consuming
+        message.ack.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_hold_stops_when_the_message_is_lost(self, mocker):
+        broker = PartitionedJetStreamBroker(servers="nats://localhost:4222")
+        message = mocker.AsyncMock()
+        message.in_progress.side_effect = ConnectionClosedError()
+
+        assert await broker._hold(message, 30.0) is False
+        message.in_progress.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_dead_letter_keeps_original_payload(self, mocker):
+        broker = PartitionedJetStreamBroker(servers="nats://localhost:4222")
+        broker.js = mocker.AsyncMock()
+        message = mocker.AsyncMock(data=b"payload", subject="taskiq.user_service.p3", headers={"priority": "bulk"})
+        broker._inflight["task"] = message
+
+        await broker.dead_letter("task", "change_email_task", "OperationalError()", 5)
+
+        subject, data = broker.js.publish.call_args.args
+        headers = broker.js.publish.call_args.kwargs["headers"]
+        assert subject == "dlq.user_service.change_email_task"
+        assert data == b"payload"
+        assert headers["Dlq-Original-Subject"] == "taskiq.user_service.p3"
+        assert headers["Dlq-Attempts"] == "5"
+        assert headers["priority"] == "bulk"
+        message.nak.assert_not_awaited()
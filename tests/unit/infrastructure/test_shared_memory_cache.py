@@ -0,0 +1,80 @@
+import multiprocessing
+import pytest
+from uuid import uuid4
+from LuminUserService.app.infrastructure.cache.codec import ValueCodec
+from LuminUserService.app.infrastructure.cache.multi_level_cache import MultiLevelCache
+from LuminUserService.app.infrastructure.cache.redis_cache import CacheConfig, RedisCache
+from LuminUserService.app.infrastructure.cache.shared_memory_cache import SharedMemoryCache
+from LuminUserService.app.infrastructure.persistanse.identity_map import UserIdentityMap
+
+
+def write_from_other_process(path: str, user_id, user_data: dict) -> None:
+    cache = SharedMemoryCache(path, ValueCodec(), slots=64, slot_size=4096)
+    cache.set(user_id, user_data, ttl=60)
+    cache.close()
+
+
+class TestSharedMemoryCache:
+    @pytest.fixture
+    def path(self, tmp_path):
+        return str(tmp_path / "users.shm")
+
+    def test_entry_written_by_another_process_is_visible(self, path, user_row):
+        cache = SharedMemoryCache(path, ValueCodec(), slots=64, slot_size=4096)
+
+        process = multiprocessing.get_context("fork").Process(
+            target=write_from_other_process, args=(path, user_row["user_id"], user_row)
+        )
+        process.start()
+        process.join()
+
+        assert cache.get(user_row["user_id"]) == user_row
+        cache.close()
+
+    def test_older_version_does_not_replace_newer(self, path, user_row):
+        cache = SharedMemoryCache(path, ValueCodec(), slots=64, slot_size=4096)
+        newer = dict(user_row, version=2, bio="newer")
+
+        assert cache.set(user_row["user_id"], newer, ttl=60)
+        assert not cache.set(user_row["user_id"], dict(user_row, version=1), ttl=60)
+
+        assert cache.get(user_row["user_id"])["bio"] == "newer"
+        cache.close()
+
+    def test_colliding_keys_and_delete(self, path, user_row):
+        cache = SharedMemoryCache(path, ValueCodec(), slots=4, slot_size=4096, probe_limit=4)
+        user_ids = [uuid4() for _ in range(4)]
+        for user_id in user_ids:
+            cache.set(user_id, dict(user_row, user_id=user_id), ttl=60)
+
+        cache.delete(user_ids[0])
+
+        assert cache.get(user_ids[0]) is None
+        assert all(cache.get(user_id)["user_id"] == user_id for user_id in user_ids[1:])
+        cache.close()
+
+    def test_oversized_payload_is_skipped(self, path, user_row):
+        cache = SharedMemoryCache(path, ValueCodec(threshold=2 ** 31), slots=4, slot_size=256)
+
+        assert not cache.set(user_row["user_id"], user_row, ttl=60)
+        assert cache.get(user_row["user_id"]) is None
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_workers_share_users_through_host_tier(self, path, user_row):
+        config = CacheConfig(shared_cache_path=path, shared_cache_slots=64)
+        first_worker = MultiLevelCache(RedisCache(config), UserIdentityMap())
+        second_worker = MultiLevelCache(RedisCache(config), UserIdentityMap())
+
+        async def loader(user_id):
+            return user_row
+
+        async def failing_loader(user_id):
+            raise AssertionError("should be served from shared memory")
+
+        await first_worker.get_or_load(user_row["user_id"], loader)
+        user = await second_worker.get_or_load(user_row["user_id"], failing_loader)
+
+        assert user.id == user_row["user_id"]
+        first_worker.shared.close()
+        second_worker.shared.close()
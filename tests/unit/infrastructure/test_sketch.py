@@ -0,0 +1,31 @@
+from uuid import uuid4
+from LuminUserService.app.infrastructure.cache.sketch import CountMinSketch
+
+
+class TestCountMinSketch:
+    def test_estimate_never_undercounts(self):
+        sketch = CountMinSketch(width=64, depth=4)
+        counts = {str(uuid4()): n for n in range(1, 200)}
+        for key, count in counts.items():
+            sketch.add(key, count)
+
+        assert all(sketch.estimate(key) >= count for key, count in counts.items())
+
+    def test_heavy_hitter_stands_out(self):
+        sketch = CountMinSketch()
+        hot = str(uuid4())
+        for _ in range(1000):
+            sketch.add(str(uuid4()))
+        for _ in range(500):
+            sketch.add(hot)
+
+        assert sketch.estimate(hot) >= 500
+        assert sketch.estimate(str(uuid4())) < 50
+
+    def test_decay_halves_counts(self):
+        sketch = CountMinSketch()
+        sketch.add("user", 10)
+
+        sketch.decay()
+
+        assert sketch.estimate("user") == 5
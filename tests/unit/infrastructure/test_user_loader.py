@@ -0,0 +1,124 @@
+import asyncio
+import pytest
+from uuid import UUID, uuid4
+from litestar import get
+from litestar.testing import create_test_client
+from taskiq import TaskiqMessage
+from LuminUserService.app.application.services.user_service import UserService
+from LuminUserService.app.infrastructure.cache.multi_level_cache import MultiLevelCache
+from LuminUserService.app.infrastructure.cache.redis_cache import CacheConfig, RedisCache
+from LuminUserService.app.infrastructure.persistanse.identity_map import UserIdentityMap
+from LuminUserService.app.infrastructure.persistanse.user_loader import current_user_loader, user_loader_scope
+from LuminUserService.app.infrastructure.persistanse.user_mapper import UserMapper
+from LuminUserService.app.infrastructure.tasks import user_loader_middleware
+from LuminUserService.app.presentation.api.middleware import UserLoaderMiddleware
+
+
+@pytest.fixture
+def cache():
+    return MultiLevelCache(RedisCache(CacheConfig()), UserIdentityMap())
+
+
+class TestUserLoader:
+    @pytest.fixture
+    def rows(self, make_user):
+        return {row["user_id"]: row for row in (UserMapper().to_persistence(make_user()) for _ in range(3))}
+
+    @pytest.fixture
+    def loader_many(self, rows):
+        calls = []
+
+        async def loader(user_ids: list[UUID]) -> list[dict]:
+            calls.append(list(user_ids))
+            return [rows[user_id] for user_id in user_ids if user_id in rows]
+
+        loader.calls = calls
+        return loader
+
+    @pytest.mark.asyncio
+    async def test_lookups_in_same_tick_are_batched(self, cache, rows, loader_many):
+        user_ids = list(rows)
+        unknown_id = uuid4()
+
+        with user_loader_scope(cache, loader_many) as loader:
+            users = await asyncio.gather(
+                *(loader.load(user_id) for user_id in user_ids + [user_ids[0], unknown_id])
+            )
+
+        assert len(loader_many.calls) == 1
+        assert sorted(loader_many.calls[0]) == sorted(user_ids + [unknown_id])
+        assert [user.id for user in users[:3]] == user_ids
+        assert users[3] is users[0]
+        assert users[4] is None
+        assert cache.is_known_missing(unknown_id)
+
+    @pytest.mark.asyncio
+    async def test_results_are_deduplicated_per_request(self, cache, rows, loader_many):
+        user_id = next(iter(rows))
+
+        with user_loader_scope(cache, loader_many) as loader:
+            first = await loader.load(user_id)
+            cache.identity_map.clear()
+            second = await loader.load(user_id)
+
+        assert first is second
+        assert loader.batches == 1
+
+    @pytest.mark.asyncio
+    async def test_local_hits_skip_the_loader(self, cache, rows, loader_many):
+        user_ids = list(rows)
+        await cache.set_user(user_ids[0], rows[user_ids[0]])
+
+        with user_loader_scope(cache, loader_many) as loader:
+            users = await loader.load_many(user_ids)
+
+        assert loader_many.calls == [user_ids[1:]]
+        assert all(users)
+
+    @pytest.mark.asyncio
+    async def test_scope_is_bound_to_the_current_context(self, cache, loader_many):
+        assert current_user_loader() is None
+
+        with user_loader_scope(cache, loader_many) as loader:
+            assert current_user_loader() is loader
+
+        assert current_user_loader() is None
+
+
+@get("/scoped")
+async def report_loader_scope() -> dict:
+    return {"scoped": current_user_loader() is not None}
+
+
+class TestRequestScopedLoader:
+    @pytest.fixture
+    def get_dependency_container(self, mocker, cache):
+        container = mocker.Mock()
+        container.get_user_service = mocker.AsyncMock(return_value=UserService(None, cache))
+        return mocker.patch(
+            "LuminUserService.app.infrastructure.persistanse.database.get_dependency_container",
+            return_value=container,
+            create=True
+        )
+
+    def test_http_requests_run_inside_a_loader_scope(self, get_dependency_container):
+        with create_test_client(route_handlers=[report_loader_scope], middleware=[UserLoaderMiddleware]) as client:
+            assert client.get("/scoped").json() == {"scoped": True}
+
+    def test_requests_are_served_unbatched_without_a_container(self, get_dependency_container):
+        get_dependency_container.side_effect = RuntimeError("container not configured")
+
+        with create_test_client(route_handlers=[report_loader_scope], middleware=[UserLoaderMiddleware]) as client:
+            assert client.get("/scoped").json() == {"scoped": False}
+
+    @pytest.mark.asyncio
+    async def test_tasks_run_inside_a_loader_scope(self, get_dependency_container):
+        middleware = user_loader_middleware.UserLoaderMiddleware()
+        message = TaskiqMessage(task_id="task", task_name="get_user_by_id_task", labels={}, args=[], kwargs={})
+
+        await middleware.pre_execute(message)
+        loader = current_user_loader()
+        await middleware.post_execute(message, None)
+
+        assert loader is not None
+        assert current_user_loader() is None